@@ -4,94 +4,47 @@ GitHub Actions script to update TikTok videos using yt-dlp
 This runs in the cloud and commits changes back to the repo
 """
 
+import argparse
 import json
 import os
-import subprocess
 import sys
-from datetime import datetime
 
-def run_ytdlp(username="minigolfeveryday", limit=50):
-    """Use yt-dlp to fetch video information"""
-    try:
-        profile_url = f"https://www.tiktok.com/@{username}"
-        
-        print(f"🌐 Fetching videos from: {profile_url}")
-        
-        # Use yt-dlp to extract video info with view counts
-        cmd = [
-            'yt-dlp',
-            '--flat-playlist',
-            '--print', '%(id)s|%(title)s|%(upload_date)s|%(view_count)s|%(like_count)s|%(comment_count)s',
-            '--playlist-end', str(limit),
-            profile_url
-        ]
-        
-        print(f"🚀 Running: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        
-        if result.returncode != 0:
-            print(f"❌ yt-dlp error: {result.stderr}")
-            return []
-        
-        videos = []
-        print(f"📋 Raw yt-dlp output:")
-        print(result.stdout)
-        
-        for line in result.stdout.strip().split('\n'):
-            if '|' in line and line.strip():
-                parts = line.split('|', 5)  # Split into max 6 parts
-                if len(parts) >= 3:
-                    video_id = parts[0].strip()
-                    title = parts[1].strip() if len(parts) > 1 else f"TikTok Video {video_id}"
-                    upload_date = parts[2].strip() if len(parts) > 2 else datetime.now().strftime('%Y%m%d')
-                    view_count = parts[3].strip() if len(parts) > 3 else '0'
-                    like_count = parts[4].strip() if len(parts) > 4 else '0'
-                    comment_count = parts[5].strip() if len(parts) > 5 else '0'
-                    
-                    # Fix empty titles
-                    if not title or title.strip() == '':
-                        title = f"TikTok Video {video_id}"
-                        print(f"  ⚠️  Empty title for {video_id}, using fallback: {title}")
-                    
-                    # Convert counts to integers, defaulting to 0
-                    try:
-                        view_count = int(view_count) if view_count.isdigit() else 0
-                        like_count = int(like_count) if like_count.isdigit() else 0
-                        comment_count = int(comment_count) if comment_count.isdigit() else 0
-                    except ValueError:
-                        view_count = like_count = comment_count = 0
-                    
-                    # Basic validation
-                    if video_id and video_id.isdigit() and len(video_id) >= 15:
-                        videos.append({
-                            'video_id': video_id,
-                            'title': title,
-                            'upload_date': upload_date,
-                            'view_count': view_count,
-                            'like_count': like_count,
-                            'comment_count': comment_count,
-                            'url': f"https://www.tiktok.com/@{username}/video/{video_id}"
-                        })
-                    else:
-                        print(f"  ⚠️  Skipping invalid video_id: {video_id}")
-                else:
-                    print(f"  ⚠️  Skipping line with insufficient parts: {line[:50]}...")
-        
-        print(f"✅ Successfully parsed {len(videos)} videos")
-        for i, video in enumerate(videos[:5]):  # Show first 5
-            print(f"  {i+1}. {video['video_id']} - {video['title'][:50]}...")
-        
-        return videos
-        
-    except subprocess.TimeoutExpired:
-        print("❌ yt-dlp timed out after 5 minutes")
-        return []
-    except Exception as e:
-        print(f"❌ Error running yt-dlp: {e}")
-        return []
+# The shared fetcher lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from video_catalog import CatalogMerge, archive_for, export_catalog
+from video_fetcher import YtDlpFetcher, get_fetcher, ytdlp_command, in_batches
+
+# Videos enumerated by a full refresh (the whole profile, with margin)
+FULL_REFRESH_LIMIT = 500
+
+# Fetched videos are merged and saved every this many, so a run that is
+# killed or times out keeps what it already fetched
+SAVE_BATCH_SIZE = 25
 
-def load_existing_videos():
-    """Load existing video database"""
+def run_ytdlp(username="minigolfeveryday", limit=50, known_ids=None, stats=None):
+    """Use yt-dlp to fetch video information
+    
+    Yields videos as yt-dlp prints them; with known_ids, yt-dlp is stopped
+    once a run of already-known videos is reached.
+    """
+    fetcher = get_fetcher(username=username)
+    print(f"🌐 Fetching videos from: https://www.tiktok.com/@{username}")
+    if isinstance(fetcher, YtDlpFetcher):
+        print(f"🚀 Running: {' '.join(ytdlp_command(username, limit))}")
+    else:
+        print(f"📼 Replaying {fetcher.fixture} (VIDEO_FETCHER)")
+    
+    def log(message):
+        print(f"  ⚠️  {message}")
+    
+    for video in fetcher.stream(limit, known_ids=known_ids, timeout=300, stats=stats, log=log):
+        print(f"  {video['video_id']} - {video['title'][:50]}")
+        yield video
+
+def load_existing_videos(archive):
+    """Load existing video database (the sharded archive, else the JSON export)"""
+    if archive.exists():
+        return archive.load()
     if os.path.exists('tiktok_videos.json'):
         try:
             with open('tiktok_videos.json', 'r', encoding='utf-8') as f:
@@ -101,17 +54,18 @@ def load_existing_videos():
             print(f"⚠️  Error loading existing videos: {e}")
     return []
 
+def save_shards(archive, merge):
+    """Save the month shards changed since the last save; returns the months written or None"""
+    try:
+        return archive.update(merge.dirty_shards())['written']
+    except Exception as e:
+        print(f"❌ Error saving video shards: {e}")
+        return None
+
 def save_videos(videos):
-    """Save videos to JSON file"""
+    """Save videos to JSON file (the whole-catalog export)"""
     try:
-        data = {
-            'videos': videos,
-            'last_updated': datetime.now().isoformat(),
-            'total_count': len(videos)
-        }
-        
-        with open('tiktok_videos.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        export_catalog('tiktok_videos.json', videos)
         
         print(f"✅ Saved {len(videos)} videos to tiktok_videos.json")
         return True
@@ -121,65 +75,80 @@ def save_videos(videos):
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Update tiktok_videos.json from the TikTok profile')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Enumerate the whole profile and refresh view/like/comment counts')
+    args = parser.parse_args()
+    
     print("🤖 GitHub Actions TikTok Video Updater")
     print("=" * 50)
     
     # Load existing videos
-    existing_videos = load_existing_videos()
+    archive = archive_for('tiktok_videos.json')
+    existing_videos = load_existing_videos(archive)
+    if existing_videos and not archive.exists():
+        # First run with the archive: shard the JSON catalog once
+        archive.write(existing_videos)
     existing_ids = set(v['video_id'] for v in existing_videos)
     print(f"📚 Loaded {len(existing_videos)} existing videos")
     
     if existing_videos:
         print(f"🎬 Most recent: {existing_videos[0].get('title', 'Unknown')[:60]}...")
     
-    # Fetch latest videos with yt-dlp
-    print("\nFetching latest videos...")
-    new_videos = run_ytdlp()
-    
-    if not new_videos:
-        print("❌ No videos fetched - keeping existing database unchanged")
-        return
-    
-    # Find truly new videos
-    truly_new = [v for v in new_videos if v['video_id'] not in existing_ids]
-    print(f"🆕 Found {len(truly_new)} new videos")
+    # Fetch latest videos with yt-dlp: incremental by default, everything on a full refresh
+    fetch_stats = {}
+    if args.full_refresh or not existing_ids:
+        print(f"\nFetching up to {FULL_REFRESH_LIMIT} videos (full refresh)...")
+        stream = run_ytdlp(limit=FULL_REFRESH_LIMIT, stats=fetch_stats)
+    else:
+        print("\nFetching latest videos (incremental)...")
+        stream = run_ytdlp(known_ids=existing_ids, stats=fetch_stats)
     
-    if truly_new:
-        for video in truly_new:
-            print(f"  ➕ {video['video_id']} - {video['title'][:50]}...")
+    # Merge batch by batch as yt-dlp produces them and save the month shards
+    # each batch touched. The merge only inserts and updates, so history
+    # beyond the fetch window is kept.
+    merge = CatalogMerge(existing_videos)
+    shards_written = set()
+    try:
+        for batch in in_batches(stream, SAVE_BATCH_SIZE):
+            for video_id in merge.apply(batch):
+                print(f"  ➕ {video_id} - {merge.get(video_id)['title'][:50]}...")
+            written = save_shards(archive, merge)
+            if written is None:
+                print("❌ Failed to save videos")
+                sys.exit(1)
+            shards_written.update(written)
+    finally:
+        # The whole-catalog export once per run, and only if a shard changed
+        if shards_written and not save_videos(merge.videos()):
+            print("❌ Failed to save videos")
+            sys.exit(1)
+    if shards_written:
+        print(f"🗂️  Rewrote month shards: {', '.join(sorted(shards_written))}")
     
-    # Merge: put new videos at the start, keep existing videos
-    # This preserves the order and ensures new videos appear first
-    all_videos = truly_new + existing_videos
+    if fetch_stats.get('error'):
+        print(f"⚠️  Fetch stopped early: {fetch_stats['error']}")
+    if fetch_stats.get('malformed'):
+        print(f"⚠️  Skipped {fetch_stats['malformed']} malformed lines")
     
-    # Safety check: never save an empty video list if we had existing videos
-    if not all_videos and existing_videos:
-        print("❌ SAFETY CHECK: Refusing to save empty video list when existing videos exist!")
-        print("❌ This suggests a parsing error. Keeping existing database unchanged.")
+    diff = merge.diff()
+    if not diff['fetched']:
+        print("❌ No videos fetched - keeping existing database unchanged")
         return
     
-    # Limit to most recent 200 videos to prevent file from growing too large
-    if len(all_videos) > 200:
-        all_videos = all_videos[:200]
-        print(f"📉 Trimmed to most recent 200 videos")
-    
-    print(f"📊 Total videos after update: {len(all_videos)}")
-    
-    # Final safety check before saving
-    if len(all_videos) == 0:
-        print("❌ SAFETY CHECK: Refusing to save empty video list!")
-        return
+    print(f"✅ Successfully parsed {diff['fetched']} videos")
+    print(f"🆕 Found {len(diff['inserted'])} new videos")
+    for video_id, fields in diff['updated'].items():
+        print(f"  ✏️  {video_id} - changed {', '.join(fields)}")
+    if diff['refreshed']:
+        print(f"🔄 Refreshed counts on {diff['refreshed']} videos")
+    print(f"📊 Total videos after update: {diff['total_after']} (was {diff['total_before']})")
     
-    # Save updated database
-    if save_videos(all_videos):
-        if truly_new:
-            print(f"🎉 Successfully added {len(truly_new)} new videos!")
-            print(f"🎬 Newest video: {all_videos[0].get('title', 'Unknown')[:60]}...")
-        else:
-            print("ℹ️  No new videos found - database is up to date")
+    if diff['inserted']:
+        print(f"🎉 Successfully added {len(diff['inserted'])} new videos!")
+        print(f"🎬 Newest video: {merge.videos()[0].get('title', 'Unknown')[:60]}...")
     else:
-        print("❌ Failed to save videos")
-        sys.exit(1)
+        print("ℹ️  No new videos found - database is up to date")
 
 if __name__ == "__main__":
     main()
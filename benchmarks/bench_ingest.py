@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark the video ingestion pipeline offline
+Replays recorded or synthetic yt-dlp output and times each phase separately:
+parse (ReplayFetcher), merge (CatalogMerge), JSON write (save_video_data)
+and DB upsert. No network access is needed, so it can run on CI.
+
+Usage: python benchmarks/bench_ingest.py [--videos 10000] [--malformed 0.01]
+                                         [--fixture recorded.txt] [--speed 0]
+                                         [--known 0.5] [--repeat 3] [--mysql] [--json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from update_videos import save_video_data
+from video_catalog import CatalogMerge
+from video_fetcher import ReplayFetcher, synthetic_lines, write_fixture
+
+# SQLite stand-in for migrate_videos_to_db's MySQL upsert (one statement per video, like the real one)
+SQLITE_SCHEMA = """
+    CREATE TABLE videos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id VARCHAR(255) UNIQUE NOT NULL,
+        title TEXT,
+        upload_date VARCHAR(8),
+        url VARCHAR(500),
+        view_count INT DEFAULT 0,
+        like_count INT DEFAULT 0,
+        comment_count INT DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+SQLITE_UPSERT = """
+    INSERT INTO videos (video_id, title, upload_date, url, view_count, like_count, comment_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(video_id) DO UPDATE SET
+    title = excluded.title,
+    upload_date = excluded.upload_date,
+    url = excluded.url,
+    view_count = excluded.view_count,
+    like_count = excluded.like_count,
+    comment_count = excluded.comment_count,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def quiet(*args):
+    pass
+
+
+def phase_parse(fixture, speed):
+    fetcher = ReplayFetcher(fixture, lines_per_second=speed or None)
+    stats = {}
+    videos = list(fetcher.stream(limit=None, timeout=None, stats=stats, log=quiet))
+    return videos, stats
+
+
+def phase_merge(existing, fetched):
+    merge = CatalogMerge(existing)
+    merge.apply(fetched)
+    return merge.videos(), merge.diff()
+
+
+def phase_json_write(videos, directory):
+    path = os.path.join(directory, 'tiktok_videos.json')
+    save_video_data(videos, path)
+    return os.path.getsize(path)
+
+
+def phase_db_upsert_sqlite(videos):
+    connection = sqlite3.connect(':memory:')
+    connection.execute(SQLITE_SCHEMA)
+    cursor = connection.cursor()
+    for video in videos:
+        cursor.execute(SQLITE_UPSERT, (
+            video['video_id'], video.get('title', ''), video.get('upload_date', ''), video.get('url', ''),
+            video.get('view_count', 0), video.get('like_count', 0), video.get('comment_count', 0)
+        ))
+    connection.commit()
+    connection.close()
+
+
+def phase_db_upsert_mysql(videos):
+    """The real migrate_videos_to_db upsert (needs DB_* environment variables)"""
+    from migrate_videos_to_db import connect_to_database, create_videos_table, migrate_videos_to_database
+    connection = connect_to_database(log=quiet)
+    if connection is None:
+        raise RuntimeError('MySQL connection failed - set DB_HOST/DB_USER/DB_PASSWORD/DB_NAME')
+    try:
+        create_videos_table(connection, log=quiet)
+        if not migrate_videos_to_database(connection, videos, log=quiet):
+            raise RuntimeError('MySQL upsert failed')
+    finally:
+        connection.close()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark video ingestion phases offline')
+    parser.add_argument('--videos', type=int, default=10000,
+                        help='Synthetic profile size (default: 10000; ignored with --fixture)')
+    parser.add_argument('--malformed', type=float, default=0.01,
+                        help='Share of synthetic lines that are malformed (default: 0.01)')
+    parser.add_argument('--fixture',
+                        help='Replay this recorded yt-dlp output instead of a synthetic profile')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='Replay pace in lines/second (default: 0 = as fast as possible)')
+    parser.add_argument('--known', type=float, default=0.5,
+                        help='Share of fetched videos already in the catalog before the merge (default: 0.5)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per phase; the median is reported (default: 3)')
+    parser.add_argument('--mysql', action='store_true',
+                        help='Time the real MySQL upsert instead of the SQLite stand-in')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as one JSON object (for tracking on CI)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        fixture = args.fixture
+        if not fixture:
+            fixture = write_fixture(os.path.join(directory, 'profile.txt'),
+                                    synthetic_lines(args.videos, args.malformed))
+
+        samples = {'parse': [], 'merge': [], 'json_write': [], 'db_upsert': []}
+        upsert = phase_db_upsert_mysql if args.mysql else phase_db_upsert_sqlite
+        for _ in range(args.repeat):
+            (videos, parse_stats), elapsed = timed(phase_parse, fixture, args.speed)
+            samples['parse'].append(elapsed)
+
+            # The catalog already holds the older share of the profile
+            existing = videos[int(len(videos) * (1 - args.known)):] if args.known else []
+            (merged, diff), elapsed = timed(phase_merge, existing, videos)
+            samples['merge'].append(elapsed)
+
+            json_bytes, elapsed = timed(phase_json_write, merged, directory)
+            samples['json_write'].append(elapsed)
+
+            _, elapsed = timed(upsert, merged)
+            samples['db_upsert'].append(elapsed)
+
+    results = {
+        'videos': len(merged),
+        'lines': parse_stats['lines'],
+        'malformed': parse_stats['malformed'],
+        'inserted': len(diff['inserted']),
+        'json_bytes': json_bytes,
+        'db': 'mysql' if args.mysql else 'sqlite',
+        'phases': {}
+    }
+    for phase, times in samples.items():
+        seconds = statistics.median(times)
+        results['phases'][phase] = {
+            'seconds': round(seconds, 4),
+            'videos_per_second': round(len(merged) / seconds) if seconds else None
+        }
+
+    if args.json:
+        print(json.dumps(results))
+        return 0
+
+    print(f"Ingesting {results['videos']} videos ({results['lines']} lines, "
+          f"{results['malformed']} malformed, {results['inserted']} new), median of {args.repeat}")
+    print(f"{'phase':<20} {'time':>10} {'videos/s':>12}")
+    print('-' * 44)
+    for phase, result in results['phases'].items():
+        label = f"{phase} ({results['db']})" if phase == 'db_upsert' else phase
+        print(f"{label:<20} {result['seconds'] * 1000:>8.1f}ms {result['videos_per_second'] or 0:>12,}")
+    print(f"\nCatalog JSON: {json_bytes / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
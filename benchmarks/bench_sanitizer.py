@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark the blog HTML sanitizer
+Times sanitize_html() against the old regex chain on a corpus of large posts
+and pathological inputs, and checks that run time grows linearly with size
+
+Usage: python benchmarks/bench_sanitizer.py [--sizes 4,64,1024] [--legacy]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from blog_content import sanitize_html
+
+
+def legacy_sanitize_content(content):
+    """The regex-chain sanitizer this benchmark replaced (for comparison)"""
+    if not content:
+        return ''
+    trusted_domains = ['youtube.com', 'youtube-nocookie.com', 'vimeo.com',
+                       'player.vimeo.com', 'soundcloud.com', 'w.soundcloud.com']
+    iframe_pattern = r'<iframe[^>]*src=["\']([^"\']+)["\'][^>]*>'
+    re.findall(iframe_pattern, content, re.IGNORECASE)
+    for tag in ['<script', '<object', '<embed', '<link', '<meta']:
+        content = re.sub(f'{tag}[^>]*>', '', content, flags=re.IGNORECASE)
+
+    def is_trusted_iframe(match):
+        src = match.group(1)
+        for domain in trusted_domains:
+            if domain in src:
+                return match.group(0)
+        return ''
+
+    content = re.sub(iframe_pattern, is_trusted_iframe, content, flags=re.IGNORECASE)
+    return content.strip()
+
+
+# Building blocks for realistic editor output
+PARAGRAPHS = [
+    '<p>Day {n}. The windmill hole <strong>finally</strong> went down in one &amp; the crowd went wild.</p>',
+    '<h2>Hole {n}: the loop-de-loop</h2>',
+    '<p>Read the <a href="https://minigolfevery.day/blog.html?post=day-{n}" target="_blank">full recap</a>.</p>',
+    '<p><img src="/uploads/course_{n}.jpg" alt="Course {n}" class="rounded"></p>',
+    '<iframe src="https://www.youtube.com/embed/video{n}" frameborder="0" allowfullscreen></iframe>',
+    '<ul><li>Par {n}</li><li><em>Windy</em></li><li>Putts: 3</li></ul>',
+    '<blockquote>A putt a day keeps the doctor away.</blockquote>',
+    '<p>Untrusted embed: <iframe src="https://evil.example/{n}">x</iframe> <script>steal({n})</script></p>',
+]
+
+
+def realistic_post(size_kb, seed=0):
+    """Generate editor-like HTML of roughly size_kb kilobytes"""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    n = 0
+    while total < size_kb * 1024:
+        block = rng.choice(PARAGRAPHS).format(n=n)
+        parts.append(block)
+        total += len(block)
+        n += 1
+    return '\n'.join(parts)
+
+
+# Inputs that trigger backtracking or rescanning in naive sanitizers
+PATHOLOGICAL = {
+    'open-brackets': lambda size: '<' * size,
+    'unclosed-tags': lambda size: '<a ' * (size // 3),
+    'unclosed-iframe-attr': lambda size: '<iframe src="' * (size // 13),
+    'unbalanced-quotes': lambda size: '<p title="x>' * (size // 12),
+    'unclosed-comment': lambda size: '<!--' + 'x' * size,
+    'nested-scripts': lambda size: '<script><script>' * (size // 16),
+    'long-attribute': lambda size: '<p ' + 'a=b ' * (size // 4) + '>',
+}
+
+
+# The regex chain goes super-linear on pathological input (16KB of unclosed
+# iframe attributes takes ~20s); only time it on small pathological inputs
+LEGACY_PATHOLOGICAL_MAX_KB = 4
+
+
+def time_call(func, content, repeat=3):
+    """Best-of-N wall time in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the blog HTML sanitizer')
+    parser.add_argument('--sizes', default='4,64,1024',
+                        help='Comma-separated input sizes in KB (default: 4,64,1024)')
+    parser.add_argument('--legacy', action='store_true',
+                        help='Also time the old regex-chain sanitizer '
+                             f'(pathological inputs up to {LEGACY_PATHOLOGICAL_MAX_KB}KB)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = {'realistic-post': lambda size: realistic_post(size // 1024)}
+    cases.update(PATHOLOGICAL)
+
+    print(f"{'case':<22} {'size':>8} {'single-pass':>12} {'MB/s':>8}" + (f" {'legacy':>10}" if args.legacy else ''))
+    print('-' * (54 + (11 if args.legacy else 0)))
+
+    worst_growth = 0.0
+    for name, build in cases.items():
+        timings = []
+        for size_kb in sizes:
+            content = build(size_kb * 1024)
+            elapsed = time_call(sanitize_html, content)
+            timings.append((len(content), elapsed))
+            line = f"{name:<22} {size_kb:>6}KB {elapsed * 1000:>10.2f}ms {len(content) / 1e6 / max(elapsed, 1e-9):>8.1f}"
+            if args.legacy and (name not in PATHOLOGICAL or size_kb <= LEGACY_PATHOLOGICAL_MAX_KB):
+                legacy = time_call(legacy_sanitize_content, content, repeat=1)
+                line += f" {legacy * 1000:>8.2f}ms"
+            elif args.legacy:
+                line += f" {'skipped':>10}"
+            print(line)
+
+        # Time per byte should stay flat as the input grows
+        (small_len, small_time), (large_len, large_time) = timings[0], timings[-1]
+        growth = (large_time / large_len) / max(small_time / small_len, 1e-12)
+        worst_growth = max(worst_growth, growth)
+        print(f"{'':<22} per-byte cost growth x{growth:.2f} across sizes")
+
+    print()
+    # Allow generous noise; quadratic behavior would show growth ~ size ratio
+    limit = 3.0
+    verdict = 'linear' if worst_growth <= limit else 'NON-LINEAR'
+    print(f"Worst per-byte growth: x{worst_growth:.2f} ({verdict}, limit x{limit})")
+    return 0 if worst_growth <= limit else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,440 @@
+"""
+Mini Golf Every Day - Blog content helpers
+Plain-text extraction, search snippets, derived metadata and sanitizing
+for blog post HTML
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+# Tags whose contents are never shown as readable text
+INVISIBLE_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'noscript', 'template'}
+
+# Tags that separate words when HTML is flattened to text
+BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'blockquote', 'pre', 'table', 'tr', 'td', 'th', 'section', 'article', 'figure',
+    'figcaption', 'hr'
+}
+
+# Search terms are plain word characters; everything else is ignored
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class _TextExtractor(HTMLParser):
+    """Collect the visible text of an HTML fragment"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.hidden_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in INVISIBLE_TAGS:
+            self.hidden_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in INVISIBLE_TAGS:
+            self.hidden_depth = max(0, self.hidden_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.hidden_depth:
+            self.parts.append(data)
+
+
+def html_to_text(content):
+    """Flatten post HTML to whitespace-normalized plain text"""
+    if not content:
+        return ''
+    parser = _TextExtractor()
+    parser.feed(content)
+    parser.close()
+    return _WHITESPACE_PATTERN.sub(' ', ''.join(parser.parts)).strip()
+
+
+def search_terms(query, max_terms=10):
+    """Split a user search query into lowercase word terms"""
+    if not query:
+        return []
+    terms = []
+    for term in _TERM_PATTERN.findall(query.lower()):
+        if term not in terms:
+            terms.append(term)
+        if len(terms) >= max_terms:
+            break
+    return terms
+
+
+def highlight_terms(text, terms):
+    """HTML-escape text and wrap every term occurrence in <mark>"""
+    if not text:
+        return ''
+    if not terms:
+        return html.escape(text)
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    pieces = []
+    position = 0
+    for match in pattern.finditer(text):
+        pieces.append(html.escape(text[position:match.start()]))
+        pieces.append(f'<mark>{html.escape(match.group(0))}</mark>')
+        position = match.end()
+    pieces.append(html.escape(text[position:]))
+    return ''.join(pieces)
+
+
+def build_snippet(text, terms, width=160):
+    """Return a highlighted window of text around the first matching term"""
+    if not text:
+        return ''
+    lowered = text.lower()
+    hits = [lowered.find(term) for term in terms]
+    hits = [hit for hit in hits if hit >= 0]
+    start = max(0, min(hits) - width // 3) if hits else 0
+    end = min(len(text), start + width)
+
+    # Avoid cutting words in half at either edge
+    if start > 0:
+        space = text.find(' ', start)
+        if 0 <= space < start + 20:
+            start = space + 1
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        if space > start:
+            end = space
+
+    snippet = highlight_terms(text[start:end], terms)
+    if start > 0:
+        snippet = '…' + snippet
+    if end < len(text):
+        snippet += '…'
+    return snippet
+
+
+# ---------------------------------------------------------------------------
+# Derived post metadata
+# ---------------------------------------------------------------------------
+
+WORDS_PER_MINUTE = 200
+AUTO_EXCERPT_LENGTH = 200
+
+# Headings listed in a post's table of contents (h1 is the post title). The
+# inner text may not run past another h2-h4 tag, so an unclosed heading
+# stops scanning at the next heading instead of the end of the document,
+# keeping many unclosed headings linear rather than quadratic.
+_HEADING_PATTERN = re.compile(
+    r'<(h[2-4])(\s[^>]*)?>([^<]*(?:<(?!/?h[2-4][\s/>])[^<]*)*)</\1\s*>', re.IGNORECASE
+)
+_ID_ATTR_PATTERN = re.compile(r'''\sid\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+_IMG_SRC_PATTERN = re.compile(r'''<img\s[^>]*?src\s*=\s*(?:"([^"]+)"|'([^']+)'|([^\s>]+))''', re.IGNORECASE)
+_ANCHOR_STRIP_PATTERN = re.compile(r'[^\w\s-]')
+_ANCHOR_DASH_PATTERN = re.compile(r'[-\s]+')
+
+
+def truncate_text(text, length=AUTO_EXCERPT_LENGTH):
+    """Cut plain text at a word boundary, adding an ellipsis when shortened"""
+    if len(text) <= length:
+        return text
+    cut = text.rfind(' ', 0, length)
+    return text[:cut if cut > length // 2 else length].rstrip(' ,.;:') + '…'
+
+
+def add_heading_anchors(content):
+    """Give every h2-h4 an id and return (content, toc)
+    
+    toc is a list of {"level", "text", "id"} in document order. Existing ids
+    are kept; generated ones are slugs of the heading text, made unique.
+    """
+    toc = []
+    used = set()
+    
+    def anchor(match):
+        tag, attrs, inner = match.group(1).lower(), match.group(2) or '', match.group(3)
+        text = html_to_text(inner)
+        id_match = _ID_ATTR_PATTERN.search(attrs)
+        if id_match:
+            anchor_id = next(group for group in id_match.groups() if group is not None)
+            tag_html = match.group(0)
+        else:
+            base = _ANCHOR_DASH_PATTERN.sub('-', _ANCHOR_STRIP_PATTERN.sub('', text.lower())).strip('-') or 'section'
+            anchor_id = base
+            counter = 1
+            while anchor_id in used:
+                anchor_id = f'{base}-{counter}'
+                counter += 1
+            tag_html = f'<{tag} id="{anchor_id}"{attrs}>{inner}</{tag}>'
+        used.add(anchor_id)
+        if text:
+            toc.append({'level': int(tag[1]), 'text': text, 'id': anchor_id})
+        return tag_html
+    
+    return _HEADING_PATTERN.sub(anchor, content), toc
+
+
+def first_image_src(content):
+    """The src of the first <img> in post HTML, or None"""
+    match = _IMG_SRC_PATTERN.search(content or '')
+    if not match:
+        return None
+    return html.unescape(next(group for group in match.groups() if group is not None))
+
+
+def derive_post_metadata(content):
+    """Compute the fields stored alongside a post's (sanitized) HTML
+    
+    Returns (content, metadata) where content has heading anchors added and
+    metadata holds word_count, reading_time (minutes), auto_excerpt, toc and
+    first_image.
+    """
+    content, toc = add_heading_anchors(content or '')
+    text = html_to_text(content)
+    word_count = len(text.split())
+    return content, {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / WORDS_PER_MINUTE)) if word_count else 0,
+        'auto_excerpt': truncate_text(text),
+        'toc': toc,
+        'first_image': first_image_src(content)
+    }
+
+
+# ---------------------------------------------------------------------------
+# HTML sanitizer
+# ---------------------------------------------------------------------------
+
+# Hosts allowed as iframe sources (subdomains included)
+TRUSTED_IFRAME_DOMAINS = frozenset({
+    'youtube.com',
+    'youtube-nocookie.com',
+    'vimeo.com',
+    'player.vimeo.com',
+    'soundcloud.com',
+    'w.soundcloud.com'
+})
+
+# Elements removed together with everything inside them
+DROPPED_ELEMENTS = frozenset({
+    'script', 'style', 'object', 'applet', 'template', 'noscript', 'svg', 'math'
+})
+
+# Tags kept in post HTML (what the Quill and TinyMCE editors produce); any
+# other tag is removed on its own and its text is kept
+ALLOWED_TAGS = frozenset({
+    'p', 'br', 'hr', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'strong', 'b', 'em', 'i', 'u', 's', 'strike', 'del', 'ins', 'sub', 'sup',
+    'small', 'mark', 'abbr', 'time', 'code', 'pre', 'kbd', 'blockquote', 'q', 'cite',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'a', 'img', 'figure', 'figcaption', 'iframe',
+    'table', 'caption', 'colgroup', 'col', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td',
+    'details', 'summary'
+})
+
+# Attributes kept on every allowed tag
+GLOBAL_ATTRIBUTES = frozenset({'class', 'id', 'title', 'style', 'dir', 'lang'})
+
+# Extra attributes kept per tag; anything else (event handlers, an iframe's
+# srcdoc, SVG animation values, ...) is dropped
+TAG_ATTRIBUTES = {
+    'a': frozenset({'href', 'target', 'rel', 'name'}),
+    'img': frozenset({'src', 'alt', 'width', 'height', 'loading'}),
+    'iframe': frozenset({'src', 'width', 'height', 'allow', 'allowfullscreen', 'frameborder', 'loading'}),
+    'blockquote': frozenset({'cite'}),
+    'q': frozenset({'cite'}),
+    'pre': frozenset({'spellcheck'}),
+    'ol': frozenset({'start', 'reversed', 'type'}),
+    'li': frozenset({'value'}),
+    'time': frozenset({'datetime'}),
+    'table': frozenset({'border', 'cellpadding', 'cellspacing', 'width'}),
+    'col': frozenset({'span', 'width'}),
+    'colgroup': frozenset({'span', 'width'}),
+    'th': frozenset({'colspan', 'rowspan', 'scope', 'width'}),
+    'td': frozenset({'colspan', 'rowspan', 'width'}),
+    'details': frozenset({'open'})
+}
+_ALLOWED_ATTRIBUTES = {tag: GLOBAL_ATTRIBUTES | TAG_ATTRIBUTES.get(tag, frozenset()) for tag in ALLOWED_TAGS}
+
+# URL-bearing attributes checked for script schemes
+URL_ATTRIBUTES = frozenset({'href', 'src', 'cite'})
+UNSAFE_URL_SCHEMES = ('javascript:', 'vbscript:', 'data:text/html')
+
+# One start/end tag. The name must be followed by whitespace, '/' or '>' and
+# the attribute part is written in "unrolled loop" form (unquoted runs
+# alternating with quoted values that may contain '>'), so a failed match
+# gives up without catastrophic backtracking.
+_TAG_PATTERN = re.compile(
+    r'''<(/?)([a-zA-Z][a-zA-Z0-9:-]*)(?=[\s/>])([^<>"']*(?:(?:"[^"]*"|'[^']*')[^<>"']*)*)>'''
+)
+_ATTR_PATTERN = re.compile(
+    r'''([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?'''
+)
+_CONTROL_CHARS = re.compile(r'[\x00-\x20]+')
+_END_TAG_PATTERNS = {}
+
+
+def _end_tag_pattern(tag):
+    """Compiled, cached matcher for the closing tag of a dropped element"""
+    pattern = _END_TAG_PATTERNS.get(tag)
+    if pattern is None:
+        pattern = _END_TAG_PATTERNS[tag] = re.compile(rf'</{tag}\s*>', re.IGNORECASE)
+    return pattern
+
+
+def is_trusted_iframe_src(src, trusted_domains=TRUSTED_IFRAME_DOMAINS):
+    """Check an iframe src against the allowlist using its parsed hostname
+    
+    The src is entity-decoded first, as the browser sees it. Backslashes and
+    userinfo are rejected outright: urlsplit reads the host after '@' while
+    browsers treat '\\' as '/', so https://evil.com\\@www.youtube.com/ would
+    pass the host check but load evil.com.
+    """
+    src = html.unescape(src).strip()
+    if '\\' in src:
+        return False
+    try:
+        parts = urlsplit(src)
+        if '@' in parts.netloc or parts.username is not None or parts.password is not None:
+            return False
+    except ValueError:
+        return False
+    if parts.scheme not in ('http', 'https', ''):
+        return False
+    host = (parts.hostname or '').lower()
+    if not host:
+        return False
+    # Walk up the labels: player.vimeo.com -> vimeo.com -> com
+    labels = host.split('.')
+    return any('.'.join(labels[i:]) in trusted_domains for i in range(len(labels) - 1))
+
+
+def _is_unsafe_url(value):
+    """Detect javascript:/vbscript:/data:text/html URLs, ignoring obfuscation"""
+    compact = _CONTROL_CHARS.sub('', html.unescape(value)).lower()
+    return compact.startswith(UNSAFE_URL_SCHEMES)
+
+
+def _clean_attributes(raw_attrs, allowed):
+    """Parse a tag's attribute text, keeping only allowed attributes
+    
+    Script URLs and CSS expressions are dropped even when the attribute is
+    allowed. Returns a list of (name, value) where value is None for bare
+    attributes.
+    """
+    attrs = []
+    for match in _ATTR_PATTERN.finditer(raw_attrs):
+        name = match.group(1).lower()
+        value = match.group(2)
+        if value is None:
+            value = match.group(3)
+        if value is None:
+            value = match.group(4)
+        if name not in allowed:
+            continue
+        if name == 'style' and value and 'expression(' in value.lower():
+            continue
+        if name in URL_ATTRIBUTES and value and _is_unsafe_url(value):
+            continue
+        attrs.append((name, value))
+    return attrs
+
+
+def _render_tag(tag, attrs, self_closing):
+    """Serialize a start tag from cleaned attributes"""
+    parts = [tag]
+    for name, value in attrs:
+        if value is None:
+            parts.append(name)
+        else:
+            parts.append(f'{name}="{value.replace(chr(34), "&quot;")}"')
+    return '<' + ' '.join(parts) + (' />' if self_closing else '>')
+
+
+def sanitize_html(content, trusted_domains=TRUSTED_IFRAME_DOMAINS):
+    """Sanitize post HTML in a single left-to-right pass
+    
+    A small tokenizer walks the input once: every character is consumed by
+    exactly one text, tag, comment or skipped-element token, and each token
+    is found with a C-level str.find or a non-backtracking regex starting
+    where the previous token ended, so run time is linear in the input
+    size. Only ALLOWED_TAGS are kept, with the attributes GLOBAL_ATTRIBUTES
+    and TAG_ATTRIBUTES allow; tags without attributes are copied through
+    unchanged. Dropped elements (script, style, svg, ...) lose their
+    contents, script URLs are removed, and iframes survive only when their
+    hostname is on the allowlist. Stray '<' characters are escaped.
+    """
+    if not content:
+        return ''
+    
+    out = []
+    pos = 0
+    length = len(content)
+    
+    while pos < length:
+        lt = content.find('<', pos)
+        if lt < 0:
+            out.append(content[pos:])
+            break
+        if lt > pos:
+            out.append(content[pos:lt])
+        
+        # Comments, doctypes and processing instructions are dropped entirely
+        if content.startswith('<!--', lt):
+            end = content.find('-->', lt + 4)
+            pos = length if end < 0 else end + 3
+            continue
+        if content.startswith('<!', lt) or content.startswith('<?', lt):
+            end = content.find('>', lt + 2)
+            pos = length if end < 0 else end + 1
+            continue
+        
+        match = _TAG_PATTERN.match(content, lt)
+        if match is None:
+            # Not a tag - escape the bracket and keep scanning
+            out.append('&lt;')
+            pos = lt + 1
+            continue
+        
+        pos = match.end()
+        is_end, tag, raw_attrs = match.groups()
+        tag = tag.lower()
+        
+        if tag in DROPPED_ELEMENTS:
+            if not is_end and not raw_attrs.rstrip().endswith('/'):
+                end = _end_tag_pattern(tag).search(content, pos)
+                pos = length if end is None else end.end()
+            continue
+        if tag not in ALLOWED_TAGS:
+            continue
+        
+        if is_end:
+            out.append(f'</{tag}>')
+            continue
+        
+        # Fast path: a bare tag has nothing to clean
+        if not raw_attrs.strip() and tag != 'iframe':
+            out.append(match.group(0))
+            continue
+        
+        self_closing = raw_attrs.rstrip().endswith('/')
+        attrs = _clean_attributes(raw_attrs.rstrip().rstrip('/'), _ALLOWED_ATTRIBUTES[tag])
+        
+        if tag == 'iframe':
+            src = next((value for name, value in attrs if name == 'src'), None)
+            if not src or not is_trusted_iframe_src(src, trusted_domains):
+                # Drop the untrusted iframe and its fallback content
+                if not self_closing:
+                    end = _end_tag_pattern('iframe').search(content, pos)
+                    pos = length if end is None else end.end()
+                continue
+        
+        out.append(_render_tag(tag, attrs, self_closing))
+    
+    return ''.join(out).strip()
@@ -0,0 +1,161 @@
+"""
+Mini Golf Every Day - Related posts
+TF-IDF / cosine similarity between published posts, computed in one batch
+so the API only has to read a precomputed top-K list per post
+"""
+
+import math
+import re
+from collections import Counter
+
+from blog_content import html_to_text
+
+# NumPy is optional - without it a sparse pure-Python version is used
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Title words count this many times as often as body words
+TITLE_WEIGHT = 3
+
+# Vocabulary limits keep the dense matrix small on shared hosting
+MAX_VOCABULARY = 5000
+MAX_DOCUMENT_FREQUENCY = 0.6
+
+# Dense path memory bounds: the posts x vocabulary matrix holds at most this
+# many float32 cells (64 MB), shrinking the vocabulary as the blog grows, and
+# similarities are computed this many rows at a time (rows x posts each)
+MAX_DENSE_CELLS = 16_000_000
+SIMILARITY_BLOCK_ROWS = 256
+# Below this many terms per post the dense path loses too much; use the sparse one
+MIN_DENSE_VOCABULARY = 1000
+
+MIN_SIMILARITY = 0.05
+
+_WORD_PATTERN = re.compile(r'[^\W\d_]{3,}', re.UNICODE)
+
+STOP_WORDS = frozenset("""
+the and for are but not you all any can had her was one our out day get has him his how man new now
+old see two way who boy did its let put say she too use that with have this will your from they know
+want been good much some time very when come here just like long make many more only over such take
+than them well were what into then there these their about would could should which while where after
+before being other also again because each most both few through during does doing own same
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens without stop words or numbers"""
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def document_terms(title, content):
+    """Term counts for one post, with the title weighted up"""
+    counts = Counter(tokenize(html_to_text(content)))
+    for word in tokenize(title or ''):
+        counts[word] += TITLE_WEIGHT
+    return counts
+
+
+def _vocabulary(term_counts, max_terms=MAX_VOCABULARY):
+    """Terms shared by at least two posts but not by most of them (the max_terms most common)"""
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(counts.keys())
+    limit = max(2, int(len(term_counts) * MAX_DOCUMENT_FREQUENCY))
+    terms = [term for term, df in document_frequency.items() if 2 <= df <= limit]
+    terms.sort(key=lambda term: (-document_frequency[term], term))
+    terms = terms[:max_terms]
+    return {term: index for index, term in enumerate(terms)}, document_frequency
+
+
+def _top_k_numpy(term_counts, vocabulary, document_frequency, top_k):
+    """Dense TF-IDF matrix; cosines via one matrix product per block of rows"""
+    n_docs = len(term_counts)
+    matrix = np.zeros((n_docs, len(vocabulary)), dtype=np.float32)
+    for row, counts in enumerate(term_counts):
+        for term, count in counts.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                matrix[row, column] = count
+
+    # Sublinear tf, smoothed idf, L2-normalized rows
+    idf = np.array([math.log((1 + n_docs) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+                   dtype=np.float32)
+    nonzero = matrix > 0
+    matrix[nonzero] = 1 + np.log(matrix[nonzero])
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+
+    k = min(top_k, n_docs - 1)
+    results = []
+    for start in range(0, n_docs, SIMILARITY_BLOCK_ROWS):
+        stop = min(start + SIMILARITY_BLOCK_ROWS, n_docs)
+        similarity = matrix[start:stop] @ matrix.T
+        # A post is not related to itself
+        similarity[np.arange(stop - start), np.arange(start, stop)] = -1
+        # argpartition gives the top k unordered, then sort just those
+        candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        for offset in range(stop - start):
+            row_candidates = candidates[offset]
+            ranked = row_candidates[np.argsort(-similarity[offset, row_candidates])]
+            results.append([(int(column), float(similarity[offset, column])) for column in ranked])
+    return results
+
+
+def _top_k_python(term_counts, vocabulary, document_frequency, top_k):
+    """Sparse fallback: accumulate dot products through an inverted index"""
+    n_docs = len(term_counts)
+    vectors = []
+    postings = {}
+    for row, counts in enumerate(term_counts):
+        vector = {}
+        for term, count in counts.items():
+            if term in vocabulary:
+                vector[term] = (1 + math.log(count)) * (math.log((1 + n_docs) / (1 + document_frequency[term])) + 1)
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        for term in vector:
+            vector[term] /= norm
+            postings.setdefault(term, []).append(row)
+        vectors.append(vector)
+
+    results = []
+    for row, vector in enumerate(vectors):
+        scores = Counter()
+        for term, weight in vector.items():
+            for other in postings[term]:
+                if other != row:
+                    scores[other] += weight * vectors[other][term]
+        results.append([(other, score) for other, score in scores.most_common(top_k)])
+    return results
+
+
+def compute_related_posts(documents, top_k=4, min_similarity=MIN_SIMILARITY):
+    """Top-K most similar posts for every post
+
+    documents is a list of (post_id, title, content). Returns
+    {post_id: [(related_id, score), ...]} ordered by descending similarity;
+    posts with nothing similar enough map to an empty list.
+    """
+    if len(documents) < 2:
+        return {post_id: [] for post_id, _, _ in documents}
+
+    term_counts = [document_terms(title, content) for _, title, content in documents]
+    dense_terms = min(MAX_VOCABULARY, MAX_DENSE_CELLS // len(documents))
+    dense = np is not None and dense_terms >= MIN_DENSE_VOCABULARY
+    vocabulary, document_frequency = _vocabulary(term_counts, dense_terms if dense else MAX_VOCABULARY)
+    if not vocabulary:
+        return {post_id: [] for post_id, _, _ in documents}
+
+    if dense:
+        ranked = _top_k_numpy(term_counts, vocabulary, document_frequency, top_k)
+    else:
+        ranked = _top_k_python(term_counts, vocabulary, document_frequency, top_k)
+
+    ids = [post_id for post_id, _, _ in documents]
+    return {
+        ids[row]: [(ids[other], round(score, 4)) for other, score in matches if score >= min_similarity]
+        for row, matches in enumerate(ranked)
+    }
@@ -0,0 +1,432 @@
+"""
+Mini Golf Every Day - Static blog pages
+Renders published posts, the paginated post index, the RSS feed and the
+sitemap to plain files so the web server can serve them without touching
+Python or the database
+"""
+
+import html
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape as xml_escape
+
+SITE_NAME = 'Mini Golf Every Day'
+DEFAULT_IMAGE = '/images/mged_logo.png'
+POSTS_PER_INDEX_PAGE = 12
+# Post pages share the static directory with the index, so these slugs
+# would be overwritten by it
+RESERVED_SLUGS = frozenset({'index'})
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <title>{title}</title>
+  <meta name="description" content="{description}" />
+  <link rel="canonical" href="{url}" />
+  <link rel="alternate" type="application/rss+xml" title="{site_name} Blog" href="/feed.xml" />
+
+  <!-- Open Graph / Facebook -->
+  <meta property="og:type" content="{og_type}" />
+  <meta property="og:url" content="{url}" />
+  <meta property="og:title" content="{og_title}" />
+  <meta property="og:description" content="{description}" />
+  <meta property="og:image" content="{image}">
+  <meta property="og:site_name" content="{site_name}">
+
+  <!-- Twitter -->
+  <meta name="twitter:card" content="summary_large_image" />
+  <meta property="twitter:url" content="{url}">
+  <meta property="twitter:title" content="{og_title}">
+  <meta property="twitter:description" content="{description}">
+  <meta property="twitter:image" content="{image}">
+{extra_head}
+  <link href="https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Inter&display=swap" rel="stylesheet">
+  <link href="https://cdn.jsdelivr.net/npm/tailwindcss@latest/dist/tailwind.min.css" rel="stylesheet">
+  <link href="/css/mytailwind.css" rel="stylesheet">
+  <link href="/css/styles.css" rel="stylesheet">
+  <link rel="icon" type="image/x-icon" href="/favicon.ico">
+</head>
+
+<body class="bg-white text-gray-800">
+  <header class="bg-green-600 text-white p-4 sticky top-0 z-50 shadow-md">
+    <div class="container mx-auto flex flex-col md:flex-row md:justify-between items-center gap-2 md:gap-0">
+      <a href="/index.html" class="flex items-center space-x-2">
+        <img src="/images/mgedlogoforreal.svg" alt="Mini Golf Logo" class="w-10 h-10">
+        <span class="text-2xl brand">Mini Golf Every Day</span>
+      </a>
+      <nav class="space-x-4">
+        <a href="/index.html" class="hover:underline">Home</a>
+        <a href="/watch.html" class="hover:underline">Watch</a>
+        <a href="/blog.html" class="hover:underline font-semibold">Blog</a>
+        <a href="/about.html" class="hover:underline">About</a>
+        <a href="/contact.html" class="hover:underline">Contact</a>
+      </nav>
+    </div>
+  </header>
+
+  <main class="container mx-auto py-8 px-4">
+{body}
+  </main>
+
+  <footer class="bg-gray-800 text-white py-8 px-4">
+    <div class="container mx-auto text-center">
+      <p class="text-gray-400 mb-4">Making mini golf magical, one putt at a time.</p>
+      <div class="flex justify-center space-x-6">
+        <a href="https://www.tiktok.com/@minigolfeveryday" target="_blank" class="text-gray-400 hover:text-white transition">TikTok</a>
+        <a href="https://www.instagram.com/mini.golf.every.day/" target="_blank" class="text-gray-400 hover:text-white transition">Instagram</a>
+        <a href="/blog/index.html" class="text-gray-400 hover:text-white transition">All posts</a>
+      </div>
+    </div>
+  </footer>
+</body>
+</html>
+"""
+
+POST_BODY_TEMPLATE = """    <article class="max-w-3xl mx-auto">
+      <h1 class="text-3xl md:text-4xl font-bold text-gray-900 mb-3">{title}</h1>
+      <div class="flex flex-wrap items-center text-sm text-gray-500 gap-4 mb-6">
+        <span>By {author}</span>
+        <time datetime="{date_iso}">{date_display}</time>
+{reading_time}
+      </div>
+{featured_image}
+{toc}
+      <div class="prose lg:prose-lg max-w-none prose-headings:text-gray-900 prose-p:text-gray-700">
+{content}
+      </div>
+      <p class="mt-12"><a href="/blog/index.html" class="text-green-600 hover:text-green-800 font-semibold">&larr; More posts</a></p>
+    </article>
+    <script>navigator.sendBeacon && navigator.sendBeacon('/api/blog/posts/{post_id}/view');</script>"""
+
+INDEX_ITEM_TEMPLATE = """      <article class="bg-white rounded-lg shadow-md overflow-hidden p-6">
+        <div class="text-sm text-gray-500 mb-3"><time datetime="{date_iso}">{date_display}</time></div>
+        <h2 class="text-xl font-bold text-gray-900 mb-3"><a href="{href}" class="hover:text-green-600">{title}</a></h2>
+        <p class="text-gray-600 mb-4">{excerpt}</p>
+        <a href="{href}" class="bg-green-600 text-white px-4 py-2 rounded hover:bg-green-700">Read More</a>
+      </article>"""
+
+
+def post_path(slug):
+    """Site-relative URL of a post's static page"""
+    return f'/blog/{slug}.html'
+
+
+def index_path(page):
+    """Site-relative URL of a post index page"""
+    return '/blog/index.html' if page <= 1 else f'/blog/page/{page}.html'
+
+
+def _display_date(iso_value):
+    """Format an ISO timestamp like the client-side blog does"""
+    if not iso_value:
+        return ''
+    try:
+        return datetime.fromisoformat(iso_value).strftime('%B %-d, %Y')
+    except ValueError:
+        return iso_value[:10]
+
+
+def _absolute(site_url, path):
+    """Join a site-relative path (or pass through an absolute URL)"""
+    if not path:
+        return ''
+    if path.startswith(('http://', 'https://')):
+        return path
+    return site_url.rstrip('/') + '/' + path.lstrip('/')
+
+
+def render_toc(toc):
+    """Table of contents list for posts with at least two headings"""
+    if not toc or len(toc) < 2:
+        return ''
+    top_level = min(entry['level'] for entry in toc)
+    items = [
+        f'        <li class="ml-{(entry["level"] - top_level) * 4}">'
+        f'<a href="#{html.escape(entry["id"])}" class="text-green-600 hover:text-green-800">{html.escape(entry["text"])}</a></li>'
+        for entry in toc
+    ]
+    return (
+        '      <nav class="bg-gray-50 rounded-lg p-4 mb-6" aria-label="Table of contents">\n'
+        '        <p class="font-semibold text-gray-900 mb-2">Contents</p>\n'
+        '        <ul class="space-y-1">\n' + '\n'.join(items) + '\n        </ul>\n'
+        '      </nav>'
+    )
+
+
+def render_post_page(post, site_url):
+    """Render one post (a BlogPost.to_dict() with content) as a full page"""
+    title = post.get('meta_title') or post['title']
+    description = post.get('meta_description') or post.get('excerpt') or f"Read {post['title']} on the {SITE_NAME} blog"
+    url = _absolute(site_url, post_path(post['slug']))
+    image = _absolute(site_url, post.get('featured_image') or DEFAULT_IMAGE)
+    date_iso = post.get('published_at') or post.get('created_at') or ''
+
+    structured_data = {
+        '@context': 'https://schema.org',
+        '@type': 'BlogPosting',
+        'headline': post['title'],
+        'description': description,
+        'image': image,
+        'datePublished': date_iso,
+        'dateModified': post.get('updated_at') or date_iso,
+        'author': {'@type': 'Person', 'name': (post.get('author') or {}).get('username', SITE_NAME)},
+        'mainEntityOfPage': url
+    }
+    # "</" must not appear inside the script element
+    json_ld = json.dumps(structured_data, ensure_ascii=False).replace('</', '<\\/')
+
+    # A derived featured image is already the first image in the body
+    featured_image = ''
+    if post.get('featured_image') and not post.get('featured_image_is_auto'):
+        featured_image = (
+            f'      <img src="{html.escape(post["featured_image"])}" alt="{html.escape(post["title"])}" '
+            f'class="w-full rounded-lg max-h-80 object-contain bg-gray-50 mb-6">'
+        )
+
+    body = POST_BODY_TEMPLATE.format(
+        post_id=int(post['id']),
+        title=html.escape(post['title']),
+        author=html.escape((post.get('author') or {}).get('username') or 'MGED Team'),
+        date_iso=html.escape(date_iso),
+        date_display=_display_date(date_iso),
+        reading_time=f"        <span>{post['reading_time']} min read</span>" if post.get('reading_time') else '',
+        featured_image=featured_image,
+        toc=render_toc(post.get('toc')),
+        content=post.get('content') or ''
+    )
+
+    return PAGE_TEMPLATE.format(
+        title=html.escape(f'{title} - {SITE_NAME} Blog'),
+        og_title=html.escape(title),
+        description=html.escape(description),
+        url=html.escape(url),
+        image=html.escape(image),
+        og_type='article',
+        site_name=SITE_NAME,
+        extra_head=f'  <script type="application/ld+json">{json_ld}</script>',
+        body=body
+    )
+
+
+def render_index_page(posts, page, pages, site_url):
+    """Render one page of the post index from to_dict(include_content=False) items"""
+    items = []
+    for post in posts:
+        date_iso = post.get('published_at') or post.get('created_at') or ''
+        items.append(INDEX_ITEM_TEMPLATE.format(
+            href=post_path(post['slug']),
+            title=html.escape(post['title']),
+            excerpt=html.escape(post.get('excerpt') or ''),
+            date_iso=html.escape(date_iso),
+            date_display=_display_date(date_iso)
+        ))
+
+    nav = []
+    if page > 1:
+        nav.append(f'<a href="{index_path(page - 1)}" rel="prev" class="px-4 py-2 bg-gray-200 rounded">&larr; Newer</a>')
+    if page < pages:
+        nav.append(f'<a href="{index_path(page + 1)}" rel="next" class="px-4 py-2 bg-gray-200 rounded">Older &rarr;</a>')
+
+    body = (
+        '    <h1 class="text-5xl brand mb-8 text-green-600 text-center">The Putt Blog</h1>\n'
+        '    <div class="grid md:grid-cols-2 lg:grid-cols-3 gap-8">\n'
+        + '\n'.join(items) +
+        '\n    </div>\n'
+        f'    <nav class="mt-12 flex justify-center gap-4">{"".join(nav)}</nav>'
+    )
+
+    description = 'Stories, tips, and adventures from the world of mini golf.'
+    title = 'The Putt Blog' if page <= 1 else f'The Putt Blog - Page {page}'
+    return PAGE_TEMPLATE.format(
+        title=html.escape(f'{title} - {SITE_NAME}'),
+        og_title=html.escape(title),
+        description=description,
+        url=html.escape(_absolute(site_url, index_path(page))),
+        image=html.escape(_absolute(site_url, DEFAULT_IMAGE)),
+        og_type='website',
+        site_name=SITE_NAME,
+        extra_head='',
+        body=body
+    )
+
+
+def write_file_atomic(path, data):
+    """Write bytes or text via a temp file and rename so readers never see partial pages"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_post_page(static_dir, post, site_url):
+    """Render and store a post page, returning its file path"""
+    path = os.path.join(static_dir, f"{post['slug']}.html")
+    write_file_atomic(path, render_post_page(post, site_url))
+    return path
+
+
+def remove_post_page(static_dir, slug):
+    """Delete a post page if it exists"""
+    if not slug:
+        return
+    path = os.path.join(static_dir, f'{slug}.html')
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def write_index_pages(static_dir, posts, site_url, per_page=POSTS_PER_INDEX_PAGE):
+    """Render every index page for the given (newest first) posts and drop stale ones"""
+    pages = max(1, -(-len(posts) // per_page))
+    for page in range(1, pages + 1):
+        chunk = posts[(page - 1) * per_page:page * per_page]
+        filename = 'index.html' if page == 1 else os.path.join('page', f'{page}.html')
+        write_file_atomic(os.path.join(static_dir, filename), render_index_page(chunk, page, pages, site_url))
+
+    # Remove pages left over from when there were more posts
+    page_dir = os.path.join(static_dir, 'page')
+    if os.path.isdir(page_dir):
+        for name in os.listdir(page_dir):
+            number = name[:-5] if name.endswith('.html') else ''
+            if number.isdigit() and int(number) > pages:
+                os.remove(os.path.join(page_dir, name))
+    return pages
+
+
+# ---------------------------------------------------------------------------
+# RSS feed and sitemap
+# ---------------------------------------------------------------------------
+
+FEED_ITEM_LIMIT = 30
+
+# Top-level pages listed in the sitemap
+SITEMAP_PAGES = ['/', '/watch.html', '/blog.html', '/blog/index.html', '/about.html', '/contact.html']
+
+
+def _parse_timestamp(value):
+    """datetime from an ISO string, a yt-dlp YYYYMMDD date, or a date/datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    value = str(value)
+    try:
+        if len(value) == 8 and value.isdigit():
+            return datetime.strptime(value, '%Y%m%d')
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _rfc822(moment):
+    """RSS date format (timestamps are stored as naive UTC)"""
+    return format_datetime(moment.replace(tzinfo=timezone.utc))
+
+
+def render_rss_feed(posts, videos, site_url, limit=FEED_ITEM_LIMIT):
+    """RSS 2.0 feed of the newest posts and videos, as UTF-8 bytes
+    
+    posts are to_dict(include_content=False) items, videos are catalog
+    entries. Items are merged newest first.
+    """
+    items = []
+    for post in posts:
+        moment = _parse_timestamp(post.get('published_at') or post.get('created_at'))
+        if moment:
+            link = _absolute(site_url, post_path(post['slug']))
+            items.append((moment, post['title'], link, post.get('excerpt') or '', 'Blog'))
+    for video in videos:
+        moment = _parse_timestamp(video.get('upload_date'))
+        if moment and video.get('url'):
+            items.append((moment, video.get('title') or 'New video', video['url'], '', 'Video'))
+    items.sort(key=lambda item: item[0], reverse=True)
+    items = items[:limit]
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">',
+        '<channel>',
+        f'<title>{xml_escape(SITE_NAME)}</title>',
+        f'<link>{xml_escape(_absolute(site_url, "/"))}</link>',
+        f'<atom:link href="{xml_escape(_absolute(site_url, "/feed.xml"))}" rel="self" type="application/rss+xml" />',
+        '<description>Blog posts and daily mini golf videos</description>',
+        '<language>en</language>',
+    ]
+    if items:
+        lines.append(f'<lastBuildDate>{_rfc822(items[0][0])}</lastBuildDate>')
+    for moment, title, link, description, category in items:
+        lines.extend([
+            '<item>',
+            f'<title>{xml_escape(title)}</title>',
+            f'<link>{xml_escape(link)}</link>',
+            f'<guid isPermaLink="true">{xml_escape(link)}</guid>',
+            f'<pubDate>{_rfc822(moment)}</pubDate>',
+            f'<category>{category}</category>',
+        ])
+        if description:
+            lines.append(f'<description>{xml_escape(description)}</description>')
+        lines.append('</item>')
+    lines.extend(['</channel>', '</rss>', ''])
+    return '\n'.join(lines).encode('utf-8')
+
+
+def render_sitemap(posts, videos, site_url):
+    """sitemap.xml for the site pages and every published post, as UTF-8 bytes"""
+    entries = []
+    latest_post = max((_parse_timestamp(post.get('updated_at')) for post in posts), default=None)
+    latest_video = max((_parse_timestamp(video.get('upload_date')) for video in videos
+                        if video.get('upload_date')), default=None)
+    for path in SITEMAP_PAGES:
+        if path == '/watch.html' or path == '/':
+            lastmod = latest_video
+        elif path.startswith('/blog'):
+            lastmod = latest_post
+        else:
+            lastmod = None
+        entries.append((_absolute(site_url, path), lastmod))
+    for post in posts:
+        entries.append((_absolute(site_url, post_path(post['slug'])), _parse_timestamp(post.get('updated_at'))))
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for url, lastmod in entries:
+        lines.append('<url>')
+        lines.append(f'<loc>{xml_escape(url)}</loc>')
+        if lastmod:
+            lines.append(f'<lastmod>{lastmod.strftime("%Y-%m-%d")}</lastmod>')
+        lines.append('</url>')
+    lines.extend(['</urlset>', ''])
+    return '\n'.join(lines).encode('utf-8')
+
+
+def write_if_changed(path, data):
+    """Atomically replace path only when its bytes differ (keeps mtime stable)
+    
+    Returns True if the file was written.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    write_file_atomic(path, data)
+    return True
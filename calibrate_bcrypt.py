@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+bcrypt cost calibration
+Benchmarks password hashing on this machine and recommends the highest
+BCRYPT_ROUNDS value whose hash time fits a latency budget
+
+Usage: python calibrate_bcrypt.py [--target-ms 250] [--min-rounds 10] [--max-rounds 15] [--samples 3]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import bcrypt
+
+# bcrypt's own default and the lowest cost considered acceptable
+DEFAULT_ROUNDS = 12
+MIN_SAFE_ROUNDS = 10
+
+
+def time_hash(rounds, samples):
+    """Median seconds to hash a password at the given cost"""
+    timings = []
+    for _ in range(samples):
+        salt = bcrypt.gensalt(rounds)
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration-password', salt)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recommend a bcrypt cost for this machine')
+    parser.add_argument('--target-ms', type=float, default=250,
+                        help='Latency budget for one hash in milliseconds (default: 250)')
+    parser.add_argument('--min-rounds', type=int, default=MIN_SAFE_ROUNDS,
+                        help=f'Lowest cost to consider (default: {MIN_SAFE_ROUNDS})')
+    parser.add_argument('--max-rounds', type=int, default=15,
+                        help='Highest cost to try (default: 15)')
+    parser.add_argument('--samples', type=int, default=3,
+                        help='Hashes timed per cost (default: 3)')
+    args = parser.parse_args()
+
+    print(f"Timing bcrypt on this machine (budget {args.target_ms:.0f} ms per hash)")
+    print(f"{'rounds':>6} {'median':>10}")
+
+    recommended = None
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed_ms = time_hash(rounds, args.samples) * 1000
+        fits = elapsed_ms <= args.target_ms
+        print(f"{rounds:>6} {elapsed_ms:>8.1f}ms{'' if fits else '  (over budget)'}")
+        if fits:
+            recommended = rounds
+        else:
+            # Each extra round doubles the cost - no point going further
+            break
+
+    print()
+    if recommended is None:
+        print(f"⚠️  Even {args.min_rounds} rounds exceeds {args.target_ms:.0f} ms on this machine.")
+        print(f"   Use BCRYPT_ROUNDS={args.min_rounds} and consider a larger latency budget.")
+        return 1
+
+    print(f"✅ Recommended: BCRYPT_ROUNDS={recommended}")
+    print("   Add it to .env; existing hashes are upgraded on each user's next login.")
+    if recommended < DEFAULT_ROUNDS:
+        print(f"   (below the bcrypt default of {DEFAULT_ROUNDS} - a trade-off for login latency)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Mini Golf Every Day - Write-behind counters
+Aggregates increments in memory and flushes them in batches, so database
+writes scale with the flush rate instead of with traffic
+"""
+
+import atexit
+import threading
+import time
+
+
+class CounterBuffer:
+    """Thread-safe in-process counter buffer with periodic batched flushes
+
+    increment() only touches a dict. A background thread calls
+    flush_func({key: amount, ...}) every flush_interval seconds, or sooner
+    once max_pending hits have accumulated. Pending counts are also flushed
+    at interpreter exit so recycled workers do not lose them. If flush_func
+    raises, the batch is merged back and retried on the next flush.
+    """
+
+    def __init__(self, name, flush_func, flush_interval=10.0, max_pending=500):
+        self.name = name
+        self.flush_func = flush_func
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending = {}
+        self._pending_hits = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+        self.flushes = 0
+        self.flushed_total = 0
+        self.errors = 0
+        self.last_flush = None
+        self.last_error = None
+
+        atexit.register(self.flush)
+
+    def increment(self, key, amount=1):
+        """Add amount to key's pending count"""
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+            self._pending_hits += 1
+            full = self._pending_hits >= self.max_pending
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def pending(self, key):
+        """Not-yet-flushed count for one key"""
+        return self._pending.get(key, 0)
+
+    def discard(self, key):
+        """Drop a key's pending count without writing it
+
+        Waits for a flush in progress first, so a batch taken before the
+        discard is written before the caller goes on to reset the key.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def pending_totals(self):
+        """Copy of every not-yet-flushed count"""
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """Write pending counts now; returns the number of keys flushed"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._pending_hits = 0
+            if not batch:
+                return 0
+            try:
+                self.flush_func(batch)
+            except Exception as e:
+                # Put the batch back so the counts are not lost
+                with self._lock:
+                    for key, amount in batch.items():
+                        self._pending[key] = self._pending.get(key, 0) + amount
+                    self._pending_hits += len(batch)
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"[ERROR] {self.name} flush failed: {e}")
+                return 0
+            self.flushes += 1
+            self.flushed_total += sum(batch.values())
+            self.last_flush = time.time()
+            return len(batch)
+
+    def stats(self):
+        """Counters for the admin metrics endpoint"""
+        pending = self.pending_totals()
+        return {
+            'pending_keys': len(pending),
+            'pending_total': sum(pending.values()),
+            'flushes': self.flushes,
+            'flushed_total': self.flushed_total,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'last_flush': self.last_flush,
+            'flush_interval': self.flush_interval,
+            'max_pending': self.max_pending
+        }
+
+    def _ensure_thread(self):
+        """Start the flusher lazily (after fork, in the worker that uses it)"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=f'{self.name}-flusher', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
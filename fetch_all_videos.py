@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from tiktok_automation import TikTokVideoManager
+from video_fetcher import stream_videos
 
 def cleanup_old_backups(keep_days=3):
     """Clean up old backup files to save disk space"""
@@ -53,7 +54,10 @@ def fetch_all_videos():
     
     # Fetch a large number to ensure we get everything
     # TikTok channels rarely have more than 500 videos
-    all_videos = manager.get_latest_videos_ytdlp(limit=500)
+    fetch_stats = {}
+    all_videos = list(stream_videos(limit=500, timeout=300, stats=fetch_stats))
+    if fetch_stats.get('error'):
+        print(f"⚠️  {fetch_stats['error']} (kept {len(all_videos)} videos fetched before that)")
     
     if not all_videos:
         print("❌ Failed to fetch videos with yt-dlp. Trying fallback method...")
@@ -0,0 +1,259 @@
+"""
+Mini Golf Every Day - Background jobs
+Runs long admin tasks on a worker thread and keeps their state in small
+JSON files, so any worker can report progress and a second request for
+the same kind of job attaches to the one already running
+"""
+
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+import traceback
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: single-flight is per process only
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Job:
+    """State of one background job; mutators persist it for other workers"""
+
+    # Minimum seconds between state writes caused by log lines alone
+    SAVE_INTERVAL = 1.0
+
+    def __init__(self, runner, kind):
+        self.runner = runner
+        self.id = secrets.token_hex(8)
+        self.kind = kind
+        self.status = 'queued'
+        self.phase = None
+        self.counts = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.pid = os.getpid()
+        self._output = deque(maxlen=runner.output_lines)
+        self._lock = threading.Lock()
+        self._saved_at = 0
+
+    def log(self, line):
+        """Append a line to the output tail"""
+        line = str(line).replace('\x00', '').rstrip()
+        if not line:
+            return
+        with self._lock:
+            self._output.append(line[:500])
+        if time.time() - self._saved_at >= self.SAVE_INTERVAL:
+            self.save()
+
+    def set_phase(self, phase):
+        """Record which step the job is on"""
+        self.phase = phase
+        self.save()
+
+    def update_counts(self, **counts):
+        """Merge progress counters (processed, new, updated, ...)"""
+        self.counts.update(counts)
+        self.save()
+
+    def to_dict(self):
+        with self._lock:
+            output = list(self._output)
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'phase': self.phase,
+            'counts': dict(self.counts),
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'pid': self.pid,
+            'output_tail': output
+        }
+
+    def save(self):
+        self._saved_at = time.time()
+        self.runner._write_state(self.to_dict())
+
+
+class JobRunner:
+    """Single-flight background jobs with file-backed state
+
+    submit(kind, func) starts func(job) on a daemon thread unless a job of
+    the same kind is already running anywhere on the host (checked with a
+    flock on <jobs_dir>/<kind>.lock), in which case that job is returned.
+    State files for finished jobs are pruned beyond keep_jobs.
+    """
+
+    def __init__(self, jobs_dir, output_lines=50, keep_jobs=50):
+        self.jobs_dir = jobs_dir
+        self.output_lines = output_lines
+        self.keep_jobs = keep_jobs
+        self._lock = threading.Lock()
+        self._running = {}
+
+    def _state_path(self, job_id):
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    def _lock_path(self, kind):
+        return os.path.join(self.jobs_dir, f'{kind}.lock')
+
+    def _write_state(self, state):
+        """Replace a job's state file atomically"""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.jobs_dir, prefix='.job-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self._state_path(state['id']))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, job_id):
+        """State dict for a job, or None if unknown
+
+        A job still marked running whose worker process has exited is
+        reported as failed.
+        """
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        try:
+            with open(self._state_path(job_id), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('status') in ('queued', 'running') and not _pid_alive(state.get('pid') or 0):
+            state['status'] = 'failed'
+            state['error'] = state.get('error') or 'Worker exited before the job finished'
+        return state
+
+    def latest(self, kind):
+        """State of the most recently finished job of this kind, or None"""
+        try:
+            names = [name for name in os.listdir(self.jobs_dir)
+                     if name.endswith('.json') and JOB_ID_PATTERN.match(name[:-5])]
+        except OSError:
+            return None
+        paths = sorted((os.path.join(self.jobs_dir, name) for name in names), key=os.path.getmtime, reverse=True)
+        for path in paths:
+            state = self.get(os.path.basename(path)[:-5])
+            if state and state.get('kind') == kind and state.get('finished_at'):
+                return state
+        return None
+
+    def current(self, kind):
+        """State of the running job of this kind on the host, or None"""
+        with self._lock:
+            job = self._running.get(kind)
+        if job is not None:
+            return job.to_dict()
+        if fcntl is None:
+            return None
+        try:
+            fd = os.open(self._lock_path(kind), os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Held by the worker running the job; it wrote its id into the lock file
+                job_id = os.pread(fd, 64, 0).decode('ascii', 'replace').strip()
+                return self.get(job_id)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return None
+        finally:
+            os.close(fd)
+
+    def submit(self, kind, func):
+        """Start func(job) in the background; returns (job_state, started)"""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        with self._lock:
+            running = self._running.get(kind)
+            if running is not None:
+                return running.to_dict(), False
+
+            lock_fd = None
+            if fcntl is not None:
+                lock_fd = os.open(self._lock_path(kind), os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(lock_fd)
+                    existing = self.current(kind)
+                    if existing is not None:
+                        return existing, False
+                    raise RuntimeError(f'A {kind} job is starting in another worker')
+
+            job = Job(self, kind)
+            if lock_fd is not None:
+                os.ftruncate(lock_fd, 0)
+                os.pwrite(lock_fd, job.id.encode('ascii'), 0)
+            job.save()
+            self._running[kind] = job
+
+        thread = threading.Thread(target=self._run, args=(job, func, lock_fd), name=f'job-{kind}', daemon=True)
+        thread.start()
+        self._prune()
+        return job.to_dict(), True
+
+    def _run(self, job, func, lock_fd):
+        job.status = 'running'
+        job.started_at = time.time()
+        job.save()
+        try:
+            job.result = func(job)
+            job.status = 'succeeded'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e) or e.__class__.__name__
+            job.log(traceback.format_exc(limit=3))
+            print(f"[ERROR] Background job {job.kind} {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            try:
+                job.save()
+            finally:
+                with self._lock:
+                    self._running.pop(job.kind, None)
+                if lock_fd is not None:
+                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                    os.close(lock_fd)
+
+    def _prune(self):
+        """Delete the oldest state files beyond keep_jobs"""
+        try:
+            paths = [
+                os.path.join(self.jobs_dir, name) for name in os.listdir(self.jobs_dir)
+                if name.endswith('.json') and JOB_ID_PATTERN.match(name[:-5])
+            ]
+            paths.sort(key=os.path.getmtime, reverse=True)
+            for path in paths[self.keep_jobs:]:
+                os.remove(path)
+        except OSError as e:
+            print(f"[WARNING] Could not prune job files: {e}")
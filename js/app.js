@@ -1314,6 +1314,15 @@ MGED.pages.watch = {
     if (listBtn) {
       listBtn.addEventListener('click', () => MGED.pages.watch.switchView('list'));
     }
+    
+    // Count click-throughs to TikTok (one delegated listener for all videos)
+    document.addEventListener('click', (event) => {
+      const link = event.target.closest('.video-item a[href*="tiktok.com"]');
+      const item = link && link.closest('.video-item');
+      if (item && navigator.sendBeacon) {
+        navigator.sendBeacon(`/api/videos/${encodeURIComponent(item.dataset.videoId)}/click`);
+      }
+    });
   }
 };
 
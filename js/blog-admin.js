@@ -7,6 +7,7 @@ class BlogAdminApp {
     this.apiBase = window.location.origin;
     this.editor = null;
     this.currentPostId = null;
+    this.searchTimer = null;
     
     this.init();
   }
@@ -109,6 +110,12 @@ class BlogAdminApp {
     document.getElementById('quick-view-drafts').addEventListener('click', () => this.showPostsManagement('drafts'));
     document.getElementById('quick-manage-posts').addEventListener('click', () => this.showPostsManagement('all'));
     document.getElementById('quick-view-public').addEventListener('click', () => window.open('blog.html', '_blank'));
+
+    // Post search (includes drafts)
+    document.getElementById('admin-post-search').addEventListener('input', (e) => {
+      clearTimeout(this.searchTimer);
+      this.searchTimer = setTimeout(() => this.searchPostsForManagement(e.target.value.trim()), 250);
+    });
     // Mobile-friendly event handling for video pull button
     const pullVideosButton = document.getElementById('quick-pull-videos');
     if (pullVideosButton) {
@@ -251,7 +258,20 @@ class BlogAdminApp {
     }
   }
 
-  handleLogout() {
+  async handleLogout() {
+    // Revoke the token server-side so it stops working everywhere
+    const token = localStorage.getItem('blog_token');
+    if (token) {
+      try {
+        await fetch(`${this.apiBase}/api/auth/logout`, {
+          method: 'POST',
+          headers: { 'Authorization': `Bearer ${token}` }
+        });
+      } catch (error) {
+        console.error('Logout error:', error);
+      }
+    }
+    
     localStorage.removeItem('blog_token');
     this.currentUser = null;
     this.updateAuthUI();
@@ -451,6 +471,32 @@ class BlogAdminApp {
     }
   }
 
+  async searchPostsForManagement(query) {
+    if (query.length < 2) {
+      this.loadPostsForManagement();
+      return;
+    }
+
+    try {
+      const token = localStorage.getItem('blog_token');
+      const response = await fetch(`${this.apiBase}/api/blog/search?q=${encodeURIComponent(query)}&drafts=true&per_page=20`, {
+        headers: {
+          'Authorization': `Bearer ${token}`
+        }
+      });
+
+      if (response.ok) {
+        const data = await response.json();
+        // Ignore responses for queries the user has already typed past
+        if (document.getElementById('admin-post-search').value.trim() !== query) return;
+        document.getElementById('admin-posts-pagination').innerHTML = '';
+        this.displayPostsManagement(data.results, null);
+      }
+    } catch (error) {
+      console.error('Failed to search posts:', error);
+    }
+  }
+
   displayPostsManagement(posts, pagination) {
     const container = document.getElementById('admin-posts-list');
     container.innerHTML = '';
@@ -540,8 +586,9 @@ class BlogAdminApp {
     
     if (postData) {
       document.getElementById('post-title').value = postData.title || '';
-      document.getElementById('post-excerpt').value = postData.excerpt || '';
-      document.getElementById('post-featured-image').value = postData.featured_image || '';
+      // Derived excerpt/image are shown on the site but are not custom values
+      document.getElementById('post-excerpt').value = postData.excerpt_is_auto ? '' : (postData.excerpt || '');
+      document.getElementById('post-featured-image').value = postData.featured_image_is_auto ? '' : (postData.featured_image || '');
       document.getElementById('post-meta-title').value = postData.meta_title || '';
       document.getElementById('post-meta-description').value = postData.meta_description || '';
       document.getElementById('post-published').checked = postData.is_published || false;
@@ -1080,43 +1127,20 @@ class BlogAdminApp {
       
       console.log('🔐 Using token:', token.substring(0, 20) + '...');
       
-      // Mobile-friendly timeout (2 minutes instead of 5)
       const isMobile = /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent);
-      const timeout = isMobile ? 120000 : 300000; // 2 minutes for mobile, 5 minutes for desktop
-      
-      const controller = new AbortController();
-      const timeoutId = setTimeout(() => controller.abort(), timeout);
       
+      // The server starts a background job (202) and we poll its status
       const response = await fetch(`${this.apiBase}/api/admin/pull-videos`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
-        },
-        signal: controller.signal
+        }
       });
-      
-      clearTimeout(timeoutId);
 
       console.log('📡 Response status:', response.status);
-      console.log('📡 Response headers:', response.headers);
 
-      if (response.ok) {
-        const data = await response.json();
-        console.log('✅ Success response:', data);
-        
-        // Mobile-friendly alert with shorter message
-        const message = isMobile 
-          ? `✅ Videos updated!\n\nProcessed: ${data.processed || 0}\nNew: ${data.new || 0}\nUpdated: ${data.updated || 0}`
-          : `✅ Videos updated successfully!\n\nProcessed: ${data.processed || 0} videos\nNew: ${data.new || 0} videos\nUpdated: ${data.updated || 0} videos\n\nMessage: ${data.message || 'Success'}`;
-        
-        alert(message);
-        
-        // Optionally refresh the page or update UI
-        setTimeout(() => {
-          window.location.reload();
-        }, 2000);
-      } else {
+      if (!response.ok) {
         console.error('❌ Error response status:', response.status);
         
         let errorMessage = `HTTP ${response.status}`;
@@ -1126,21 +1150,40 @@ class BlogAdminApp {
           console.error('❌ Error details:', error);
         } catch (parseError) {
           console.error('❌ Could not parse error response:', parseError);
-          const errorText = await response.text();
-          console.error('❌ Raw error response:', errorText);
-          errorMessage = `${errorMessage} - ${errorText.substring(0, 100)}`;
         }
         
         alert(`❌ Failed to pull videos: ${errorMessage}`);
+        return;
       }
+      
+      const started = await response.json();
+      console.log('✅ Video pull job:', started);
+      const job = await this.waitForJob(started.job_id, token, button);
+      
+      if (job.status !== 'succeeded') {
+        console.error('❌ Video pull job failed:', job);
+        alert(`❌ Failed to pull videos: ${job.error || 'Unknown error'}`);
+        return;
+      }
+      
+      const data = job.result || job.counts || {};
+      const dbNote = data.database && data.database.noop ? '\nDatabase: already in sync' : '';
+      
+      // Mobile-friendly alert with shorter message
+      const message = isMobile 
+        ? `✅ Videos updated!\n\nProcessed: ${data.processed || 0}\nNew: ${data.new || 0}\nUpdated: ${data.updated || 0}${dbNote}`
+        : `✅ Videos updated successfully!\n\nProcessed: ${data.processed || 0} videos\nNew: ${data.new || 0} videos\nUpdated: ${data.updated || 0} videos${dbNote}`;
+      
+      alert(message);
+      
+      // Optionally refresh the page or update UI
+      setTimeout(() => {
+        window.location.reload();
+      }, 2000);
     } catch (error) {
       console.error('💥 Network/JavaScript error:', error);
       
       let errorMessage = error.message;
-      if (error.name === 'AbortError') {
-        errorMessage = 'Request timed out. Please try again.';
-      }
-      
       alert(`❌ Failed to pull videos: ${errorMessage}\n\nCheck browser console for details.`);
     } finally {
       // Reset button state
@@ -1152,6 +1195,35 @@ class BlogAdminApp {
   }
 
 
+  // Poll a background job until it finishes; shows the current phase on the button
+  async waitForJob(jobId, token, button, interval = 2000, maxWait = 600000) {
+    const phaseLabels = {
+      fetch: 'Fetching Videos...',
+      database: 'Updating Database...',
+      feeds: 'Updating Feeds...'
+    };
+    const deadline = Date.now() + maxWait;
+    
+    while (Date.now() < deadline) {
+      await new Promise(resolve => setTimeout(resolve, interval));
+      
+      const response = await fetch(`${this.apiBase}/api/admin/jobs/${jobId}`, {
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
+      if (!response.ok) {
+        throw new Error(`Could not check job status (HTTP ${response.status})`);
+      }
+      
+      const { job } = await response.json();
+      if (job.status === 'succeeded' || job.status === 'failed') {
+        return job;
+      }
+      if (button && phaseLabels[job.phase]) {
+        button.textContent = phaseLabels[job.phase];
+      }
+    }
+    throw new Error('Video pull is still running - check again in a few minutes');
+  }
 
   showMiniGolfDialog() {
     // Remove any existing modals first
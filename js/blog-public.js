@@ -5,6 +5,8 @@ class PublicBlogApp {
     this.apiBase = window.location.origin;
     this.currentPosts = []; // Store current posts for navigation
     this.currentPostIndex = -1; // Track current post index
+    this.searchTimer = null; // Debounce timer for the search box
+    this.searchController = null; // Aborts superseded search requests
     
     // Create keyboard handler once to avoid multiple event listeners
     this.keyboardHandler = (e) => {
@@ -75,6 +77,62 @@ class PublicBlogApp {
     if (retryBtn) {
       retryBtn.addEventListener('click', () => this.loadBlogPosts());
     }
+
+    // Search box - debounced so typing sends one request per pause
+    const searchInput = document.getElementById('blog-search');
+    if (searchInput) {
+      searchInput.addEventListener('input', () => {
+        clearTimeout(this.searchTimer);
+        this.searchTimer = setTimeout(() => this.searchPosts(searchInput.value.trim()), 250);
+      });
+    }
+  }
+
+  async searchPosts(query) {
+    const status = document.getElementById('search-status');
+
+    // Cancel any search still in flight
+    if (this.searchController) {
+      this.searchController.abort();
+    }
+
+    if (query.length < 2) {
+      this.searchController = null;
+      if (status) status.classList.add('hidden');
+      this.loadBlogPosts();
+      return;
+    }
+
+    this.searchController = new AbortController();
+
+    try {
+      const response = await fetch(`${this.apiBase}/api/blog/search?q=${encodeURIComponent(query)}&per_page=12`, {
+        signal: this.searchController.signal
+      });
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      const data = await response.json();
+
+      if (status) {
+        status.textContent = data.results.length
+          ? `Showing ${data.results.length}${data.has_more ? '+' : ''} result${data.results.length === 1 ? '' : 's'} for "${query}"`
+          : `No posts match "${query}"`;
+        status.classList.remove('hidden');
+      }
+
+      this.displayPosts(data.results);
+      const paginationContainer = document.getElementById('pagination');
+      if (paginationContainer) paginationContainer.innerHTML = '';
+      this.showPosts();
+
+    } catch (error) {
+      if (error.name === 'AbortError') return;
+      console.error('Error searching blog posts:', error);
+      this.showErrorState();
+    }
   }
 
   async loadBlogPosts(page = 1) {
@@ -123,23 +181,28 @@ class PublicBlogApp {
         <div class="p-6">
           <div class="flex items-center justify-between text-sm text-gray-500 mb-3">
             <span>By ${this.escapeHtml(post.author?.username || 'MGED Team')}</span>
+            ${post.reading_time ? `<span>${post.reading_time} min read</span>` : ''}
             <time datetime="${post.created_at}">${this.formatDate(post.created_at)}</time>
           </div>
           
           <h2 class="text-xl font-bold text-gray-900 mb-3 hover:text-green-600 transition-colors">
-            <a href="?post=${post.slug}" onclick="publicBlog.showPostBySlug('${post.slug}'); return false;" class="text-decoration-none">
+            <a href="/blog/${post.slug}.html" onclick="publicBlog.showPostBySlug('${post.slug}'); return false;" class="text-decoration-none">
               ${this.escapeHtml(post.title)}
             </a>
           </h2>
           
-          ${post.excerpt ? `
+          ${post.snippet ? `
+            <p class="text-gray-600 mb-4 line-clamp-3">
+              ${post.snippet}
+            </p>
+          ` : post.excerpt ? `
             <p class="text-gray-600 mb-4 line-clamp-3">
               ${this.escapeHtml(post.excerpt)}
             </p>
           ` : ''}
           
           <div class="flex items-center justify-between">
-            <a href="?post=${post.slug}" onclick="publicBlog.showPostBySlug('${post.slug}'); return false;" 
+            <a href="/blog/${post.slug}.html" onclick="publicBlog.showPostBySlug('${post.slug}'); return false;" 
                class="bg-green-600 text-white px-4 py-2 rounded hover:bg-green-700 transition-colors text-decoration-none">
               Read More
             </a>
@@ -167,10 +230,11 @@ class PublicBlogApp {
       }
       
       const data = await response.json();
-      const post = data.post;
+      const post = { ...data.post, related: data.related || [] };
       
       // Update URL and title for the current post
       this.updateUrlAndTitle(post);
+      this.recordView(post.id);
       
       // Check if we have previous/next posts
       const validIndex = this.currentPostIndex >= 0 && this.currentPostIndex < this.currentPosts.length;
@@ -250,7 +314,7 @@ class PublicBlogApp {
           </div>
           
           <div class="flex-1 overflow-y-auto p-3 sm:p-4 lg:p-6">
-            ${post.featured_image ? `
+            ${post.featured_image && !post.featured_image_is_auto ? `
               <div class="mb-4 sm:mb-6">
                 <img src="${this.escapeHtml(post.featured_image)}" 
                      alt="${this.escapeHtml(post.title)}" 
@@ -261,6 +325,7 @@ class PublicBlogApp {
             <div class="prose prose-sm sm:prose lg:prose-lg max-w-none prose-headings:text-gray-900 prose-p:text-gray-700">
               ${post.content}
             </div>
+            ${this.renderRelatedPosts(post.related)}
           </div>
         </div>
       `;
@@ -298,7 +363,7 @@ class PublicBlogApp {
       }
       
       const data = await response.json();
-      const post = data.post;
+      const post = { ...data.post, related: data.related || [] };
       
       // Find the index of the current post in the list
       this.currentPostIndex = this.currentPosts.findIndex(p => p.id === post.id);
@@ -385,7 +450,7 @@ class PublicBlogApp {
   }
 
   sharePost(slug, title) {
-    const url = `${window.location.origin}/blog.html?post=${slug}`;
+    const url = `${window.location.origin}/blog/${slug}.html`;
     
     // Try to use native share API if available
     if (navigator.share) {
@@ -513,6 +578,32 @@ class PublicBlogApp {
     }, 5000);
   }
 
+  recordView(postId) {
+    // Fire-and-forget; the server buffers counts
+    if (navigator.sendBeacon) {
+      navigator.sendBeacon(`${this.apiBase}/api/blog/posts/${postId}/view`);
+    }
+  }
+
+  renderRelatedPosts(related) {
+    if (!related || related.length === 0) return '';
+    
+    return `
+      <div class="mt-8 pt-6 border-t border-gray-200">
+        <h3 class="text-lg font-bold text-gray-900 mb-3">Related posts</h3>
+        <ul class="space-y-2">
+          ${related.map(post => `
+            <li>
+              <a href="/blog/${post.slug}.html" onclick="publicBlog.closePost(); publicBlog.showPostBySlug('${post.slug}'); return false;"
+                 class="text-green-600 hover:text-green-800 font-semibold">${this.escapeHtml(post.title)}</a>
+              ${post.reading_time ? `<span class="text-sm text-gray-500 ml-2">${post.reading_time} min read</span>` : ''}
+            </li>
+          `).join('')}
+        </ul>
+      </div>
+    `;
+  }
+
   escapeHtml(text) {
     if (text === null || text === undefined) return '';
     if (typeof text !== 'string') return String(text);
@@ -536,6 +627,8 @@ class PublicBlogApp {
   }
 
   displayFullPost(post) {
+    this.recordView(post.id);
+    
     // Check if we have previous/next posts
     const validIndex = this.currentPostIndex >= 0 && this.currentPostIndex < this.currentPosts.length;
     const hasPrevious = validIndex && this.currentPostIndex > 0;
@@ -614,7 +707,7 @@ class PublicBlogApp {
         </div>
         
         <div class="flex-1 overflow-y-auto p-3 sm:p-4 lg:p-6">
-          ${post.featured_image ? `
+          ${post.featured_image && !post.featured_image_is_auto ? `
             <div class="mb-4 sm:mb-6">
               <img src="${this.escapeHtml(post.featured_image)}" 
                    alt="${this.escapeHtml(post.title)}" 
@@ -625,6 +718,7 @@ class PublicBlogApp {
           <div class="prose prose-sm sm:prose lg:prose-lg max-w-none prose-headings:text-gray-900 prose-p:text-gray-700">
             ${post.content}
           </div>
+          ${this.renderRelatedPosts(post.related)}
         </div>
       </div>
     `;
@@ -683,7 +777,7 @@ class PublicBlogApp {
       }
       
       const data = await response.json();
-      const fullPost = data.post;
+      const fullPost = { ...data.post, related: data.related || [] };
       
       // Close existing modal and show new one with the full post data
       this.closePost();
@@ -0,0 +1,92 @@
+"""
+Mini Golf Every Day - Login throttling
+In-memory token buckets with exponential backoff, keyed by username or
+client IP, checked before any database or bcrypt work
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class LoginThrottle:
+    """Per-key token bucket plus exponential backoff after repeated failures
+
+    Every attempt spends one token; tokens refill at refill_per_minute up to
+    capacity. After free_failures consecutive failures each further failure
+    blocks the key for backoff_base * 2^n seconds (capped at max_backoff).
+    At most max_keys keys are tracked; the least recently seen is evicted.
+    """
+
+    def __init__(self, capacity=5, refill_per_minute=5, free_failures=3,
+                 backoff_base=2, max_backoff=900, max_keys=10000):
+        self.capacity = capacity
+        self.refill_rate = refill_per_minute / 60.0
+        self.free_failures = free_failures
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, consecutive_failures, blocked_until]
+        self._state = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def _entry(self, key, now):
+        entry = self._state.get(key)
+        if entry is None:
+            entry = self._state[key] = [float(self.capacity), now, 0, 0.0]
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._state.move_to_end(key)
+            entry[0] = min(self.capacity, entry[0] + (now - entry[1]) * self.refill_rate)
+            entry[1] = now
+        return entry
+
+    def attempt(self, key):
+        """Spend a token for an attempt; returns 0 if allowed, else seconds to wait"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry(key, now)
+            if entry[3] > now:
+                self.rejected += 1
+                return math.ceil(entry[3] - now)
+            if entry[0] < 1:
+                self.rejected += 1
+                return math.ceil((1 - entry[0]) / self.refill_rate)
+            entry[0] -= 1
+            self.allowed += 1
+            return 0
+
+    def failure(self, key):
+        """Record a failed attempt, starting or extending the backoff"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry(key, now)
+            entry[2] += 1
+            excess = entry[2] - self.free_failures
+            if excess > 0:
+                entry[3] = now + min(self.max_backoff, self.backoff_base * 2 ** (excess - 1))
+
+    def success(self, key):
+        """Forget a key's failures after a successful login"""
+        with self._lock:
+            self._state.pop(key, None)
+
+    def stats(self):
+        """Counters for the admin metrics endpoint"""
+        now = time.monotonic()
+        with self._lock:
+            blocked = sum(1 for entry in self._state.values() if entry[3] > now)
+            tracked = len(self._state)
+        return {
+            'tracked_keys': tracked,
+            'blocked_keys': blocked,
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'evictions': self.evictions
+        }
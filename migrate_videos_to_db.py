@@ -7,9 +7,61 @@ This maintains compatibility with GitHub Actions while moving to database storag
 import os
 import json
 import sys
+import time
+import hashlib
+import tempfile
 import pymysql
 from datetime import datetime
 from dotenv import load_dotenv
+from video_catalog import write_catalog
+
+# Catalog path next to this script, so it resolves the same when imported by the server
+VIDEO_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiktok_videos.json')
+# Hashes of the last successful sync, used to skip syncs when nothing changed
+SYNC_STATE_FILE = os.environ.get(
+    'VIDEO_SYNC_STATE_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.video_sync_state.json')
+)
+
+def content_hash(videos):
+    """Order-independent SHA-256 of a list of video records"""
+    ordered = sorted(videos, key=lambda video: str(video.get('video_id', '')))
+    encoded = json.dumps(ordered, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def database_identity():
+    """Which database a sync state belongs to"""
+    return f"{os.environ.get('DB_HOST', 'localhost')}:{os.environ.get('DB_PORT', 3306)}/{os.environ.get('DB_NAME')}"
+
+def load_sync_state():
+    """State of the last successful sync, or {} if there is none"""
+    try:
+        with open(SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_sync_state(state, log=print):
+    """Replace the sync state file atomically"""
+    directory = os.path.dirname(SYNC_STATE_FILE) or '.'
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.sync-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, SYNC_STATE_FILE)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    except OSError as e:
+        # Not fatal: the next run just does a full sync
+        log(f"[WARNING] Could not save sync state: {e}")
+
+def count_database_videos(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) as count FROM videos")
+        return cursor.fetchone()['count']
 
 def load_environment():
     """Load environment variables"""
@@ -25,7 +77,7 @@ def load_environment():
         return False
     return True
 
-def connect_to_database():
+def connect_to_database(log=print):
     """Connect to MySQL database"""
     try:
         connection = pymysql.connect(
@@ -37,17 +89,17 @@ def connect_to_database():
             charset='utf8mb4',
             cursorclass=pymysql.cursors.DictCursor
         )
-        print(f"[OK] Connected to MySQL database: {os.environ.get('DB_NAME')}")
+        log(f"[OK] Connected to MySQL database: {os.environ.get('DB_NAME')}")
         return connection
     except Exception as e:
-        print(f"[ERROR] Database connection failed: {e}")
-        print(f"   Host: {os.environ.get('DB_HOST', 'localhost')}")
-        print(f"   Port: {os.environ.get('DB_PORT', 3306)}")
-        print(f"   Database: {os.environ.get('DB_NAME')}")
-        print(f"   User: {os.environ.get('DB_USER')}")
+        log(f"[ERROR] Database connection failed: {e}")
+        log(f"   Host: {os.environ.get('DB_HOST', 'localhost')}")
+        log(f"   Port: {os.environ.get('DB_PORT', 3306)}")
+        log(f"   Database: {os.environ.get('DB_NAME')}")
+        log(f"   User: {os.environ.get('DB_USER')}")
         return None
 
-def create_videos_table(connection):
+def create_videos_table(connection, log=print):
     """Create videos table if it doesn't exist"""
     try:
         with connection.cursor() as cursor:
@@ -80,33 +132,33 @@ def create_videos_table(connection):
             except pymysql.Error as e:
                 # Index might already exist
                 if e.args[0] != 1061:  # 1061 = Duplicate key name
-                    print(f"[WARNING] Index creation warning: {e}")
+                    log(f"[WARNING] Index creation warning: {e}")
             
         connection.commit()
-        print("[OK] Videos table created/verified")
+        log("[OK] Videos table created/verified")
         return True
     except Exception as e:
-        print(f"[ERROR] Failed to create videos table: {e}")
+        log(f"[ERROR] Failed to create videos table: {e}")
         return False
 
-def load_json_videos():
+def load_json_videos(log=print):
     """Load videos from tiktok_videos.json"""
     try:
-        if os.path.exists('tiktok_videos.json'):
-            with open('tiktok_videos.json', 'r', encoding='utf-8') as f:
+        if os.path.exists(VIDEO_DATA_FILE):
+            with open(VIDEO_DATA_FILE, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             videos = data.get('videos', [])
-            print(f"[OK] Loaded {len(videos)} videos from JSON file")
+            log(f"[OK] Loaded {len(videos)} videos from JSON file")
             return videos
         else:
-            print("[WARNING] tiktok_videos.json not found - starting with empty database")
+            log("[WARNING] tiktok_videos.json not found - starting with empty database")
             return []
     except Exception as e:
-        print(f"[ERROR] Failed to load JSON file: {e}")
+        log(f"[ERROR] Failed to load JSON file: {e}")
         return []
 
-def migrate_videos_to_database(connection, videos):
-    """Migrate videos from JSON to database"""
+def migrate_videos_to_database(connection, videos, log=print, result=None):
+    """Migrate videos from JSON to database; counts go into result if given"""
     try:
         migrated = 0
         skipped = 0
@@ -122,7 +174,7 @@ def migrate_videos_to_database(connection, videos):
                 comment_count = video.get('comment_count', 0)
                 
                 if not video_id:
-                    print(f"[WARNING] Skipping video with no ID: {video}")
+                    log(f"[WARNING] Skipping video with no ID: {video}")
                     skipped += 1
                     continue
                 
@@ -144,23 +196,25 @@ def migrate_videos_to_database(connection, videos):
                     migrated += 1
                     
                 except Exception as e:
-                    print(f"[WARNING] Failed to migrate video {video_id}: {e}")
+                    log(f"[WARNING] Failed to migrate video {video_id}: {e}")
                     skipped += 1
         
         connection.commit()
-        print(f"[OK] Migration complete: {migrated} migrated, {skipped} skipped")
+        if result is not None:
+            result.update({'upserted': migrated, 'skipped': skipped})
+        log(f"[OK] Migration complete: {migrated} migrated, {skipped} skipped")
         return True
         
     except Exception as e:
-        print(f"[ERROR] Migration failed: {e}")
+        log(f"[ERROR] Migration failed: {e}")
         return False
 
-def sync_database_to_json(connection):
-    """Sync database back to JSON for GitHub Actions compatibility"""
+def sync_database_to_json(connection, log=print, result=None):
+    """Sync database back to JSON for GitHub Actions compatibility; the output hash goes into result if given"""
     try:
         with connection.cursor() as cursor:
             cursor.execute("""
-                SELECT video_id, title, upload_date, url
+                SELECT video_id, title, upload_date, url, view_count, like_count, comment_count
                 FROM videos
                 ORDER BY upload_date DESC, created_at DESC
             """)
@@ -174,102 +228,197 @@ def sync_database_to_json(connection):
                 'video_id': video['video_id'],
                 'title': video['title'] or '',
                 'upload_date': video['upload_date'] or '',
-                'url': video['url'] or f"https://www.tiktok.com/@minigolfeveryday/video/{video['video_id']}"
+                'url': video['url'] or f"https://www.tiktok.com/@minigolfeveryday/video/{video['video_id']}",
+                'view_count': video['view_count'] or 0,
+                'like_count': video['like_count'] or 0,
+                'comment_count': video['comment_count'] or 0
             })
         
-        # Create JSON structure
-        json_data = {
-            'videos': json_videos,
-            'last_updated': datetime.now().isoformat(),
-            'total_count': len(json_videos)
-        }
+        # Write to JSON file (atomically, with the .gz sibling)
+        write_catalog(VIDEO_DATA_FILE, json_videos)
         
-        # Write to JSON file
-        with open('tiktok_videos.json', 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"[OK] Synced {len(json_videos)} videos to tiktok_videos.json")
+        if result is not None:
+            result['output_hash'] = content_hash(json_videos)
+        log(f"[OK] Synced {len(json_videos)} videos to tiktok_videos.json")
         return True
         
     except Exception as e:
-        print(f"[ERROR] Failed to sync to JSON: {e}")
+        log(f"[ERROR] Failed to sync to JSON: {e}")
         return False
 
-def verify_migration(connection):
-    """Verify the migration was successful"""
+def verify_migration(connection, log=print, result=None):
+    """Verify the migration was successful; counts go into result if given"""
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) as count FROM videos")
-            db_count = cursor.fetchone()['count']
+        db_count = count_database_videos(connection)
         
         # Check JSON file
         json_count = 0
-        if os.path.exists('tiktok_videos.json'):
-            with open('tiktok_videos.json', 'r') as f:
+        if os.path.exists(VIDEO_DATA_FILE):
+            with open(VIDEO_DATA_FILE, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 json_count = len(data.get('videos', []))
         
-        print(f"[INFO] Verification:")
-        print(f"   Database videos: {db_count}")
-        print(f"   JSON file videos: {json_count}")
+        if result is not None:
+            result.update({'db_count': db_count, 'json_count': json_count})
+        
+        log(f"[INFO] Verification:")
+        log(f"   Database videos: {db_count}")
+        log(f"   JSON file videos: {json_count}")
         
         if db_count == json_count and db_count > 0:
-            print("[OK] Migration verified successfully")
+            log("[OK] Migration verified successfully")
             return True
         else:
-            print("[WARNING] Video counts don't match")
+            log("[WARNING] Video counts don't match")
             return False
             
     except Exception as e:
-        print(f"[ERROR] Verification failed: {e}")
+        log(f"[ERROR] Verification failed: {e}")
         return False
 
-def main():
-    print("MIGRATING VIDEOS FROM JSON TO DATABASE")
-    print("=" * 50)
+def run_migration(log=print, force=False):
+    """Create the table, upsert the JSON catalog, sync it back and verify
     
-    # Load environment
-    if not load_environment():
-        sys.exit(1)
+    Expects the database environment to be loaded already (the server
+    imports and calls this directly). Returns a result record: success,
+    noop, upserted/skipped counts, db_count/json_count from verification,
+    verified, input_hash/output_hash, per-phase timings in seconds
+    (connect, load, upsert, sync, verify) and error.
+    
+    If the catalog's content hash matches the input or output of the last
+    successful sync to the same database, and the database still holds the
+    same number of videos, the upsert, sync and verification are skipped
+    and the record has noop=True. force=True always does the full sync.
+    """
+    result = {
+        'success': False,
+        'noop': False,
+        'upserted': 0,
+        'skipped': 0,
+        'db_count': None,
+        'json_count': None,
+        'verified': False,
+        'input_hash': None,
+        'output_hash': None,
+        'timings': {},
+        'error': None
+    }
+    timings = result['timings']
+    
+    def timed(phase, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[phase] = round(time.perf_counter() - started, 3)
     
-    # Connect to database
-    connection = connect_to_database()
+    connection = timed('connect', connect_to_database, log=log)
     if not connection:
-        sys.exit(1)
+        result['error'] = 'Database connection failed'
+        return result
     
     try:
         # Create videos table
-        if not create_videos_table(connection):
-            sys.exit(1)
+        if not create_videos_table(connection, log=log):
+            result['error'] = 'Failed to create videos table'
+            return result
         
         # Load videos from JSON
-        videos = load_json_videos()
+        videos = timed('load', load_json_videos, log=log)
+        result['input_hash'] = content_hash(videos)
+        
+        # Skip everything below if this exact catalog was already synced
+        state = load_sync_state()
+        if (not force and videos
+                and state.get('database') == database_identity()
+                and result['input_hash'] in (state.get('input_hash'), state.get('output_hash'))):
+            db_count = count_database_videos(connection)
+            if db_count == state.get('db_count'):
+                result.update({
+                    'success': True,
+                    'noop': True,
+                    'verified': True,
+                    'db_count': db_count,
+                    'json_count': len(videos),
+                    'output_hash': state.get('output_hash')
+                })
+                log(f"[OK] Catalog unchanged since the last sync ({db_count} videos) - nothing to do")
+                return result
         
         # Migrate to database
-        if not migrate_videos_to_database(connection, videos):
-            sys.exit(1)
+        if not timed('upsert', migrate_videos_to_database, connection, videos, log=log, result=result):
+            result['error'] = 'Migration failed'
+            return result
         
         # Sync back to JSON for GitHub Actions compatibility
-        if not sync_database_to_json(connection):
-            sys.exit(1)
+        if not timed('sync', sync_database_to_json, connection, log=log, result=result):
+            result['error'] = 'Failed to sync to JSON'
+            return result
         
         # Verify migration
-        if not verify_migration(connection):
-            print("[WARNING] Migration completed but verification failed")
-        
-        print("\n[OK] MIGRATION COMPLETE!")
-        print("WHAT HAPPENED:")
-        print("  1. Created videos table in MySQL database")
-        print("  2. Migrated all videos from JSON to database")
-        print("  3. Synced database back to JSON for GitHub Actions")
-        print("  4. Your GitHub Actions will continue to work normally")
-        print("\nNEXT STEPS:")
-        print("  1. Update server.py to read from database instead of JSON")
-        print("  2. GitHub Actions will keep JSON file in sync with database")
-        print("  3. Best of both worlds: database reliability + GitHub Actions compatibility")
-        
+        result['verified'] = timed('verify', verify_migration, connection, log=log, result=result)
+        if not result['verified']:
+            log("[WARNING] Migration completed but verification failed")
+        else:
+            save_sync_state({
+                'database': database_identity(),
+                'input_hash': result['input_hash'],
+                'output_hash': result['output_hash'],
+                'db_count': result['db_count'],
+                'synced_at': datetime.now().isoformat()
+            }, log=log)
+        result['success'] = True
+        return result
     finally:
         connection.close()
 
+def write_result_record(record, result_file=None, json_line=False):
+    """Emit the result record as a file and/or a final single-line JSON on stdout"""
+    if result_file:
+        with open(result_file, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+    if json_line:
+        print(json.dumps(record, separators=(',', ':')), flush=True)
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Sync tiktok_videos.json into the MySQL videos table')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the result record as a single JSON line at the end of the output')
+    parser.add_argument('--result-file',
+                        help='Write the result record (counts, timings) to this JSON file')
+    parser.add_argument('--force', action='store_true',
+                        help='Sync even if the catalog is unchanged since the last sync')
+    args = parser.parse_args()
+    
+    print("MIGRATING VIDEOS FROM JSON TO DATABASE")
+    print("=" * 50)
+    
+    # Load environment
+    if not load_environment():
+        sys.exit(1)
+    
+    result = run_migration(force=args.force)
+    if not result['success']:
+        write_result_record(result, args.result_file, args.json)
+        sys.exit(1)
+    if result['noop']:
+        print("\n[OK] DATABASE ALREADY IN SYNC - nothing changed since the last sync")
+        write_result_record(result, args.result_file, args.json)
+        return
+    
+    print("\n[OK] MIGRATION COMPLETE!")
+    print("WHAT HAPPENED:")
+    print("  1. Created videos table in MySQL database")
+    print("  2. Migrated all videos from JSON to database")
+    print("  3. Synced database back to JSON for GitHub Actions")
+    print("  4. Your GitHub Actions will continue to work normally")
+    print("\nNEXT STEPS:")
+    print("  1. Update server.py to read from database instead of JSON")
+    print("  2. GitHub Actions will keep JSON file in sync with database")
+    print("  3. Best of both worlds: database reliability + GitHub Actions compatibility")
+    write_result_record(result, args.result_file, args.json)
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,148 @@
+"""
+Mini Golf Every Day - Bounded bcrypt executor
+Runs password hashing on a small dedicated thread pool with an admission
+limit, so a burst of logins queues (or is rejected) instead of tying up
+every request worker
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool is saturated; retry_after is in seconds"""
+
+    def __init__(self, retry_after=1):
+        super().__init__('Password hashing is busy')
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """bcrypt on a bounded pool: workers threads plus at most max_queue waiting
+
+    bcrypt releases the GIL while hashing, so the pool threads use real CPU
+    in parallel while the calling request thread just waits. Calls beyond
+    workers + max_queue fail immediately with HasherBusy. A caller waits
+    only about as long as its place in the queue should take at the recent
+    p99 hash time (never more than timeout seconds), then gets HasherBusy.
+    """
+
+    # Samples needed before the p99 estimate replaces the plain timeout
+    MIN_SAMPLES = 8
+    # Margin over the p99 estimate before a waiting caller gives up
+    WAIT_HEADROOM = 1.5
+
+    def __init__(self, workers=2, max_queue=4, timeout=2.0, sample_size=256):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._hash_ms = deque(maxlen=sample_size)
+        self._wait_ms = deque(maxlen=sample_size)
+        self.calls = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def hash(self, password, rounds=None):
+        """Hash a password; rounds defaults to the bcrypt library default"""
+        salt = bcrypt.gensalt(rounds) if rounds else bcrypt.gensalt()
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def check(self, password, hashed):
+        """Compare a password against a stored hash"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy(self._retry_after())
+
+        submitted = time.perf_counter()
+        timing = {}
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timing['wait'] = started - submitted
+                timing['run'] = time.perf_counter() - started
+
+        with self._lock:
+            position = self._in_flight
+            self._in_flight += 1
+            self.calls += 1
+        wait = self._wait_budget(position)
+        try:
+            future = self._executor.submit(timed)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release(timing))
+
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise HasherBusy(self._retry_after())
+
+    def _release(self, timing=None):
+        with self._lock:
+            self._in_flight -= 1
+            if timing:
+                self._wait_ms.append(timing['wait'] * 1000)
+                self._hash_ms.append(timing['run'] * 1000)
+        self._slots.release()
+
+    def _wait_budget(self, position):
+        """Seconds a caller entering at queue position should need, capped at timeout"""
+        with self._lock:
+            if len(self._hash_ms) < self.MIN_SAMPLES:
+                return self.timeout
+            ordered = sorted(self._hash_ms)
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        rounds = position // self.workers + 1
+        return min(self.timeout, p99 * self.WAIT_HEADROOM * rounds / 1000)
+
+    def _retry_after(self):
+        """Seconds until a slot is likely free, from recent hash times"""
+        with self._lock:
+            typical = sorted(self._hash_ms)[len(self._hash_ms) // 2] if self._hash_ms else 250
+        backlog = (self.workers + self.max_queue) / self.workers
+        return max(1, round(typical * backlog / 1000))
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return {'p50': None, 'p95': None, 'max': None}
+        ordered = sorted(samples)
+        return {
+            'p50': round(ordered[len(ordered) // 2], 1),
+            'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+            'max': round(ordered[-1], 1)
+        }
+
+    def stats(self):
+        """Counters and recent timing percentiles (milliseconds)"""
+        with self._lock:
+            hash_ms, wait_ms = list(self._hash_ms), list(self._wait_ms)
+            in_flight = self._in_flight
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'in_flight': in_flight,
+            'calls': self.calls,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'hash_ms': self._percentiles(hash_ms),
+            'queue_wait_ms': self._percentiles(wait_ms)
+        }
@@ -0,0 +1,94 @@
+"""
+Mini Golf Every Day - Rate limiting
+Fixed-memory sliding-window counters with idle-key eviction
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class SlidingWindowLimiter:
+    """Allow at most `limit` hits per `window` seconds per key
+
+    Each key stores two counters (this window and the previous one) and the
+    estimate is previous * (fraction of the previous window still inside the
+    sliding window) + current. That is O(1) time and memory per key. Keys
+    idle for longer than idle_ttl are evicted, and at most max_keys keys are
+    tracked (least recently seen evicted first).
+    """
+
+    def __init__(self, limit, window=60, max_keys=10000, idle_ttl=None):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.idle_ttl = idle_ttl or 2 * window
+        # key -> [window_start, previous_count, current_count, last_seen]
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _expire_idle(self, now):
+        """Drop keys idle longer than idle_ttl (oldest are at the front)"""
+        while self._keys:
+            key, entry = next(iter(self._keys.items()))
+            if now - entry[3] < self.idle_ttl:
+                break
+            del self._keys[key]
+            self.expired += 1
+
+    def hit(self, key):
+        """Count a request; returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        window_start = now - (now % self.window)
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._keys.get(key)
+            if entry is None:
+                entry = self._keys[key] = [window_start, 0, 0, now]
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._keys.move_to_end(key)
+                if entry[0] != window_start:
+                    # Roll forward; a gap of two+ windows clears both counters
+                    entry[1] = entry[2] if window_start - entry[0] < 2 * self.window else 0
+                    entry[2] = 0
+                    entry[0] = window_start
+            entry[3] = now
+
+            elapsed = (now - window_start) / self.window
+            estimate = entry[1] * (1 - elapsed) + entry[2]
+            if estimate >= self.limit:
+                self.limited += 1
+                return False, self._retry_after(entry, now, elapsed)
+            entry[2] += 1
+            self.allowed += 1
+            return True, 0
+
+    def _retry_after(self, entry, now, elapsed):
+        """Seconds until the estimate drops below the limit"""
+        if entry[2] >= self.limit or entry[1] == 0:
+            # Only the next window helps
+            return max(1, math.ceil(entry[0] + self.window - now))
+        # previous * (1 - t) + current < limit  =>  t > 1 - (limit - current) / previous
+        needed = 1 - (self.limit - entry[2]) / entry[1]
+        return max(1, math.ceil((needed - elapsed) * self.window))
+
+    def stats(self):
+        """Counters for the admin metrics endpoint"""
+        return {
+            'limit': self.limit,
+            'window': self.window,
+            'tracked_keys': len(self._keys),
+            'max_keys': self.max_keys,
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'evicted': self.evicted,
+            'expired': self.expired
+        }
@@ -6,24 +6,39 @@ Secure Flask application with PostgreSQL, authentication, and blog functionality
 
 import os
 import re
+import html
 import hashlib
 import secrets
 import smtplib
 from datetime import datetime, timedelta
 from functools import wraps
 import json
+import threading
 import traceback
 
-import bcrypt
 import jwt
 from flask import Flask, request, jsonify, session, render_template, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy.dialects import mysql as mysql_dialect, sqlite as sqlite_dialect
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from blog_content import (html_to_text, search_terms, build_snippet, highlight_terms, sanitize_html,
+                          derive_post_metadata)
+import blog_static
+from blog_related import compute_related_posts
+from counter_buffer import CounterBuffer
+from ttl_cache import TTLCache
+from password_hasher import PasswordHasher, HasherBusy
+from login_throttle import LoginThrottle
+from rate_limiter import SlidingWindowLimiter
+from shared_state import SharedWindowLimiter, open_shared_state
+from job_runner import JobRunner
+from video_catalog import archive_for, write_catalog
+
 # Try to import MySQL drivers
 MYSQL_DRIVERS = {
     'pymysql': None,
@@ -68,7 +83,6 @@ CORS(app)
 import gc
 import os
 import time
-from collections import defaultdict
 
 # Set environment variables for optimization
 os.environ['PYTHONUNBUFFERED'] = '1'
@@ -83,48 +97,110 @@ app.config['DEBUG'] = False
 import logging
 logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
 
-# Simple rate limiting for shared hosting
-_request_counts = defaultdict(list)
+# Rate limiting for shared hosting (fixed memory per route, see rate_limit)
 _MAX_REQUESTS_PER_MINUTE = 60
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 10000))
+_rate_limiters = {}
+
+# Maximum posts accepted by the batch import endpoint
+MAX_BATCH_POSTS = 500
+
+# bcrypt cost for new hashes; run calibrate_bcrypt.py to pick one for this host.
+# Stored hashes with a different cost are re-hashed on the next successful login.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+
+# bcrypt runs on its own small pool so login bursts cannot starve the workers
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get('BCRYPT_WORKERS', 2)),
+    max_queue=int(os.environ.get('BCRYPT_MAX_QUEUE', 4)),
+    # Upper bound on how long a login/register request thread waits for a hash
+    timeout=float(os.environ.get('BCRYPT_MAX_WAIT', 2))
+)
 
 # Shared hosting process limits
 _MAX_CONCURRENT_PROCESSES = 3
 _active_processes = 0
+_process_lock = threading.Lock()
+
+# Rate-limit windows and process slots shared by every worker on the host
+# (None where fcntl/mmap are unavailable - limits are then per worker)
+SHARED_STATE_FILE = os.environ.get(
+    'SHARED_STATE_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shared_state.bin')
+)
+shared_state = open_shared_state(SHARED_STATE_FILE)
+
+# Long admin tasks (video pulls) run in the background; state files let any worker report on them
+JOBS_DIR = os.environ.get('JOBS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs'))
+video_jobs = JobRunner(JOBS_DIR)
+
+def get_rate_limiter(scope, limit, window=60):
+    """The limiter for a scope, created on first use"""
+    limiter = _rate_limiters.get(scope)
+    if limiter is None:
+        if shared_state is not None:
+            limiter = SharedWindowLimiter(shared_state, scope, limit, window)
+        else:
+            limiter = SlidingWindowLimiter(limit, window, max_keys=RATE_LIMIT_MAX_KEYS)
+        _rate_limiters[scope] = limiter
+    return limiter
 
-def check_rate_limit(ip):
-    """Simple rate limiting"""
-    now = time.time()
-    minute_ago = now - 60
-    
-    # Clean old requests
-    _request_counts[ip] = [req_time for req_time in _request_counts[ip] if req_time > minute_ago]
-    
-    # Check if limit exceeded
-    if len(_request_counts[ip]) >= _MAX_REQUESTS_PER_MINUTE:
-        return False
+
+def rate_limit(limit, window=60, scope=None):
+    """Decorator limiting a route to `limit` requests per `window` seconds per client IP
     
-    # Add current request
-    _request_counts[ip].append(now)
-    return True
+    Place it directly under @app.route so limited requests are rejected
+    before authentication or any database work.
+    """
+    def decorator(f):
+        limiter = get_rate_limiter(scope or f.__name__, limit, window)
+        
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            allowed, retry_after = limiter.hit(request.remote_addr or 'unknown')
+            if not allowed:
+                response = jsonify({'error': 'Rate limit exceeded'})
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+            return f(*args, **kwargs)
+        
+        return decorated
+    return decorator
+
+
+def check_rate_limit(ip):
+    """Simple rate limiting (default budget, for code outside a decorated route)"""
+    allowed, _ = get_rate_limiter('default', _MAX_REQUESTS_PER_MINUTE).hit(ip)
+    return allowed
 
 def check_process_limit():
     """Check if we're at process limit for shared hosting"""
-    global _active_processes
+    if shared_state is not None:
+        return len(shared_state.active_slots()) < _MAX_CONCURRENT_PROCESSES
     return _active_processes < _MAX_CONCURRENT_PROCESSES
 
 def acquire_process_slot():
-    """Acquire a process slot"""
+    """Acquire a process slot; returns a handle for release_process_slot, or None when busy"""
     global _active_processes
-    if check_process_limit():
-        _active_processes += 1
-        return True
-    return False
-
-def release_process_slot():
-    """Release a process slot"""
+    if shared_state is not None:
+        try:
+            return shared_state.acquire_slot(_MAX_CONCURRENT_PROCESSES)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Shared process slot unavailable, using per-worker limit: {e}")
+    with _process_lock:
+        if _active_processes < _MAX_CONCURRENT_PROCESSES:
+            _active_processes += 1
+            return 'local'
+    return None
+
+def release_process_slot(slot):
+    """Release a slot returned by acquire_process_slot"""
     global _active_processes
-    if _active_processes > 0:
-        _active_processes -= 1
+    if slot == 'local':
+        with _process_lock:
+            if _active_processes > 0:
+                _active_processes -= 1
+    elif slot is not None:
+        shared_state.release_slot(slot)
 
 def force_garbage_collection():
     """Force garbage collection to free memory"""
@@ -178,6 +254,12 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', secrets.token_hex(32))
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
+# Pre-rendered blog pages (served from /blog/ without touching the database)
+app.config['SITE_URL'] = os.environ.get('SITE_URL', 'https://minigolfevery.day')
+app.config['BLOG_STATIC_DIR'] = os.environ.get(
+    'BLOG_STATIC_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blog')
+)
+
 # Initialize database
 db = SQLAlchemy(app)
 
@@ -213,13 +295,30 @@ class User(db.Model):
         if len(password) < 8:
             raise ValueError("Password must be at least 8 characters long")
         
-        # Generate salt and hash password
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        # Hashed on the bounded bcrypt pool (raises HasherBusy when saturated)
+        self.password_hash = password_hasher.hash(password, BCRYPT_ROUNDS)
+    
+    def password_cost(self):
+        """bcrypt cost factor of the stored hash ($2b$<cost>$...)"""
+        try:
+            return int(self.password_hash.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
     
     def check_password(self, password):
-        """Check if provided password matches hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Check if provided password matches hash (raises HasherBusy when saturated)
+        
+        On a match, a hash made with a cost other than BCRYPT_ROUNDS is
+        replaced (the caller commits).
+        """
+        if not password_hasher.check(password, self.password_hash):
+            return False
+        if self.password_cost() != BCRYPT_ROUNDS:
+            try:
+                self.password_hash = password_hasher.hash(password, BCRYPT_ROUNDS)
+            except HasherBusy:
+                pass  # upgrade on a later login
+        return True
     
     def is_locked(self):
         """Check if account is locked due to failed login attempts"""
@@ -253,22 +352,28 @@ class User(db.Model):
             'username': self.username,
             'is_admin': self.is_admin,
             'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES'],
-            'iat': datetime.utcnow()
+            'iat': datetime.utcnow(),
+            'jti': secrets.token_urlsafe(16)  # lets logout revoke this token
         }
         return jwt.encode(payload, app.config['JWT_SECRET_KEY'], algorithm='HS256')
     
     @staticmethod
-    def verify_auth_token(token):
-        """Verify JWT token and return user"""
+    def decode_auth_token(token):
+        """Verify a JWT's signature and expiry and return its claims (or None)"""
         try:
-            payload = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            user = User.query.get(payload['user_id'])
-            if user and user.is_active:
-                return user
-        except jwt.ExpiredSignatureError:
-            return None
+            return jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
         except jwt.InvalidTokenError:
             return None
+    
+    @staticmethod
+    def verify_auth_token(token):
+        """Verify JWT token and return user"""
+        payload = User.decode_auth_token(token)
+        if not payload:
+            return None
+        user = User.query.get(payload['user_id'])
+        if user and user.is_active:
+            return user
         return None
     
     def to_dict(self, include_sensitive=False):
@@ -307,23 +412,68 @@ class BlogPost(db.Model):
     meta_title = db.Column(db.String(200))
     meta_description = db.Column(db.String(500))
     
+    # Derived from content at write time (see update_derived_fields)
+    word_count = db.Column(db.Integer, default=0)
+    reading_time = db.Column(db.Integer, default=0)
+    auto_excerpt = db.Column(db.Text)
+    toc = db.Column(db.Text)
+    first_image = db.Column(db.String(500))
+    
+    # Incremented in batches by post_view_counter
+    view_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    @staticmethod
+    def slugify(title):
+        """Convert a title to its base URL slug (no uniqueness check)"""
+        # Convert to lowercase and replace spaces/special chars with hyphens
+        slug = re.sub(r'[^\w\s-]', '', (title or '').lower())
+        return re.sub(r'[-\s]+', '-', slug).strip('-')
+    
+    @staticmethod
+    def allocate_slugs(titles, exclude_id=None):
+        """Allocate unique slugs for a list of titles
+        
+        Existing slugs for every distinct base are fetched with a single
+        prefix query (slug = base OR slug LIKE 'base-%'); suffixes are then
+        picked in memory, so N colliding titles cost one query instead of N.
+        Titles in the same call never receive the same slug. Titles with no
+        slug characters fall back to "post", and slugs reserved by the static
+        blog (index) are never handed out.
+        """
+        bases = [BlogPost.slugify(title) or 'post' for title in titles]
+        distinct_bases = list(dict.fromkeys(bases))
+        if not distinct_bases:
+            return []
+        
+        conditions = []
+        for base in distinct_bases:
+            # Escape LIKE wildcards - "_" is a legal slug character
+            pattern = base.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append(BlogPost.slug == base)
+            conditions.append(BlogPost.slug.like(f'{pattern}-%', escape='\\'))
+        
+        query = db.session.query(BlogPost.slug).filter(db.or_(*conditions))
+        if exclude_id is not None:
+            query = query.filter(BlogPost.id != exclude_id)
+        taken = {row.slug for row in query} | blog_static.RESERVED_SLUGS
+        
+        slugs = []
+        for base in bases:
+            slug = base
+            counter = 1
+            while slug in taken:
+                slug = f"{base}-{counter}"
+                counter += 1
+            taken.add(slug)
+            slugs.append(slug)
+        
+        return slugs
+    
     def generate_slug(self):
-        """Generate URL-friendly slug from title"""
+        """Generate URL-friendly unique slug from title"""
         if not self.title:
             return ''
-        
-        # Convert to lowercase and replace spaces/special chars with hyphens
-        slug = re.sub(r'[^\w\s-]', '', self.title.lower())
-        slug = re.sub(r'[-\s]+', '-', slug).strip('-')
-        
-        # Ensure uniqueness
-        base_slug = slug
-        counter = 1
-        while BlogPost.query.filter_by(slug=slug).filter(BlogPost.id != self.id).first():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        
-        return slug
+        return BlogPost.allocate_slugs([self.title], exclude_id=self.id)[0]
     
     def publish(self):
         """Publish the blog post"""
@@ -337,14 +487,33 @@ class BlogPost(db.Model):
         self.is_published = False
         self.published_at = None
     
+    def update_derived_fields(self):
+        """Recompute stored metadata after content changes (adds heading anchors)"""
+        self.content, metadata = derive_post_metadata(self.content)
+        self.word_count = metadata['word_count']
+        self.reading_time = metadata['reading_time']
+        self.auto_excerpt = metadata['auto_excerpt']
+        self.toc = json.dumps(metadata['toc']) if metadata['toc'] else None
+        first_image = metadata['first_image']
+        self.first_image = first_image[:500] if first_image else None
+    
     def to_dict(self, include_content=True):
-        """Convert blog post to dictionary"""
+        """Convert blog post to dictionary
+        
+        excerpt and featured_image fall back to the derived values; the
+        *_is_auto flags tell editors not to save those back as custom values.
+        """
         data = {
             'id': self.id,
             'title': self.title,
             'slug': self.slug,
-            'excerpt': self.excerpt,
-            'featured_image': self.featured_image,
+            'excerpt': self.excerpt or self.auto_excerpt,
+            'excerpt_is_auto': not self.excerpt and bool(self.auto_excerpt),
+            'featured_image': self.featured_image or self.first_image,
+            'featured_image_is_auto': not self.featured_image and bool(self.first_image),
+            'word_count': self.word_count or 0,
+            'reading_time': self.reading_time or 0,
+            'view_count': (self.view_count or 0) + post_view_counter.pending(self.id),
             'is_published': self.is_published,
             'is_featured': self.is_featured,
             'created_at': self.created_at.isoformat(),
@@ -360,10 +529,204 @@ class BlogPost(db.Model):
         
         if include_content:
             data['content'] = self.content
+            data['toc'] = json.loads(self.toc) if self.toc else []
         
         return data
 
 
+class RelatedPost(db.Model):
+    """Precomputed top-K similar posts for each published post"""
+    __tablename__ = 'blog_related_posts'
+    
+    post_id = db.Column(db.Integer, db.ForeignKey('blog_posts.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    related_post_id = db.Column(db.Integer, db.ForeignKey('blog_posts.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+
+class RevokedToken(db.Model):
+    """Tokens invalidated before their expiry (logout)
+    
+    Rows are append-only apart from pruning expired ones; workers follow the
+    table by id watermark (see refresh_revoked_tokens).
+    """
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class VideoClick(db.Model):
+    """Watch-page click-throughs per TikTok video"""
+    __tablename__ = 'video_clicks'
+    
+    video_id = db.Column(db.String(32), primary_key=True)
+    clicks = db.Column(db.Integer, default=0, nullable=False)
+
+
+# Verified-token cache
+# Authenticated requests would otherwise cost a jwt.decode plus a user query
+# each. Entries are keyed by a digest of the token (never the token itself)
+# and live for a few seconds. Deactivating a user drops their entries in this
+# worker and bumps the shared-state generation counter; every worker checks
+# that counter on a cache hit and re-validates entries cached under an older
+# generation, so the change applies host-wide at once. Without shared state
+# (no fcntl) other workers catch up within the TTL, capped at 30 seconds.
+TOKEN_CACHE_TTL = min(float(os.environ.get('TOKEN_CACHE_TTL', 10)), 30.0)
+_token_cache = TTLCache(maxsize=int(os.environ.get('TOKEN_CACHE_SIZE', 256)), ttl=TOKEN_CACHE_TTL)
+
+
+class _UserSnapshot:
+    """Read-only stand-in for User carrying what routes read from current_user"""
+    __slots__ = ('id', 'username', 'email', 'is_admin', 'is_active', '_data')
+    
+    def __init__(self, user):
+        self._data = user.to_dict(include_sensitive=True)
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_admin = user.is_admin
+        self.is_active = user.is_active
+    
+    def to_dict(self, include_sensitive=False):
+        data = dict(self._data)
+        if not include_sensitive:
+            data['email'] = None
+        return data
+
+
+# Revocation list
+# Each worker mirrors revoked_tokens in a jti -> expiry dict, pulling only
+# rows above the highest id it has seen at most every few seconds, so the
+# per-request revocation check is a dict lookup. Auto-increment ids are
+# assigned at insert, not commit, so a row can become visible after a higher
+# id was already read; each refresh therefore also re-reads rows revoked
+# within REVOCATION_OVERLAP_SECONDS before the previous refresh.
+REVOCATION_REFRESH_SECONDS = float(os.environ.get('REVOCATION_REFRESH_SECONDS', 5))
+REVOCATION_OVERLAP_SECONDS = float(os.environ.get('REVOCATION_OVERLAP_SECONDS', 60))
+_revoked_jtis = {}
+_revoked_watermark = 0
+_revoked_checked_at = None
+_revoked_scanned_at = None  # UTC start of the last successful refresh
+_revoked_lock = threading.Lock()
+
+
+def refresh_revoked_tokens(force=False):
+    """Pull newly revoked token ids into this worker's set"""
+    global _revoked_watermark, _revoked_checked_at, _revoked_scanned_at
+    now = time.monotonic()
+    if not force and _revoked_checked_at is not None and now - _revoked_checked_at < REVOCATION_REFRESH_SECONDS:
+        return
+    with _revoked_lock:
+        if not force and _revoked_checked_at is not None and now - _revoked_checked_at < REVOCATION_REFRESH_SECONDS:
+            return
+        _revoked_checked_at = now
+        scan_started = datetime.utcnow()
+        new_rows = RevokedToken.id > _revoked_watermark
+        if _revoked_scanned_at is not None:
+            # Late commits with ids below the watermark
+            overlap_from = _revoked_scanned_at - timedelta(seconds=REVOCATION_OVERLAP_SECONDS)
+            new_rows = db.or_(new_rows, RevokedToken.revoked_at >= overlap_from)
+        try:
+            rows = (db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                    .filter(new_rows)
+                    .order_by(RevokedToken.id)
+                    .all())
+        except Exception as e:
+            # e.g. table not created yet - keep serving with what we have
+            db.session.rollback()
+            print(f"[ERROR] Revoked token refresh failed: {e}")
+            return
+        utcnow = datetime.utcnow()
+        for row in rows:
+            if row.expires_at > utcnow:
+                _revoked_jtis[row.jti] = row.expires_at
+            _revoked_watermark = max(_revoked_watermark, row.id)
+        _revoked_scanned_at = scan_started
+        # Expired tokens fail jwt.decode anyway - forget them
+        for jti in [jti for jti, expires_at in list(_revoked_jtis.items()) if expires_at <= utcnow]:
+            _revoked_jtis.pop(jti, None)
+
+
+def is_token_revoked(claims):
+    """O(1) check against this worker's mirror of revoked_tokens"""
+    jti = claims.get('jti')
+    return jti is not None and jti in _revoked_jtis
+
+
+def revoke_token(token, claims):
+    """Persist a token's revocation and apply it in this worker immediately"""
+    jti = claims.get('jti')
+    if not jti:
+        return False  # issued before revocation support; expires on its own
+    expires_at = datetime.utcfromtimestamp(claims['exp'])
+    if not RevokedToken.query.filter_by(jti=jti).first():
+        db.session.add(RevokedToken(jti=jti, user_id=claims['user_id'], expires_at=expires_at))
+    # Opportunistically prune rows nobody needs any more
+    RevokedToken.query.filter(RevokedToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+    # Under the lock: refresh_revoked_tokens iterates the dict while pruning
+    with _revoked_lock:
+        _revoked_jtis[jti] = expires_at
+    _token_cache.pop(_token_digest(token))
+    return True
+
+
+def _auth_generation():
+    """Host-wide auth generation (0 without shared state)"""
+    if shared_state is None:
+        return 0
+    try:
+        return shared_state.generation()
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Shared auth generation read failed: {e}")
+        return 0
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+def authenticate_token(token):
+    """Return a user snapshot for a valid token of an active user, else None"""
+    refresh_revoked_tokens()
+    key = _token_digest(token)
+    generation = _auth_generation()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        if cached[2] == generation:
+            return None if is_token_revoked(cached[0]) else cached[1]
+        # A user was deactivated somewhere since this was cached - re-validate
+        _token_cache.pop(key)
+    
+    claims = User.decode_auth_token(token)
+    if not claims or is_token_revoked(claims):
+        return None
+    user = db.session.get(User, claims['user_id'])
+    if not user or not user.is_active:
+        return None
+    
+    snapshot = _UserSnapshot(user)
+    # Never cache past the token's own expiry
+    ttl = min(TOKEN_CACHE_TTL, claims['exp'] - time.time())
+    if ttl > 0:
+        _token_cache.set(key, (claims, snapshot, generation), ttl=ttl)
+    return snapshot
+
+
+def invalidate_user_tokens(user_id):
+    """Drop a user's cached tokens here and make every other worker re-validate theirs"""
+    if shared_state is not None:
+        try:
+            shared_state.bump_generation()
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not broadcast token invalidation: {e}")
+    return _token_cache.discard_where(lambda entry: entry[1].id == user_id)
+
+
 # Authentication decorators
 def token_required(f):
     """Decorator to require valid JWT token"""
@@ -382,7 +745,7 @@ def token_required(f):
         if not token:
             return jsonify({'error': 'Token is missing'}), 401
         
-        current_user = User.verify_auth_token(token)
+        current_user = authenticate_token(token)
         if not current_user:
             return jsonify({'error': 'Token is invalid or expired'}), 401
         
@@ -402,6 +765,55 @@ def admin_required(f):
     return decorated
 
 
+# Login throttling
+# Checked before the user lookup and bcrypt, per username (also catches
+# nonexistent ones) and per client IP. Failed-attempt counts for real
+# accounts are written in batches; the in-memory backoff is what stops a
+# fast brute-force run, the stored lock covers slow ones across workers.
+MAX_LOGIN_ATTEMPTS = 5
+ACCOUNT_LOCK_MINUTES = 30
+
+login_throttle_by_username = LoginThrottle(capacity=5, refill_per_minute=5, free_failures=3)
+login_throttle_by_ip = LoginThrottle(capacity=20, refill_per_minute=20, free_failures=10)
+
+
+def flush_login_failures(batch):
+    """Add buffered failures to users and lock accounts that hit the limit, in one UPDATE"""
+    failures = db.case(batch, value=User.id, else_=0)
+    with app.app_context():
+        db.session.execute(
+            db.update(User)
+            .where(User.id.in_(list(batch)))
+            # locked_until first: MySQL evaluates SET assignments left to right
+            .ordered_values(
+                (User.locked_until, db.case(
+                    (User.login_attempts + failures >= MAX_LOGIN_ATTEMPTS,
+                     datetime.utcnow() + timedelta(minutes=ACCOUNT_LOCK_MINUTES)),
+                    else_=User.locked_until
+                )),
+                (User.login_attempts, User.login_attempts + failures)
+            )
+        )
+        db.session.commit()
+
+
+login_failure_counter = CounterBuffer('login_failures', flush_login_failures, flush_interval=5.0, max_pending=50)
+
+
+def throttled_response(retry_after):
+    """429 for a throttled login attempt"""
+    response = jsonify({'error': 'Too many login attempts, please try again later'})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+
+def hasher_busy_response(error):
+    """429 telling the client when to retry a login/registration"""
+    response = jsonify({'error': 'Too many login attempts in progress, please retry shortly'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+
 # Input validation
 def validate_email(email):
     """Validate email format"""
@@ -418,40 +830,441 @@ def validate_username(username):
 
 
 def sanitize_content(content):
-    """Basic content sanitization with safe iframe support"""
-    if not content:
-        return ''
+    """Sanitize post HTML, keeping iframe embeds from trusted domains only"""
+    return sanitize_html(content)
+
+
+# Full-text search
+# MySQL uses a FULLTEXT index on blog_posts(title, content) that InnoDB keeps
+# current by itself. SQLite uses an FTS5 shadow table (rowid = post id) that
+# the create/update/delete routes keep in sync inside their transactions.
+SEARCH_FULLTEXT_INDEX = 'ft_blog_posts_search'
+SEARCH_FTS_TABLE = 'blog_posts_fts'
+
+_search_index_ready = None  # None until probed
+
+
+def search_index_ready():
+    """Check (once per process) whether the full-text index exists
     
-    # Allow safe iframe embeds from trusted domains
-    trusted_domains = [
-        'youtube.com',
-        'youtube-nocookie.com',
-        'vimeo.com',
-        'player.vimeo.com',
-        'soundcloud.com',
-        'w.soundcloud.com'
-    ]
+    A failed probe is cached as False too, so request threads never retry
+    it; ensure_search_index() (startup and admin setup) can still flip it.
+    """
+    global _search_index_ready
+    if _search_index_ready is None:
+        dialect = db.engine.dialect.name
+        try:
+            if dialect == 'mysql':
+                _search_index_ready = bool(db.session.execute(db.text("""
+                    SELECT COUNT(*) FROM information_schema.statistics
+                    WHERE table_schema = DATABASE() AND table_name = 'blog_posts'
+                      AND index_name = :name
+                """), {'name': SEARCH_FULLTEXT_INDEX}).scalar())
+            elif dialect == 'sqlite':
+                _search_index_ready = db.session.execute(db.text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ), {'name': SEARCH_FTS_TABLE}).first() is not None
+            else:
+                _search_index_ready = False
+        except Exception as e:
+            db.session.rollback()
+            _search_index_ready = False
+            print(f"[WARNING] Search index probe failed: {e}")
+    return _search_index_ready
+
+
+def ensure_search_index():
+    """Create the FULLTEXT index (MySQL) or FTS5 table (SQLite) if missing
     
-    # Find all iframes and check if they're from trusted sources
-    iframe_pattern = r'<iframe[^>]*src=["\']([^"\']+)["\'][^>]*>'
-    iframes = re.findall(iframe_pattern, content, re.IGNORECASE)
+    Runs DDL and commits the session, so it is only called from setup code
+    (init_db and the admin setup route), never per request. A failure is
+    cached as False and searches fall back to LIKE until the next setup.
+    Returns True when full-text search is available.
+    """
+    global _search_index_ready
+    if search_index_ready():
+        return True
     
-    # Remove dangerous HTML tags except safe iframes
-    dangerous_tags = ['<script', '<object', '<embed', '<link', '<meta']
-    for tag in dangerous_tags:
-        content = re.sub(f'{tag}[^>]*>', '', content, flags=re.IGNORECASE)
+    dialect = db.engine.dialect.name
+    try:
+        if dialect == 'mysql':
+            db.session.execute(db.text(
+                f'ALTER TABLE blog_posts ADD FULLTEXT INDEX {SEARCH_FULLTEXT_INDEX} (title, content)'
+            ))
+        elif dialect == 'sqlite':
+            db.session.execute(db.text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} "
+                f"USING fts5(title, body, tokenize='porter unicode61')"
+            ))
+            _search_index_ready = True
+            # Backfill existing posts
+            for post in BlogPost.query.yield_per(100):
+                search_index_update(post)
+        else:
+            return False
+        db.session.commit()
+        _search_index_ready = True
+        print("✅ Created full-text search index")
+        return True
+    except Exception as e:
+        db.session.rollback()
+        _search_index_ready = False
+        print(f"[WARNING] Could not create full-text search index: {e}")
+        return False
+
+
+def search_index_update(post):
+    """Refresh a post's FTS5 row (no-op on MySQL, where InnoDB maintains it)"""
+    if db.engine.dialect.name != 'sqlite' or not search_index_ready():
+        return
+    db.session.execute(db.text(f'DELETE FROM {SEARCH_FTS_TABLE} WHERE rowid = :id'), {'id': post.id})
+    db.session.execute(db.text(
+        f'INSERT INTO {SEARCH_FTS_TABLE} (rowid, title, body) VALUES (:id, :title, :body)'
+    ), {'id': post.id, 'title': post.title, 'body': html_to_text(post.content)})
+
+
+def search_index_remove(post_id):
+    """Drop a post's FTS5 row"""
+    if db.engine.dialect.name != 'sqlite' or not search_index_ready():
+        return
+    db.session.execute(db.text(f'DELETE FROM {SEARCH_FTS_TABLE} WHERE rowid = :id'), {'id': post_id})
+
+
+def search_blog_post_ids(terms, include_drafts=False, limit=10, offset=0):
+    """Run a ranked full-text query
     
-    # Remove iframes from untrusted domains
-    def is_trusted_iframe(match):
-        src = match.group(1)
-        for domain in trusted_domains:
-            if domain in src:
-                return match.group(0)  # Keep the iframe
-        return ''  # Remove untrusted iframe
+    Returns a list of (post_id, snippet_html) tuples, best match first.
+    snippet_html is None when the backend cannot build one itself.
+    """
+    dialect = db.engine.dialect.name
     
-    content = re.sub(iframe_pattern, is_trusted_iframe, content, flags=re.IGNORECASE)
+    if dialect == 'sqlite':
+        # Quote every term and prefix-match the last one (search-as-you-type)
+        match = ' '.join(f'"{term}"' for term in terms[:-1])
+        match = f'{match} "{terms[-1]}"*'.strip()
+        rows = db.session.execute(db.text(f"""
+            SELECT {SEARCH_FTS_TABLE}.rowid AS id,
+                   snippet({SEARCH_FTS_TABLE}, 1, char(2), char(3), char(1), 24) AS snippet
+            FROM {SEARCH_FTS_TABLE}
+            JOIN blog_posts ON blog_posts.id = {SEARCH_FTS_TABLE}.rowid
+            WHERE {SEARCH_FTS_TABLE} MATCH :match
+              AND (blog_posts.is_published = 1 OR :drafts)
+            ORDER BY bm25({SEARCH_FTS_TABLE}, 10.0, 1.0)
+            LIMIT :limit OFFSET :offset
+        """), {'match': match, 'drafts': include_drafts, 'limit': limit, 'offset': offset})
+        results = []
+        for row in rows:
+            # Escape the raw snippet, then turn the marker bytes into markup
+            snippet = html.escape(row.snippet or '')
+            snippet = snippet.replace('\x02', '<mark>').replace('\x03', '</mark>').replace('\x01', '…')
+            results.append((row.id, snippet))
+        return results
+    
+    # MySQL boolean mode: every term required, last term prefix-matched
+    match = ' '.join(f'+{term}' for term in terms) + '*'
+    rows = db.session.execute(db.text(f"""
+        SELECT id, MATCH(title, content) AGAINST (:match IN BOOLEAN MODE) AS score
+        FROM blog_posts
+        WHERE MATCH(title, content) AGAINST (:match IN BOOLEAN MODE)
+          AND (is_published = 1 OR :drafts)
+        ORDER BY score DESC
+        LIMIT :limit OFFSET :offset
+    """), {'match': match, 'drafts': include_drafts, 'limit': limit, 'offset': offset})
+    return [(row.id, None) for row in rows]
+
+
+# Schema upgrades for tables created before a column existed
+# (db.create_all() only creates missing tables, never missing columns)
+BLOG_POST_ADDED_COLUMNS = {
+    'word_count': 'INTEGER DEFAULT 0',
+    'reading_time': 'INTEGER DEFAULT 0',
+    'auto_excerpt': 'TEXT',
+    'toc': 'TEXT',
+    'first_image': 'VARCHAR(500)',
+    'view_count': 'INTEGER NOT NULL DEFAULT 0'
+}
+
+
+def ensure_blog_post_columns():
+    """Add missing derived-metadata columns and backfill them
+    
+    Commits the session. Returns the number of posts backfilled.
+    """
+    existing = {column['name'] for column in db.inspect(db.engine).get_columns('blog_posts')}
+    added = [name for name in BLOG_POST_ADDED_COLUMNS if name not in existing]
+    for name in added:
+        db.session.execute(db.text(f'ALTER TABLE blog_posts ADD COLUMN {name} {BLOG_POST_ADDED_COLUMNS[name]}'))
+    if added:
+        db.session.commit()
+        print(f"✅ Added blog_posts columns: {', '.join(added)}")
+    
+    # Posts written before derived fields existed have no auto excerpt
+    backfilled = 0
+    for post in BlogPost.query.filter(BlogPost.auto_excerpt.is_(None)).yield_per(100):
+        post.update_derived_fields()
+        backfilled += 1
+    if backfilled:
+        db.session.commit()
+        print(f"✅ Derived metadata backfilled for {backfilled} posts")
+    return backfilled
+
+
+# Related posts
+# Similarity depends on every published post (IDF is corpus-wide), so any
+# publish, unpublish or content edit recomputes the whole table in a
+# background thread. Bursts (e.g. a batch import) coalesce into one run.
+RELATED_POSTS_PER_POST = 4
+_related_posts_pending = threading.Event()
+_related_posts_running = threading.Lock()
+
+
+def update_related_posts():
+    """Recompute and store related posts for every published post"""
+    documents = (db.session.query(BlogPost.id, BlogPost.title, BlogPost.content)
+                 .filter(BlogPost.is_published == True)
+                 .all())
+    related = compute_related_posts(documents, top_k=RELATED_POSTS_PER_POST)
     
-    return content.strip()
+    RelatedPost.query.delete()
+    db.session.add_all(
+        RelatedPost(post_id=post_id, rank=rank, related_post_id=related_id, score=score)
+        for post_id, matches in related.items()
+        for rank, (related_id, score) in enumerate(matches)
+    )
+    db.session.commit()
+    return len(related)
+
+
+def _related_posts_worker():
+    """Run queued recomputes until none are pending"""
+    try:
+        while _related_posts_pending.is_set():
+            _related_posts_pending.clear()
+            with app.app_context():
+                try:
+                    count = update_related_posts()
+                    print(f"✅ Related posts updated for {count} posts")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[ERROR] Related posts update failed: {e}")
+    finally:
+        _related_posts_running.release()
+    # A request may have queued work after the loop's last check
+    if _related_posts_pending.is_set():
+        schedule_related_posts_update()
+
+
+def schedule_related_posts_update():
+    """Queue a background recompute (no-op if one is already queued)"""
+    _related_posts_pending.set()
+    if _related_posts_running.acquire(blocking=False):
+        threading.Thread(target=_related_posts_worker, daemon=True).start()
+
+
+def get_related_posts(post_id):
+    """Related published posts for a post, best match first (one indexed query)"""
+    rows = (db.session.query(BlogPost)
+            .join(RelatedPost, RelatedPost.related_post_id == BlogPost.id)
+            .options(db.defer(BlogPost.content), db.joinedload(BlogPost.author))
+            .filter(RelatedPost.post_id == post_id, BlogPost.is_published == True)
+            .order_by(RelatedPost.rank)
+            .all())
+    return [post.to_dict(include_content=False) for post in rows]
+
+
+# View counters
+# Post views and video clicks are buffered per worker and written with one
+# statement per flush, instead of one row-locking UPDATE per hit.
+VIDEO_ID_PATTERN = re.compile(r'^\d{1,32}$')
+
+
+def flush_post_views(batch):
+    """Add buffered views to blog_posts in a single UPDATE ... CASE"""
+    with app.app_context():
+        db.session.execute(
+            db.update(BlogPost)
+            .where(BlogPost.id.in_(list(batch)))
+            .values(
+                view_count=BlogPost.view_count + db.case(batch, value=BlogPost.id, else_=0),
+                # Views are not edits - keep updated_at (and sitemap lastmod) as is
+                updated_at=BlogPost.updated_at
+            )
+        )
+        db.session.commit()
+
+
+def flush_video_clicks(batch):
+    """Upsert buffered clicks into video_clicks in a single multi-row INSERT"""
+    rows = [{'video_id': video_id, 'clicks': clicks} for video_id, clicks in batch.items()]
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        if dialect == 'mysql':
+            statement = mysql_dialect.insert(VideoClick).values(rows)
+            statement = statement.on_duplicate_key_update(clicks=VideoClick.clicks + statement.inserted.clicks)
+        else:
+            statement = sqlite_dialect.insert(VideoClick).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=[VideoClick.video_id],
+                set_={'clicks': VideoClick.clicks + statement.excluded.clicks}
+            )
+        db.session.execute(statement)
+        db.session.commit()
+
+
+post_view_counter = CounterBuffer(
+    'post_views', flush_post_views,
+    flush_interval=float(os.environ.get('COUNTER_FLUSH_SECONDS', 30)),
+    max_pending=int(os.environ.get('COUNTER_FLUSH_HITS', 500))
+)
+video_click_counter = CounterBuffer(
+    'video_clicks', flush_video_clicks,
+    flush_interval=float(os.environ.get('COUNTER_FLUSH_SECONDS', 30)),
+    max_pending=int(os.environ.get('COUNTER_FLUSH_HITS', 500))
+)
+
+
+# Static blog pages
+# Published posts and the post index are rendered to BLOG_STATIC_DIR whenever
+# a post is written, so public page views are plain file reads. Rendering runs
+# after the commit and never fails the request; /api/admin/blog/rebuild-static
+# regenerates everything if a write was missed.
+def write_static_post(post, old_slug=None):
+    """Render a post's static page (or remove it if unpublished)"""
+    static_dir = app.config['BLOG_STATIC_DIR']
+    try:
+        if old_slug and old_slug != post.slug:
+            blog_static.remove_post_page(static_dir, old_slug)
+        if post.is_published:
+            blog_static.write_post_page(static_dir, post.to_dict(), app.config['SITE_URL'])
+        else:
+            blog_static.remove_post_page(static_dir, post.slug)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to write static page for '{post.slug}': {e}")
+        return False
+
+
+def remove_static_post(slug):
+    """Remove a deleted post's static page"""
+    try:
+        blog_static.remove_post_page(app.config['BLOG_STATIC_DIR'], slug)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to remove static page for '{slug}': {e}")
+        return False
+
+
+def published_posts_for_index():
+    """Published posts newest first, without loading post bodies"""
+    return (BlogPost.query
+            .options(db.defer(BlogPost.content), db.joinedload(BlogPost.author))
+            .filter(BlogPost.is_published == True)
+            .order_by(BlogPost.published_at.desc(), BlogPost.created_at.desc())
+            .all())
+
+
+def rebuild_static_index():
+    """Re-render the paginated post index pages"""
+    try:
+        posts = [post.to_dict(include_content=False) for post in published_posts_for_index()]
+        return blog_static.write_index_pages(app.config['BLOG_STATIC_DIR'], posts, app.config['SITE_URL'])
+    except Exception as e:
+        print(f"[ERROR] Failed to rebuild static blog index: {e}")
+        return 0
+
+
+def rebuild_static_blog():
+    """Render every published post and the index, removing orphaned pages"""
+    static_dir = app.config['BLOG_STATIC_DIR']
+    site_url = app.config['SITE_URL']
+    os.makedirs(static_dir, exist_ok=True)
+    written = set()
+    for post in BlogPost.query.filter(BlogPost.is_published == True).yield_per(50):
+        blog_static.write_post_page(static_dir, post.to_dict(), site_url)
+        written.add(f'{post.slug}.html')
+
+    # Pages for posts deleted or unpublished while rendering was skipped
+    removed = 0
+    for name in os.listdir(static_dir):
+        if name.endswith('.html') and name != 'index.html' and name not in written:
+            os.remove(os.path.join(static_dir, name))
+            removed += 1
+
+    pages = blog_static.write_index_pages(
+        static_dir, [post.to_dict(include_content=False) for post in published_posts_for_index()], site_url
+    )
+    feeds_changed = regenerate_site_feeds()
+    return {'posts_written': len(written), 'pages_removed': removed, 'index_pages': pages,
+            'feeds_changed': feeds_changed}
+
+
+# RSS feed and sitemap
+# Both are regenerated when a published post changes or an ingestion run
+# changes the video catalog, and written to BLOG_STATIC_DIR only if their
+# bytes differ, so the file mtime is a stable Last-Modified. Requests are
+# served from an in-memory copy keyed by that mtime, with an ETag, so
+# polling feed readers mostly get 304s.
+SITE_FEEDS = {
+    'feed.xml': 'application/rss+xml',
+    'sitemap.xml': 'application/xml'
+}
+SITE_FEEDS_STAMP = '.site-feeds.stamp'
+VIDEO_CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiktok_videos.json')
+# Monthly shards of the catalog; the JSON fallbacks read only the shards they need
+video_archive = archive_for(VIDEO_CATALOG_FILE)
+_site_feed_cache = {}
+
+
+def regenerate_site_feeds():
+    """Rebuild feed.xml and sitemap.xml from published posts and the video catalog"""
+    try:
+        posts = [post.to_dict(include_content=False) for post in published_posts_for_index()]
+        videos = get_videos_from_database().get('videos', [])
+        static_dir = app.config['BLOG_STATIC_DIR']
+        site_url = app.config['SITE_URL']
+        os.makedirs(static_dir, exist_ok=True)
+        
+        changed = blog_static.write_if_changed(
+            os.path.join(static_dir, 'feed.xml'), blog_static.render_rss_feed(posts, videos, site_url)
+        )
+        changed |= blog_static.write_if_changed(
+            os.path.join(static_dir, 'sitemap.xml'), blog_static.render_sitemap(posts, videos, site_url)
+        )
+        # Record when the catalog was last consumed, even if nothing changed
+        with open(os.path.join(static_dir, SITE_FEEDS_STAMP), 'w') as f:
+            f.write(datetime.utcnow().isoformat())
+        return changed
+    except Exception as e:
+        print(f"[ERROR] Failed to regenerate feed/sitemap: {e}")
+        return False
+
+
+def site_feeds_stale():
+    """True if the feeds were never built or the catalog file changed since"""
+    try:
+        stamp = os.stat(os.path.join(app.config['BLOG_STATIC_DIR'], SITE_FEEDS_STAMP)).st_mtime
+    except OSError:
+        return True
+    try:
+        return os.stat(VIDEO_CATALOG_FILE).st_mtime > stamp
+    except OSError:
+        return False
+
+
+def load_site_feed(name):
+    """Cached (body, etag, last_modified) for a feed file, re-read only when its mtime changes"""
+    path = os.path.join(app.config['BLOG_STATIC_DIR'], name)
+    if site_feeds_stale():
+        regenerate_site_feeds()
+    mtime = os.stat(path).st_mtime
+    cached = _site_feed_cache.get(name)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            body = f.read()
+        cached = (mtime, body, hashlib.sha256(body).hexdigest()[:32],
+                  datetime.utcfromtimestamp(int(mtime)))
+        _site_feed_cache[name] = cached
+    return cached[1:]
 
 
 # Database initialization
@@ -459,6 +1272,8 @@ def init_db():
     """Initialize database with tables"""
     with app.app_context():
         db.create_all()
+        ensure_blog_post_columns()
+        ensure_search_index()
         
         # Create admin user if it doesn't exist
         admin = User.query.filter_by(username='admin').first()
@@ -529,8 +1344,8 @@ def setup_video_database():
                 # If no videos in database, try to migrate from JSON
                 if existing_count == 0:
                     try:
-                        if os.path.exists('tiktok_videos.json'):
-                            with open('tiktok_videos.json', 'r', encoding='utf-8') as f:
+                        if os.path.exists(VIDEO_CATALOG_FILE):
+                            with open(VIDEO_CATALOG_FILE, 'r', encoding='utf-8') as f:
                                 data = json.load(f)
                             videos = data.get('videos', [])
                             
@@ -571,15 +1386,8 @@ def setup_video_database():
                                     'url': video['url'] or f"https://www.tiktok.com/@minigolfeveryday/video/{video['video_id']}"
                                 })
                             
-                            # Update JSON file
-                            json_data = {
-                                'videos': json_videos,
-                                'last_updated': datetime.now().isoformat(),
-                                'total_count': len(json_videos)
-                            }
-                            
-                            with open('tiktok_videos.json', 'w', encoding='utf-8') as f:
-                                json.dump(json_data, f, indent=2, ensure_ascii=False)
+                            # Update JSON file (atomically, with the .gz sibling)
+                            write_catalog(VIDEO_CATALOG_FILE, json_videos)
                             
                             result['json_synced'] = True
                             
@@ -708,9 +1516,17 @@ def get_videos_from_database():
     except Exception as e:
         print(f"[ERROR] Database video fetch failed: {e}")
     
-    # Fallback to JSON file
+    # Fallback to the sharded archive (newest shards only), then the JSON file
     try:
-        with open('tiktok_videos.json', 'r', encoding='utf-8') as f:
+        if video_archive.exists():
+            videos = video_archive.load(limit=200)
+            return {
+                'videos': videos,
+                'last_updated': video_archive.manifest().get('last_updated'),
+                'total_count': len(videos),
+                'source': 'json_fallback'
+            }
+        with open(VIDEO_CATALOG_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
             data['source'] = 'json_fallback'
             return data
@@ -782,9 +1598,30 @@ def get_video_stats_from_database():
     except Exception as e:
         print(f"[ERROR] Database stats fetch failed: {e}")
     
+    # Fallback to the archive manifest: counts and dates without loading old shards
+    try:
+        manifest = video_archive.manifest()
+        shards = manifest.get('shards', [])
+        if shards:
+            dates = [shard['oldest'] for shard in shards if shard.get('oldest')]
+            days_running = manifest.get('total_count', 0)
+            if dates:
+                days_running = (datetime.now() - datetime.strptime(min(dates), '%Y%m%d')).days + 1
+            latest = video_archive.load(limit=1)
+            return {
+                'video_count': manifest.get('total_count', 0),
+                'total_videos': manifest.get('total_count', 0),
+                'days_running': days_running,
+                'latest_video': latest[0] if latest else None,
+                'last_updated': datetime.now().isoformat(),
+                'source': 'json_fallback'
+            }
+    except Exception as e:
+        print(f"[ERROR] Archive stats fallback failed: {e}")
+    
     # Fallback to JSON processing (existing logic)
     try:
-        with open('tiktok_videos.json', 'r') as f:
+        with open(VIDEO_CATALOG_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
         videos = data.get('videos', [])
         
@@ -828,6 +1665,7 @@ def get_video_stats_from_database():
 
 
 @app.route('/api/auth/register', methods=['POST'])
+@rate_limit(5)
 def register():
     """Register new user"""
     try:
@@ -871,12 +1709,16 @@ def register():
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except HasherBusy as e:
+        db.session.rollback()
+        return hasher_busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed'}), 500
 
 
 @app.route('/api/auth/login', methods=['POST'])
+@rate_limit(30)
 def login():
     """User login"""
     try:
@@ -891,10 +1733,19 @@ def login():
         if not username or not password:
             return jsonify({'error': 'Username and password required'}), 400
         
+        # Throttle before touching the database or bcrypt
+        username_key = username.lower()
+        client_ip = request.remote_addr or 'unknown'
+        retry_after = login_throttle_by_ip.attempt(client_ip) or login_throttle_by_username.attempt(username_key)
+        if retry_after:
+            return throttled_response(retry_after)
+        
         # Find user
         user = User.query.filter_by(username=username).first()
         
         if not user or not user.is_active:
+            login_throttle_by_username.failure(username_key)
+            login_throttle_by_ip.failure(client_ip)
             return jsonify({'error': 'Invalid credentials'}), 401
         
         # Check if account is locked
@@ -903,10 +1754,16 @@ def login():
         
         # Verify password
         if not user.check_password(password):
-            user.increment_login_attempts()
+            login_throttle_by_username.failure(username_key)
+            login_throttle_by_ip.failure(client_ip)
+            login_failure_counter.increment(user.id)
             return jsonify({'error': 'Invalid credentials'}), 401
         
         # Successful login
+        login_throttle_by_username.success(username_key)
+        # Returns after any in-flight flush of this user's failures, so the
+        # reset below is the last write and a stale batch cannot re-lock them
+        login_failure_counter.discard(user.id)
         user.reset_login_attempts()
         token = user.generate_auth_token()
         
@@ -916,6 +1773,8 @@ def login():
             'user': user.to_dict(include_sensitive=True)
         }), 200
         
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         return jsonify({'error': 'Login failed'}), 500
 
@@ -930,8 +1789,15 @@ def get_current_user(current_user):
 @app.route('/api/auth/logout', methods=['POST'])
 @token_required
 def logout(current_user):
-    """Logout user (client should delete token)"""
-    return jsonify({'message': 'Logged out successfully'}), 200
+    """Logout user by revoking the token used for this request"""
+    try:
+        token = request.headers['Authorization'].split(" ")[1]
+        claims = User.decode_auth_token(token)
+        revoked = bool(claims) and revoke_token(token, claims)
+        return jsonify({'message': 'Logged out successfully', 'token_revoked': revoked}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Logout failed'}), 500
 
 
 # Blog API Routes
@@ -1015,7 +1881,7 @@ def get_blog_post(slug):
         if auth_header:
             try:
                 token = auth_header.split(" ")[1]
-                current_user = User.verify_auth_token(token)
+                current_user = authenticate_token(token)
             except:
                 pass
         
@@ -1024,7 +1890,7 @@ def get_blog_post(slug):
             if not current_user or (not current_user.is_admin and current_user.id != post.author_id):
                 return jsonify({'error': 'Blog post not found'}), 404
         
-        return jsonify({'post': post.to_dict()}), 200
+        return jsonify({'post': post.to_dict(), 'related': get_related_posts(post.id)}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch blog post'}), 500
@@ -1050,6 +1916,49 @@ def get_blog_post_by_id(current_user, post_id):
         return jsonify({'error': 'Failed to fetch blog post'}), 500
 
 
+def build_blog_post(data, current_user):
+    """Validate post data and build an unsaved BlogPost without a slug
+    
+    Returns (post, is_published, error) - error is a message string when
+    validation fails, otherwise None.
+    """
+    title = (data.get('title') or '').strip()
+    content = (data.get('content') or '').strip()
+    excerpt = (data.get('excerpt') or '').strip()
+    featured_image = (data.get('featured_image') or '').strip()
+    is_published = data.get('is_published', False)
+    is_featured = data.get('is_featured', False)
+    meta_title = (data.get('meta_title') or '').strip()
+    meta_description = (data.get('meta_description') or '').strip()
+    
+    # Validation
+    if not title:
+        return None, False, 'Title is required'
+    
+    if not content:
+        return None, False, 'Content is required'
+    
+    if len(title) > 200:
+        return None, False, 'Title too long (max 200 characters)'
+    
+    # Sanitize content
+    content = sanitize_content(content)
+    excerpt = sanitize_content(excerpt)
+    
+    post = BlogPost(
+        title=title,
+        content=content,
+        excerpt=excerpt,
+        featured_image=featured_image,
+        is_featured=is_featured and current_user.is_admin,  # Only admins can feature posts
+        author_id=current_user.id,
+        meta_title=meta_title,
+        meta_description=meta_description
+    )
+    post.update_derived_fields()
+    return post, is_published, None
+
+
 @app.route('/api/blog/posts', methods=['POST'])
 @token_required
 def create_blog_post(current_user):
@@ -1060,40 +1969,9 @@ def create_blog_post(current_user):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        title = data.get('title', '').strip()
-        content = data.get('content', '').strip()
-        excerpt = data.get('excerpt', '').strip()
-        featured_image = data.get('featured_image', '').strip()
-        is_published = data.get('is_published', False)
-        is_featured = data.get('is_featured', False)
-        meta_title = data.get('meta_title', '').strip()
-        meta_description = data.get('meta_description', '').strip()
-        
-        # Validation
-        if not title:
-            return jsonify({'error': 'Title is required'}), 400
-        
-        if not content:
-            return jsonify({'error': 'Content is required'}), 400
-        
-        if len(title) > 200:
-            return jsonify({'error': 'Title too long (max 200 characters)'}), 400
-        
-        # Sanitize content
-        content = sanitize_content(content)
-        excerpt = sanitize_content(excerpt)
-        
-        # Create post
-        post = BlogPost(
-            title=title,
-            content=content,
-            excerpt=excerpt,
-            featured_image=featured_image,
-            is_featured=is_featured and current_user.is_admin,  # Only admins can feature posts
-            author_id=current_user.id,
-            meta_title=meta_title,
-            meta_description=meta_description
-        )
+        post, is_published, error = build_blog_post(data, current_user)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Generate slug
         post.slug = post.generate_slug()
@@ -1103,8 +1981,16 @@ def create_blog_post(current_user):
             post.publish()
         
         db.session.add(post)
+        db.session.flush()
+        search_index_update(post)
         db.session.commit()
         
+        if post.is_published:
+            write_static_post(post)
+            rebuild_static_index()
+            regenerate_site_feeds()
+            schedule_related_posts_update()
+        
         return jsonify({
             'message': 'Blog post created successfully',
             'post': post.to_dict()
@@ -1115,6 +2001,87 @@ def create_blog_post(current_user):
         return jsonify({'error': 'Failed to create blog post'}), 500
 
 
+@app.route('/api/blog/posts/batch', methods=['POST'])
+@token_required
+@admin_required
+def batch_create_blog_posts(current_user):
+    """Import many blog posts in one transaction (admin only)
+    
+    Expects {"posts": [...]} where each item takes the same fields as
+    create_blog_post plus an optional ISO-8601 "published_at" to keep the
+    original date of archived posts. Nothing is written unless every post
+    validates. Slugs for the whole batch are allocated with one query.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('posts'), list) or not data['posts']:
+            return jsonify({'error': 'No posts provided'}), 400
+        
+        items = data['posts']
+        if len(items) > MAX_BATCH_POSTS:
+            return jsonify({'error': f'Too many posts (max {MAX_BATCH_POSTS} per batch)'}), 400
+        
+        posts = []
+        errors = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'error': 'Post must be an object'})
+                continue
+            
+            post, is_published, error = build_blog_post(item, current_user)
+            published_at = None
+            if not error and item.get('published_at'):
+                try:
+                    published_at = datetime.fromisoformat(str(item['published_at']).replace('Z', '+00:00'))
+                    published_at = published_at.replace(tzinfo=None)
+                except ValueError:
+                    error = 'Invalid published_at (expected ISO-8601)'
+            
+            if error:
+                errors.append({'index': index, 'error': error})
+                continue
+            posts.append((post, is_published, published_at))
+        
+        if errors:
+            return jsonify({'error': 'Batch validation failed', 'errors': errors}), 400
+        
+        # Allocate all slugs at once
+        slugs = BlogPost.allocate_slugs([post.title for post, _, _ in posts])
+        
+        for (post, is_published, published_at), slug in zip(posts, slugs):
+            post.slug = slug
+            if is_published:
+                post.publish()
+                if published_at:
+                    post.published_at = published_at
+                    post.created_at = published_at
+            db.session.add(post)
+        
+        db.session.flush()
+        for post, _, _ in posts:
+            search_index_update(post)
+        db.session.commit()
+        
+        published = [post for post, _, _ in posts if post.is_published]
+        for post in published:
+            write_static_post(post)
+        if published:
+            rebuild_static_index()
+            regenerate_site_feeds()
+            schedule_related_posts_update()
+        
+        return jsonify({
+            'message': f'{len(posts)} blog posts imported successfully',
+            'count': len(posts),
+            'posts': [{'id': post.id, 'slug': post.slug, 'title': post.title} for post, _, _ in posts]
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import blog posts'}), 500
+
+
 @app.route('/api/blog/posts/<int:post_id>', methods=['PUT'])
 @token_required
 def update_blog_post(current_user, post_id):
@@ -1134,6 +2101,9 @@ def update_blog_post(current_user, post_id):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
+        old_slug = post.slug
+        was_published = post.is_published
+        
         # Update fields
         if 'title' in data:
             title = data['title'].strip()
@@ -1142,16 +2112,19 @@ def update_blog_post(current_user, post_id):
             if len(title) > 200:
                 return jsonify({'error': 'Title too long (max 200 characters)'}), 400
             
-            # Update slug if title changed
+            # Update slug only if the title change alters the base slug
             if post.title != title:
+                slug_changed = BlogPost.slugify(title) != BlogPost.slugify(post.title)
                 post.title = title
-                post.slug = post.generate_slug()
+                if slug_changed or not post.slug:
+                    post.slug = post.generate_slug()
         
         if 'content' in data:
             content = data['content'].strip()
             if not content:
                 return jsonify({'error': 'Content is required'}), 400
             post.content = sanitize_content(content)
+            post.update_derived_fields()
         
         if 'excerpt' in data:
             post.excerpt = sanitize_content(data['excerpt'].strip())
@@ -1178,8 +2151,16 @@ def update_blog_post(current_user, post_id):
             post.is_featured = data['is_featured']
         
         post.updated_at = datetime.utcnow()
+        search_index_update(post)
         db.session.commit()
         
+        if was_published or post.is_published:
+            write_static_post(post, old_slug=old_slug)
+            rebuild_static_index()
+            regenerate_site_feeds()
+            if 'content' in data or 'title' in data or was_published != post.is_published:
+                schedule_related_posts_update()
+        
         return jsonify({
             'message': 'Blog post updated successfully',
             'post': post.to_dict()
@@ -1204,9 +2185,19 @@ def delete_blog_post(current_user, post_id):
         if not current_user.is_admin and current_user.id != post.author_id:
             return jsonify({'error': 'Permission denied'}), 403
         
+        slug = post.slug
+        was_published = post.is_published
+        
+        search_index_remove(post.id)
         db.session.delete(post)
         db.session.commit()
         
+        if was_published:
+            remove_static_post(slug)
+            rebuild_static_index()
+            regenerate_site_feeds()
+            schedule_related_posts_update()
+        
         return jsonify({'message': 'Blog post deleted successfully'}), 200
         
     except Exception as e:
@@ -1214,6 +2205,74 @@ def delete_blog_post(current_user, post_id):
         return jsonify({'error': 'Failed to delete blog post'}), 500
 
 
+@app.route('/api/blog/search', methods=['GET'])
+@rate_limit(30)
+def search_blog_posts():
+    """Ranked full-text search over blog posts with highlighted snippets"""
+    try:
+        query = request.args.get('q', '').strip()[:200]
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 20)
+        terms = search_terms(query)
+        
+        if not terms:
+            return jsonify({'query': query, 'results': [], 'page': page, 'has_more': False}), 200
+        
+        # Admins may include drafts when searching from the editor
+        include_drafts = False
+        auth_header = request.headers.get('Authorization')
+        if request.args.get('drafts', 'false').lower() == 'true' and auth_header:
+            try:
+                current_user = authenticate_token(auth_header.split(" ")[1])
+                include_drafts = bool(current_user and current_user.is_admin)
+            except IndexError:
+                pass
+        
+        offset = (page - 1) * per_page
+        if search_index_ready():
+            # Fetch one extra row to know whether another page exists
+            hits = search_blog_post_ids(terms, include_drafts, per_page + 1, offset)
+        else:
+            # No full-text support on this backend - plain LIKE over titles
+            query_obj = BlogPost.query
+            for term in terms:
+                query_obj = query_obj.filter(BlogPost.title.ilike(f'%{term}%'))
+            if not include_drafts:
+                query_obj = query_obj.filter(BlogPost.is_published == True)
+            rows = query_obj.order_by(BlogPost.created_at.desc()).with_entities(BlogPost.id)
+            hits = [(row.id, None) for row in rows.offset(offset).limit(per_page + 1)]
+        
+        has_more = len(hits) > per_page
+        hits = hits[:per_page]
+        
+        posts = {}
+        if hits:
+            posts = {post.id: post for post in BlogPost.query.filter(BlogPost.id.in_([hit[0] for hit in hits]))}
+        
+        results = []
+        for post_id, snippet in hits:
+            post = posts.get(post_id)
+            if not post:
+                continue
+            data = post.to_dict(include_content=False)
+            data['title_highlighted'] = highlight_terms(post.title, terms)
+            data['snippet'] = snippet if snippet is not None else build_snippet(html_to_text(post.content), terms)
+            results.append(data)
+        
+        return jsonify({
+            'query': query,
+            'results': results,
+            'page': page,
+            'per_page': per_page,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[ERROR] Blog search failed: {e}")
+        return jsonify({'error': 'Search failed'}), 500
+
+
 @app.route('/api/blog/posts/<int:post_id>/public', methods=['GET'])
 def get_public_blog_post(post_id):
     """Get single published blog post for public viewing"""
@@ -1223,21 +2282,25 @@ def get_public_blog_post(post_id):
         if not post:
             return jsonify({'error': 'Blog post not found'}), 404
         
-        return jsonify({'post': post.to_dict()}), 200
+        return jsonify({'post': post.to_dict(), 'related': get_related_posts(post.id)}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch blog post'}), 500
 
 
+@app.route('/api/blog/posts/<int:post_id>/view', methods=['POST'])
+@rate_limit(120)
+def record_blog_post_view(post_id):
+    """Count a post view (buffered - no database work per hit)"""
+    post_view_counter.increment(post_id)
+    return '', 204
+
+
 # TikTok Video API Routes
 @app.route('/api/videos', methods=['GET'])
+@rate_limit(_MAX_REQUESTS_PER_MINUTE)
 def get_videos():
     """Get TikTok videos from database with JSON fallback"""
-    # Rate limiting
-    client_ip = request.remote_addr
-    if not check_rate_limit(client_ip):
-        return jsonify({'error': 'Rate limit exceeded'}), 429
-    
     try:
         data = get_videos_from_database()
         # Force garbage collection after large data operations
@@ -1251,6 +2314,16 @@ def get_videos():
             'source': 'error_fallback'
         }), 500
 
+@app.route('/api/videos/<video_id>/click', methods=['POST'])
+@rate_limit(120)
+def record_video_click(video_id):
+    """Count a watch-page click-through to TikTok (buffered)"""
+    if not VIDEO_ID_PATTERN.match(video_id):
+        return jsonify({'error': 'Invalid video id'}), 400
+    video_click_counter.increment(video_id)
+    return '', 204
+
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get system status and statistics from database with JSON fallback"""
@@ -1321,6 +2394,8 @@ def toggle_user_active(current_user, user_id):
         
         user.is_active = not user.is_active
         db.session.commit()
+        if not user.is_active:
+            invalidate_user_tokens(user.id)
         
         return jsonify({
             'message': f'User {"activated" if user.is_active else "deactivated"} successfully',
@@ -1332,169 +2407,154 @@ def toggle_user_active(current_user, user_id):
         return jsonify({'error': 'Failed to update user'}), 500
 
 
+@app.route('/api/admin/metrics', methods=['GET'])
+@token_required
+@admin_required
+def get_admin_metrics(current_user):
+    """In-process metrics for this worker (admin only)"""
+    try:
+        top_clicks = VideoClick.query.order_by(VideoClick.clicks.desc()).limit(10).all()
+        return jsonify({
+            'pid': os.getpid(),
+            'counters': {
+                'post_views': post_view_counter.stats(),
+                'video_clicks': video_click_counter.stats()
+            },
+            'token_cache': _token_cache.stats(),
+            'password_hasher': password_hasher.stats(),
+            'rate_limits': {scope: limiter.stats() for scope, limiter in _rate_limiters.items()},
+            'shared_state': shared_state.stats() if shared_state is not None else None,
+            'last_video_pull': video_jobs.latest('pull-videos'),
+            'login_throttle': {
+                'by_username': login_throttle_by_username.stats(),
+                'by_ip': login_throttle_by_ip.stats(),
+                'failures': login_failure_counter.stats()
+            },
+            'revoked_tokens': {'tracked': len(_revoked_jtis), 'watermark': _revoked_watermark},
+            'top_video_clicks': [
+                {'video_id': row.video_id, 'clicks': row.clicks + video_click_counter.pending(row.video_id)}
+                for row in top_clicks
+            ]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch metrics'}), 500
+
+
+@app.route('/api/admin/blog/rebuild-static', methods=['POST'])
+@token_required
+@admin_required
+def rebuild_static_blog_api(current_user):
+    """Re-render every static blog page (admin only)"""
+    try:
+        result = rebuild_static_blog()
+        return jsonify({'message': 'Static blog pages rebuilt', **result}), 200
+    except Exception as e:
+        print(f"[ERROR] Static blog rebuild failed: {e}")
+        return jsonify({'error': 'Failed to rebuild static blog pages'}), 500
+
+
+def run_video_pull(job, process_slot, full_refresh=False):
+    """Background job body: fetch the latest videos, then sync them to the database
+    
+    Both steps run in this process (no interpreter start-up per pull);
+    update_videos only shells out to yt-dlp.
+    """
+    # Imported here: the migration module needs pymysql, which SQLite setups may lack
+    import update_videos as video_updater
+    
+    try:
+        job.set_phase('fetch')
+        record = video_updater.update_videos(shared_hosting=True, log=job.log, full_refresh=full_refresh)
+        if not record['success']:
+            raise RuntimeError('Failed to fetch videos from TikTok')
+        job.update_counts(processed=record['processed'], new=record['new'], updated=record['updated'])
+        
+        # Now sync the JSON data to the database
+        job.set_phase('database')
+        started = time.perf_counter()
+        try:
+            from migrate_videos_to_db import run_migration
+            # A full refresh always re-syncs; otherwise an unchanged catalog is a no-op
+            record['database'] = run_migration(log=job.log, force=full_refresh)
+            job.update_counts(database='unchanged' if record['database'].get('noop') else 'synced')
+        except ImportError as e:
+            job.log(f"Database migration unavailable: {e}")
+            record['database'] = {'success': False, 'error': str(e)}
+        record['timings']['db'] = round(time.perf_counter() - started, 3)
+        
+        # Force garbage collection after large operation
+        force_garbage_collection()
+        
+        if record['new'] or record['updated']:
+            job.set_phase('feeds')
+            # Worker thread: the feed builder queries the ORM, which needs an app context
+            with app.app_context():
+                regenerate_site_feeds()
+        
+        job.set_phase('done')
+        return record
+    finally:
+        # Always release the process slot
+        release_process_slot(process_slot)
+
+
 @app.route('/api/admin/pull-videos', methods=['POST'])
 @token_required
 @admin_required
 def pull_videos(current_user):
-    """Manually pull latest videos from TikTok (admin only) - Optimized for shared hosting"""
-    import subprocess
-    import os
-    
-    # Check process limits for shared hosting
-    if not acquire_process_slot():
-        return jsonify({
-            'error': 'Server is busy. Please try again in a few minutes.',
-            'details': 'Too many concurrent processes'
-        }), 503
+    """Start pulling the latest videos from TikTok in the background (admin only)
     
+    Returns 202 with the job; poll GET /api/admin/jobs/<id> for progress.
+    A pull already running anywhere on the host is returned instead of
+    starting another. Pulls are incremental unless the body has
+    {"full_refresh": true}.
+    """
     try:
-        # Get the absolute path to the update_videos.py script
-        script_path = os.path.join(os.path.dirname(__file__), 'update_videos.py')
-        
-        # List of Python executables to try (prioritize system Python for shared hosting)
-        python_executables = [
-            'python3',
-            'python',
-            '/usr/bin/python3',
-            '/usr/bin/python',
-            '/opt/alt/python39/bin/python3',
-            '/opt/alt/python39/bin/python',
-            '/home/phazeshi/virtualenv/minigolfeveryday/3.9/bin/python'
-        ]
-        
-        result = None
-        last_error = None
-        
-        for python_exec in python_executables:
+        full_refresh = bool((request.get_json(silent=True) or {}).get('full_refresh'))
+        job = video_jobs.current('pull-videos')
+        started = False
+        
+        if job is None:
+            # Check process limits for shared hosting (host-wide when shared state is available)
+            process_slot = acquire_process_slot()
+            if process_slot is None:
+                return jsonify({
+                    'error': 'Server is busy. Please try again in a few minutes.',
+                    'details': 'Too many concurrent processes'
+                }), 503
             try:
-                # Run the script with optimized flags for shared hosting
-                result = subprocess.run([
-                    python_exec, script_path, '--yes', '--quiet', '--shared-hosting'
-                ], capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=180)  # Reduced timeout
-                
-                # If successful, break out of the loop
-                if result.returncode == 0:
-                    break
-                else:
-                    last_error = f"Exit code {result.returncode}: {result.stderr}"
-                    
-            except FileNotFoundError:
-                continue  # Try next Python executable
-            except Exception as e:
-                last_error = str(e)
-                continue
-        
-        if result is None:
-            return jsonify({
-                'error': 'Failed to pull videos',
-                'details': 'No working Python executable found',
-                'attempted_executables': python_executables
-            }), 500
-        
-        if result.returncode == 0:
-            # Clean the output to remove any problematic characters
-            output_text = result.stdout.replace('\x00', '').strip()
-            
-            # Now run the database migration to sync JSON data to database
-            print("Running database migration to sync JSON data...")
-            db_result = None
-            
-            for python_exec in python_executables:
-                try:
-                    # Run the migration script
-                    env = os.environ.copy()
-                    env['PYTHONDONTWRITEBYTECODE'] = '1'
-                    env['PYTHONUNBUFFERED'] = '1'
-                    env['PYTHONIOENCODING'] = 'utf-8'
-                    env['LC_ALL'] = 'en_US.UTF-8'
-                    env['LANG'] = 'en_US.UTF-8'
-                    
-                    db_result = subprocess.run([
-                        python_exec, 'migrate_videos_to_db.py'
-                    ], capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=60, env=env)
-                    
-                    if db_result.returncode == 0:
-                        print("Database migration completed successfully")
-                        break
-                    else:
-                        print(f"Database migration failed: {db_result.stderr}")
-                        
-                except FileNotFoundError:
-                    continue
-                except Exception as e:
-                    print(f"Database migration error: {str(e)}")
-                    continue
-            
-            # Parse the output to extract stats if available
-            output_lines = output_text.split('\n') if output_text else []
-            stats = {
-                'processed': 0,
-                'new': 0,
-                'updated': 0,
-                'success': True
-            }
-            
-            # Try to extract stats from output
-            import re
-            for line in output_lines:
-                line_lower = line.lower().strip()
-                
-                # Look for specific patterns: "Processed: X videos" or "   Processed: X videos"
-                if 'processed:' in line_lower:
-                    try:
-                        match = re.search(r'processed:\s*(\d+)', line_lower)
-                        if match:
-                            stats['processed'] = int(match.group(1))
-                    except:
-                        pass
-                elif 'new:' in line_lower:
-                    try:
-                        match = re.search(r'new:\s*(\d+)', line_lower)
-                        if match:
-                            stats['new'] = int(match.group(1))
-                    except:
-                        pass
-                elif 'updated:' in line_lower:
-                    try:
-                        match = re.search(r'updated:\s*(\d+)', line_lower)
-                        if match:
-                            stats['updated'] = int(match.group(1))
-                    except:
-                        pass
-            
-            # Force garbage collection after large operation
-            force_garbage_collection()
-            
-            return jsonify({
-                'message': 'Videos pulled successfully',
-                'processed': stats['processed'],
-                'new': stats['new'],
-                'updated': stats['updated'],
-                'output': output_text[:500] + '...' if len(output_text) > 500 else output_text
-            }), 200
-        else:
-            # Clean error output
-            error_text = result.stderr.replace('\x00', '').strip() if result.stderr else 'Unknown error'
-            
-            return jsonify({
-                'error': 'Failed to pull videos',
-                'details': error_text[:200] + '...' if len(error_text) > 200 else error_text,
-                'attempted_executables': python_executables
-            }), 500
-            
-    except subprocess.TimeoutExpired:
-        return jsonify({'error': 'Video pull timed out (3 minutes)'}), 408
+                job, started = video_jobs.submit(
+                    'pull-videos', lambda job: run_video_pull(job, process_slot, full_refresh)
+                )
+            except Exception:
+                release_process_slot(process_slot)
+                raise
+            if not started:
+                release_process_slot(process_slot)
+        
+        response = jsonify({
+            'message': 'Video pull started' if started else 'Video pull already in progress',
+            'job_id': job['id'],
+            'status_url': f"/api/admin/jobs/{job['id']}",
+            'job': job
+        })
+        response.headers['Location'] = f"/api/admin/jobs/{job['id']}"
+        return response, 202
     except Exception as e:
-        return jsonify({
-            'error': 'Failed to pull videos',
-            'details': str(e),
-            'attempted_executables': python_executables
-        }), 500
-    finally:
-        # Always release the process slot
-        release_process_slot()
+        print(f"[ERROR] Failed to start video pull: {e}")
+        return jsonify({'error': 'Failed to pull videos', 'details': str(e)}), 500
 
 
+@app.route('/api/admin/jobs/<job_id>', methods=['GET'])
+@token_required
+@admin_required
+def get_admin_job(current_user, job_id):
+    """Progress, counts and output tail of a background job (admin only)"""
+    job = video_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job': job}), 200
+
 
 
 
@@ -1508,6 +2568,8 @@ def setup_database_api():
         
         # Try to create tables with current database configuration
         db.create_all()
+        posts_backfilled = ensure_blog_post_columns()
+        search_index_created = ensure_search_index()
         
         # Setup video database table and migration
         video_setup_result = setup_video_database()
@@ -1566,13 +2628,30 @@ def setup_database_api():
                 is_featured=True,
                 author_id=admin.id
             )
+            sample_post.update_derived_fields()
             sample_post.slug = sample_post.generate_slug()
             sample_post.publish()
             
             db.session.add(sample_post)
+            db.session.flush()
+            search_index_update(sample_post)
             db.session.commit()
             post_created = True
         
+        # Render static blog pages for everything already published
+        try:
+            static_result = rebuild_static_blog()
+        except Exception as e:
+            print(f"[ERROR] Static blog rebuild failed: {e}")
+            static_result = {'error': str(e)}
+        
+        try:
+            related_posts_count = update_related_posts()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] Related posts update failed: {e}")
+            related_posts_count = 0
+        
         # Get final stats
         user_count = User.query.count()
         total_posts = BlogPost.query.count()
@@ -1588,6 +2667,10 @@ def setup_database_api():
                 'admin_user_created': admin_created,
                 'admin_user_updated': admin_updated,
                 'sample_post_created': post_created,
+                'search_index_ready': search_index_created,
+                'posts_metadata_backfilled': posts_backfilled,
+                'related_posts_computed': related_posts_count,
+                'static_blog': static_result,
                 'video_table_created': video_setup_result.get('video_table_created', False),
                 'videos_migrated': video_setup_result.get('videos_migrated', 0),
                 'videos_existing': video_setup_result.get('videos_existing', 0),
@@ -1632,6 +2715,50 @@ def index():
     """Serve the main page"""
     return send_from_directory('.', 'index.html')
 
+@app.route('/feed.xml')
+@app.route('/sitemap.xml')
+def site_feed():
+    """Serve the RSS feed or sitemap with ETag/Last-Modified validators"""
+    name = request.path.lstrip('/')
+    try:
+        body, etag, last_modified = load_site_feed(name)
+    except Exception as e:
+        print(f"[ERROR] Failed to serve {name}: {e}")
+        return jsonify({'error': f'{name} unavailable'}), 503
+    
+    response = app.response_class(body, mimetype=SITE_FEEDS[name])
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
+
+@app.route('/tiktok_videos.json')
+def video_catalog_file():
+    """Serve the video catalog, precompressed when the client accepts gzip"""
+    gz_path = VIDEO_CATALOG_FILE + '.gz'
+    try:
+        use_gzip = (
+            'gzip' in request.headers.get('Accept-Encoding', '')
+            and os.stat(gz_path).st_mtime >= os.stat(VIDEO_CATALOG_FILE).st_mtime
+        )
+    except OSError:
+        use_gzip = False
+    if not use_gzip:
+        return send_from_directory(os.path.dirname(VIDEO_CATALOG_FILE), os.path.basename(VIDEO_CATALOG_FILE), max_age=300)
+    
+    response = send_from_directory(os.path.dirname(gz_path), os.path.basename(gz_path),
+                                   mimetype='application/json', max_age=300)
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/blog/')
+@app.route('/blog/<path:filename>')
+def static_blog_pages(filename='index.html'):
+    """Serve pre-rendered blog pages (short cache - posts can be edited)"""
+    return send_from_directory(app.config['BLOG_STATIC_DIR'], filename, max_age=300)
+
 @app.route('/<path:filename>')
 def static_files(filename):
     """Serve static files"""
@@ -1640,6 +2767,7 @@ def static_files(filename):
 
 # Image Upload API Routes
 @app.route('/api/upload/image', methods=['POST'])
+@rate_limit(20)
 def upload_image():
     """Upload image for blog posts"""
     try:
@@ -1715,6 +2843,7 @@ def uploaded_file(filename):
 
 # Contact Form API
 @app.route('/api/contact', methods=['POST'])
+@rate_limit(5)
 def contact_form():
     """Handle contact form submissions"""
     try:
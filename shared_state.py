@@ -0,0 +1,323 @@
+"""
+Mini Golf Every Day - Cross-worker shared state
+Rate-limit windows and process slots kept in a small memory-mapped file,
+so limits hold for the whole host instead of per worker process
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: callers fall back to in-process state
+
+_MAGIC = b'MGSS'
+_VERSION = 2
+# magic, version, rate_slots, process_slots, allowed, limited, evicted, generation
+_HEADER = struct.Struct('<4sIIIQQQQ')
+# Byte offset of the generation counter inside the header
+_GENERATION_OFFSET = 40
+_GENERATION = struct.Struct('<Q')
+_HEADER_SIZE = 64
+# key_hash (0 = empty), window_start, previous_count, current_count, idle_until
+_RATE_SLOT = struct.Struct('<QdIId')
+# pid (0 = free), started_at
+_PROCESS_SLOT = struct.Struct('<qd')
+# Slots probed per key before evicting the stalest one
+_MAX_PROBE = 8
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedState:
+    """Fixed-size state file shared by every worker on the host
+
+    The file holds a header, an open-addressing table of sliding-window
+    counters and a table of process slots. Every operation runs under an
+    exclusive flock on the file (plus a thread lock, since flock does not
+    exclude threads of one process). The file is reopened after fork so
+    each worker holds its own lock.
+    """
+
+    def __init__(self, path, rate_slots=4096, process_slots=16):
+        if fcntl is None:
+            raise OSError('Shared state needs fcntl (not available on this platform)')
+        self.path = path
+        self.rate_slots = rate_slots
+        self.process_slots = process_slots
+        self._rate_offset = _HEADER_SIZE
+        self._process_offset = self._rate_offset + rate_slots * _RATE_SLOT.size
+        self.size = self._process_offset + process_slots * _PROCESS_SLOT.size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+        with self._locked():
+            pass
+
+    def _open(self):
+        """(Re)open and map the file; initialise it if new or laid out differently"""
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                header = os.pread(fd, _HEADER.size, 0)
+                fresh = (
+                    len(header) < _HEADER.size
+                    or _HEADER.unpack(header)[:4] != (_MAGIC, _VERSION, self.rate_slots, self.process_slots)
+                    or os.fstat(fd).st_size != self.size
+                )
+                if fresh:
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, _HEADER.pack(_MAGIC, _VERSION, self.rate_slots, self.process_slots, 0, 0, 0, 0), 0)
+                self._map = mmap.mmap(fd, self.size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except Exception:
+            os.close(fd)
+            self._map = None
+            raise
+        self._fd = fd
+        self._pid = os.getpid()
+
+    class _Guard:
+        def __init__(self, state):
+            self.state = state
+
+        def __enter__(self):
+            state = self.state
+            state._lock.acquire()
+            try:
+                if state._pid != os.getpid():
+                    state._open()
+                fcntl.flock(state._fd, fcntl.LOCK_EX)
+            except Exception:
+                state._lock.release()
+                raise
+            return state._map
+
+        def __exit__(self, *exc):
+            try:
+                fcntl.flock(self.state._fd, fcntl.LOCK_UN)
+            finally:
+                self.state._lock.release()
+
+    def _locked(self):
+        return self._Guard(self)
+
+    # -- generation counter --------------------------------------------------
+
+    def generation(self):
+        """Host-wide counter bumped by bump_generation(); cheap enough to read per request
+
+        Reads the aligned 8-byte counter without taking the file lock (it
+        only ever increases, so a reader sees either the old or new value).
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            return _GENERATION.unpack_from(self._map, _GENERATION_OFFSET)[0]
+
+    def bump_generation(self):
+        """Advance the generation counter, telling every worker to drop derived caches"""
+        with self._locked() as buf:
+            value = _GENERATION.unpack_from(buf, _GENERATION_OFFSET)[0] + 1
+            _GENERATION.pack_into(buf, _GENERATION_OFFSET, value)
+        return value
+
+    def _bump(self, buf, field, amount=1):
+        """Add to one of the host-wide header counters (4 = allowed, 5 = limited, 6 = evicted)"""
+        values = list(_HEADER.unpack_from(buf, 0))
+        values[field] += amount
+        _HEADER.pack_into(buf, 0, *values)
+
+    # -- sliding-window counters -------------------------------------------
+
+    def window_hit(self, scope, key, limit, window=60):
+        """Count a request for (scope, key); returns (allowed, retry_after_seconds)
+
+        Same estimate as SlidingWindowLimiter: previous * (share of the
+        previous window still inside the sliding window) + current.
+        """
+        digest = hashlib.blake2b(f'{scope}\0{key}'.encode('utf-8'), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, 'little') or 1
+        now = time.time()
+        window_start = now - (now % window)
+
+        with self._locked() as buf:
+            slot = self._find_rate_slot(buf, key_hash, now)
+            offset = self._rate_offset + slot * _RATE_SLOT.size
+            stored_hash, start, previous, current, idle_until = _RATE_SLOT.unpack_from(buf, offset)
+            if stored_hash != key_hash or idle_until <= now:
+                start, previous, current = window_start, 0, 0
+            elif start != window_start:
+                # Roll forward; a gap of two+ windows clears both counters
+                previous = current if window_start - start < 2 * window else 0
+                current = 0
+                start = window_start
+
+            elapsed = (now - window_start) / window
+            estimate = previous * (1 - elapsed) + current
+            allowed = estimate < limit
+            if allowed:
+                current += 1
+            _RATE_SLOT.pack_into(buf, offset, key_hash, start, previous, current, now + 2 * window)
+            self._bump(buf, 4 if allowed else 5)
+
+        if allowed:
+            return True, 0
+        if current >= limit or previous == 0:
+            # Only the next window helps
+            return False, max(1, math.ceil(start + window - now))
+        needed = 1 - (limit - current) / previous
+        return False, max(1, math.ceil((needed - elapsed) * window))
+
+    def _find_rate_slot(self, buf, key_hash, now):
+        """Slot holding key_hash, else a free/idle slot, else the stalest probed slot"""
+        home = key_hash % self.rate_slots
+        free = None
+        stalest, stalest_until = home, None
+        for step in range(_MAX_PROBE):
+            slot = (home + step) % self.rate_slots
+            stored_hash, _, _, _, idle_until = _RATE_SLOT.unpack_from(buf, self._rate_offset + slot * _RATE_SLOT.size)
+            if stored_hash == key_hash:
+                return slot
+            if free is None and (stored_hash == 0 or idle_until <= now):
+                free = slot
+            if stalest_until is None or idle_until < stalest_until:
+                stalest, stalest_until = slot, idle_until
+        if free is not None:
+            return free
+        self._bump(buf, 6)
+        return stalest
+
+    # -- process slots -------------------------------------------------------
+
+    def acquire_slot(self, max_slots):
+        """Claim one of max_slots process slots; returns its index or None if all are taken
+
+        Slots held by processes that no longer exist are reclaimed first,
+        so a killed worker cannot leak them.
+        """
+        max_slots = min(max_slots, self.process_slots)
+        with self._locked() as buf:
+            free = None
+            for index in range(max_slots):
+                offset = self._process_offset + index * _PROCESS_SLOT.size
+                pid, _ = _PROCESS_SLOT.unpack_from(buf, offset)
+                if pid and not _pid_alive(pid):
+                    _PROCESS_SLOT.pack_into(buf, offset, 0, 0.0)
+                    pid = 0
+                if not pid and free is None:
+                    free = index
+            if free is not None:
+                _PROCESS_SLOT.pack_into(buf, self._process_offset + free * _PROCESS_SLOT.size, os.getpid(), time.time())
+            return free
+
+    def release_slot(self, index):
+        """Free a slot claimed by this process"""
+        offset = self._process_offset + index * _PROCESS_SLOT.size
+        with self._locked() as buf:
+            pid, _ = _PROCESS_SLOT.unpack_from(buf, offset)
+            if pid == os.getpid():
+                _PROCESS_SLOT.pack_into(buf, offset, 0, 0.0)
+
+    def active_slots(self):
+        """Process slots currently held by live processes"""
+        return [slot for slot in self._read_slots() if _pid_alive(slot['pid'])]
+
+    def _read_slots(self):
+        with self._locked() as buf:
+            slots = []
+            for index in range(self.process_slots):
+                pid, started = _PROCESS_SLOT.unpack_from(buf, self._process_offset + index * _PROCESS_SLOT.size)
+                if pid:
+                    slots.append({'slot': index, 'pid': pid, 'started_at': started})
+            return slots
+
+    def stats(self):
+        """Host-wide counters for the admin metrics endpoint"""
+        now = time.time()
+        with self._locked() as buf:
+            _, _, _, _, allowed, limited, evicted, generation = _HEADER.unpack_from(buf, 0)
+            tracked = 0
+            for slot in range(self.rate_slots):
+                stored_hash, _, _, _, idle_until = _RATE_SLOT.unpack_from(buf, self._rate_offset + slot * _RATE_SLOT.size)
+                if stored_hash and idle_until > now:
+                    tracked += 1
+        return {
+            'path': self.path,
+            'rate_slots': self.rate_slots,
+            'tracked_keys': tracked,
+            'allowed': allowed,
+            'limited': limited,
+            'evicted': evicted,
+            'generation': generation,
+            'process_slots': self.active_slots()
+        }
+
+
+class SharedWindowLimiter:
+    """SlidingWindowLimiter interface over a SharedState scope"""
+
+    def __init__(self, state, scope, limit, window=60):
+        self.state = state
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    def hit(self, key):
+        """Count a request; returns (allowed, retry_after_seconds)"""
+        try:
+            allowed, retry_after = self.state.window_hit(self.scope, key, self.limit, self.window)
+        except (OSError, ValueError) as e:
+            # Fail open: a broken state file must not take the site down
+            self.errors += 1
+            print(f"[ERROR] Shared rate limit check failed: {e}")
+            return True, 0
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return allowed, retry_after
+
+    def stats(self):
+        """This worker's counters (host-wide totals are in SharedState.stats)"""
+        return {
+            'limit': self.limit,
+            'window': self.window,
+            'shared': True,
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'errors': self.errors
+        }
+
+
+def open_shared_state(path, **kwargs):
+    """SharedState for path, or None (with a warning) if it cannot be used here"""
+    try:
+        return SharedState(path, **kwargs)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Shared state unavailable ({e}); limits are per worker")
+        return None
@@ -13,6 +13,16 @@ import time
 import gc
 from datetime import datetime
 
+from video_catalog import CatalogMerge, archive_for, export_catalog, write_catalog
+from video_fetcher import KNOWN_RUN_TO_STOP, get_fetcher, in_batches, stream_videos
+
+# Catalog path next to this script, so it resolves the same when imported by the server
+VIDEO_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiktok_videos.json')
+
+# Fetched videos are merged and saved every this many, so a run that is
+# killed or times out keeps what it already fetched
+SAVE_BATCH_SIZE = 25
+
 # Shared hosting optimizations
 def optimize_for_shared_hosting():
     """Apply optimizations for shared hosting"""
@@ -27,10 +37,13 @@ def optimize_for_shared_hosting():
     if hasattr(subprocess, 'PIPE'):
         subprocess.PIPE = subprocess.PIPE
 
-def load_video_data():
-    """Load existing video data from JSON file"""
+def load_video_data(archive=None):
+    """Load existing videos: from the sharded archive if there is one, else the JSON export"""
+    archive = archive or archive_for(VIDEO_DATA_FILE)
+    if archive.exists():
+        return archive.load()
     try:
-        with open('tiktok_videos.json', 'r') as f:
+        with open(VIDEO_DATA_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return data.get('videos', [])
     except FileNotFoundError:
@@ -38,183 +51,207 @@ def load_video_data():
     except json.JSONDecodeError:
         return []
 
-def save_video_data(videos):
-    """Save video data to JSON file"""
-    data = {
-        'videos': videos,
-        'last_updated': datetime.now().isoformat(),
-        'total_count': len(videos)
-    }
+def save_video_data(videos, path=None):
+    """Save video data to JSON file (the catalog unless path is given)"""
+    write_catalog(path or VIDEO_DATA_FILE, videos)
+
+def fetch_limits(shared_hosting=False, limit=200):
+    """(playlist limit, timeout seconds) for this environment"""
+    if shared_hosting:
+        return min(limit, 100), 60  # Max 100 videos and a shorter timeout for shared hosting
+    return limit, 120
+
+def get_latest_videos_ytdlp(limit=200, shared_hosting=False, log=print, known_ids=None):
+    """Get latest videos using yt-dlp as a list - optimized for shared hosting
     
-    with open('tiktok_videos.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    update_videos() consumes video_fetcher.stream_videos() directly so it
+    can save as it goes; this is for callers that just want the list.
+    """
+    limit, timeout = fetch_limits(shared_hosting, limit)
+    videos = list(stream_videos(limit=limit, known_ids=known_ids, timeout=timeout, log=log))
+    gc.collect()
+    return videos
 
-def get_latest_videos_ytdlp(limit=200, shared_hosting=False):
-    """Get latest videos using yt-dlp - optimized for shared hosting"""
-    try:
-        # Reduce limit for shared hosting
-        if shared_hosting:
-            limit = min(limit, 100)  # Max 100 videos for shared hosting
-        
-        # Try to run yt-dlp to get video metadata with view counts
-        cmd = [
-            'yt-dlp',
-            '--flat-playlist',
-            '--print', '%(id)s|%(title)s|%(upload_date)s|%(view_count)s|%(like_count)s|%(comment_count)s',
-            '--playlist-end', str(limit),
-            '--quiet',  # Reduce output for shared hosting
-            'https://www.tiktok.com/@minigolfeveryday'
-        ]
-        
-        # Shorter timeout for shared hosting
-        timeout = 60 if shared_hosting else 120
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-        
-        if result.returncode != 0:
-            print(f"yt-dlp failed: {result.stderr}")
-            return []
-        
-        videos = []
-        for line in result.stdout.strip().split('\n'):
-            if line.strip():
-                try:
-                    parts = line.split('|', 5)  # Split into max 6 parts
-                    if len(parts) >= 3:
-                        video_id = parts[0]
-                        title = parts[1]
-                        upload_date = parts[2]
-                        view_count = parts[3] if len(parts) > 3 else '0'
-                        like_count = parts[4] if len(parts) > 4 else '0'
-                        comment_count = parts[5] if len(parts) > 5 else '0'
-                        
-                        # Convert counts to integers, defaulting to 0
-                        try:
-                            view_count = int(view_count) if view_count.isdigit() else 0
-                            like_count = int(like_count) if like_count.isdigit() else 0
-                            comment_count = int(comment_count) if comment_count.isdigit() else 0
-                        except ValueError:
-                            view_count = like_count = comment_count = 0
-                        
-                        videos.append({
-                            'video_id': video_id,
-                            'title': title,
-                            'upload_date': upload_date,
-                            'view_count': view_count,
-                            'like_count': like_count,
-                            'comment_count': comment_count,
-                            'url': f'https://www.tiktok.com/@minigolfeveryday/video/{video_id}'
-                        })
-                except Exception as e:
-                    print(f"Error parsing line: {line}, error: {e}")
-                    continue
-        
-        # Force garbage collection after large data operation
-        gc.collect()
-        return videos
-        
-    except subprocess.TimeoutExpired:
-        print("yt-dlp timed out")
-        return []
-    except Exception as e:
-        print(f"Error running yt-dlp: {e}")
-        return []
+def new_result_record():
+    """Empty result record; see update_videos for the fields"""
+    return {
+        'success': False,
+        'processed': 0,
+        'new': 0,
+        'updated': 0,
+        'total': 0,
+        'new_ids': [],
+        'updated_ids': [],
+        'timings': {},
+        'started_at': datetime.now().isoformat(),
+        'finished_at': None,
+        'mode': None,
+        'stopped_early': False,
+        'refreshed': 0,
+        'lines': 0,
+        'malformed': 0,
+        'error': None,
+        'database': None
+    }
 
-def update_videos(shared_hosting=False):
-    """Update videos and return statistics - optimized for shared hosting"""
+def update_videos(shared_hosting=False, log=print, full_refresh=False):
+    """Update videos and return the result record - optimized for shared hosting
+    
+    Importable: the server runs this in-process and passes log to collect
+    the output; only yt-dlp runs as a subprocess.
+    
+    By default the fetch is incremental: it stops at the first run of
+    already-known videos. full_refresh enumerates the whole fetch window
+    again, which also refreshes view/like/comment counts of older videos.
+    
+    The record has success, processed/new/updated counts, total (catalog
+    size after the update), new_ids/updated_ids, per-phase timings in
+    seconds (fetch, parse, save, db), the fetch mode, lines/malformed
+    counts, any fetch error and, when the database step ran, the
+    migration's own record under 'database'. Fetched videos are saved in
+    batches of SAVE_BATCH_SIZE, so a fetch that fails part-way still
+    succeeds with what it got (error says why it stopped).
+    """
     if shared_hosting:
         optimize_for_shared_hosting()
     
-    print("Mini Golf Every Day - Video Update")
-    print("=" * 50)
+    result = new_result_record()
+    timings = result['timings']
+    run_started = time.perf_counter()
+    
+    log("Mini Golf Every Day - Video Update")
+    log("=" * 50)
     
     # Load existing videos
-    print("Loading existing video database...")
-    current_videos = load_video_data()
+    log("Loading existing video database...")
+    archive = archive_for(VIDEO_DATA_FILE)
+    current_videos = load_video_data(archive)
+    if current_videos and not archive.exists():
+        # First run with the archive: shard the JSON catalog once
+        archive.write(current_videos)
     current_count = len(current_videos)
-    print(f"   Current videos in database: {current_count}")
+    log(f"   Current videos in database: {current_count}")
     
     # Get current video IDs for comparison
     current_ids = set(video['video_id'] for video in current_videos)
     
-    # Fetch latest videos
-    print("\nFetching latest videos from @minigolfeveryday...")
-    latest_videos = get_latest_videos_ytdlp(shared_hosting=shared_hosting)
+    # Fetch latest videos (incremental needs something to be incremental against)
+    incremental = not full_refresh and bool(current_ids)
+    result['mode'] = 'incremental' if incremental else 'full'
+    log(f"\nFetching latest videos from @minigolfeveryday ({result['mode']})...")
+    limit, timeout = fetch_limits(shared_hosting)
+    fetch_stats = {}
+    # yt-dlp unless VIDEO_FETCHER selects a recorded fixture (offline runs and benchmarks)
+    stream = get_fetcher().stream(limit=limit, known_ids=current_ids if incremental else None,
+                                  stop_after_known=KNOWN_RUN_TO_STOP, timeout=timeout, stats=fetch_stats, log=log)
     
-    if not latest_videos:
-        print("Failed to fetch videos")
-        return {
-            'processed': 0,
-            'new': 0,
-            'updated': 0,
-            'success': False
-        }
+    # Merge batch by batch as yt-dlp produces them and save only the month
+    # shards each batch touched; nothing is ever dropped
+    merge = CatalogMerge(current_videos)
+    del current_videos
+    save_seconds = 0.0
+    shards_written = set()
     
-    # Compare and find new/updated videos
-    new_videos = []
-    updated_videos = []
+    try:
+        for batch in in_batches(stream, SAVE_BATCH_SIZE):
+            merge.apply(batch)
+            started = time.perf_counter()
+            shards_written.update(archive.update(merge.dirty_shards())['written'])
+            save_seconds += time.perf_counter() - started
+    finally:
+        # The whole-catalog export is written once per run, and only if something changed
+        if shards_written:
+            started = time.perf_counter()
+            export_catalog(VIDEO_DATA_FILE, merge.videos())
+            save_seconds += time.perf_counter() - started
     
-    for video in latest_videos:
-        video_id = video['video_id']
-        if video_id not in current_ids:
-            new_videos.append(video)
-        else:
-            # Check if existing video needs updating (title might have changed)
-            existing_video = next((v for v in current_videos if v['video_id'] == video_id), None)
-            if existing_video and existing_video.get('title') != video.get('title'):
-                updated_videos.append(video)
+    diff = merge.diff()
+    result['shards_written'] = sorted(shards_written)
+    parse_seconds = fetch_stats.get('parse_seconds', 0.0)
+    timings['parse'] = round(parse_seconds, 3)
+    timings['save'] = round(save_seconds, 3)
+    # Time spent waiting on yt-dlp itself
+    timings['fetch'] = round(max(0.0, fetch_stats.get('fetch_seconds', 0.0) - parse_seconds - save_seconds), 3)
+    result['stopped_early'] = fetch_stats.get('stopped_early', False)
+    result['lines'] = fetch_stats.get('lines', 0)
+    result['malformed'] = fetch_stats.get('malformed', 0)
+    result['error'] = fetch_stats.get('error')
+    if result['stopped_early']:
+        log(f"   Reached already-known videos after {diff['fetched']} entries - stopped early")
     
-    # Merge all videos (latest videos take precedence)
-    merged_videos = latest_videos
+    if not diff['fetched']:
+        log("Failed to fetch videos")
+        timings['total'] = round(time.perf_counter() - run_started, 3)
+        result['total'] = current_count
+        result['finished_at'] = datetime.now().isoformat()
+        return result
     
-    # Save updated data
-    print(f"\nSaving {len(merged_videos)} videos to database...")
-    save_video_data(merged_videos)
+    if result['error']:
+        log(f"   Kept the {diff['fetched']} videos fetched before: {result['error']}")
+    log(f"\nSaved {diff['total_after']} videos to database")
     
     # Update database - only if not in shared hosting mode or if explicitly requested
     if not shared_hosting:
-        print("Updating MySQL database...")
+        log("Updating MySQL database...")
+        started = time.perf_counter()
         try:
-            result = subprocess.run(['python3', 'migrate_videos_to_db.py'], 
-                                  capture_output=True, text=True, timeout=60)
-            if result.returncode == 0:
-                print("MySQL database updated successfully")
+            from migrate_videos_to_db import run_migration
+            result['database'] = run_migration(log=log)
+            if result['database']['success']:
+                log("MySQL database updated successfully")
             else:
-                print(f"Database update failed: {result.stderr}")
+                log("Database update failed")
         except Exception as e:
-            print(f"Could not run database migration: {e}")
+            log(f"Could not run database migration: {e}")
+        timings['db'] = round(time.perf_counter() - started, 3)
     else:
-        print("Skipping MySQL update in shared hosting mode")
+        log("Skipping MySQL update in shared hosting mode")
     
     # Calculate statistics
-    stats = {
-        'processed': len(merged_videos),
-        'new': len(new_videos),
-        'updated': len(updated_videos),
-        'success': True
-    }
+    result.update({
+        'success': True,
+        'processed': diff['fetched'],
+        'new': len(diff['inserted']),
+        'updated': len(diff['updated']),
+        'refreshed': diff['refreshed'],
+        'total': diff['total_after'],
+        'new_ids': diff['inserted'],
+        'updated_ids': list(diff['updated'])
+    })
     
-    # Output statistics in the format expected by the server
-    print(f"\nUpdate Statistics:")
-    print(f"   Processed: {stats['processed']} videos")
-    print(f"   New: {stats['new']} videos")
-    print(f"   Updated: {stats['updated']} videos")
+    # Human-readable summary (machines should use the returned record or --json)
+    log(f"\nUpdate Statistics:")
+    log(f"   Processed: {result['processed']} videos")
+    log(f"   New: {result['new']} videos")
+    log(f"   Updated: {result['updated']} videos")
+    log(f"   Refreshed counts: {result['refreshed']} videos")
     
-    if new_videos:
-        print(f"\nNew videos found:")
-        for video in new_videos[:5]:  # Show first 5 new videos
-            print(f"   - {video['title'][:60]}...")
+    if diff['inserted']:
+        log(f"\nNew videos found:")
+        for video_id in diff['inserted'][:5]:  # Show first 5 new videos
+            log(f"   - {merge.get(video_id)['title'][:60]}...")
     
-    if updated_videos:
-        print(f"\nUpdated videos:")
-        for video in updated_videos[:5]:  # Show first 5 updated videos
-            print(f"   - {video['title'][:60]}...")
+    if diff['updated']:
+        log(f"\nUpdated videos:")
+        for video_id, fields in list(diff['updated'].items())[:5]:  # Show first 5 updated videos
+            log(f"   - {merge.get(video_id)['title'][:60]}... ({', '.join(fields)})")
     
-    print(f"\nUpdate complete! Database now has {len(merged_videos)} videos")
+    log(f"\nUpdate complete! Database now has {diff['total_after']} videos")
     
     # Force garbage collection after completion
     gc.collect()
     
-    return stats
+    timings['total'] = round(time.perf_counter() - run_started, 3)
+    result['finished_at'] = datetime.now().isoformat()
+    return result
+
+def write_result_record(record, result_file=None, json_line=False):
+    """Emit the result record as a file and/or a final single-line JSON on stdout"""
+    if result_file:
+        with open(result_file, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+    if json_line:
+        print(json.dumps(record, separators=(',', ':')), flush=True)
 
 def main():
     import argparse
@@ -226,6 +263,12 @@ def main():
                        help='Reduce output verbosity')
     parser.add_argument('--shared-hosting', action='store_true',
                        help='Optimize for shared hosting environments')
+    parser.add_argument('--full-refresh', action='store_true',
+                       help='Fetch the whole window instead of stopping at known videos (refreshes view counts)')
+    parser.add_argument('--json', action='store_true',
+                       help='Print the result record as a single JSON line at the end of the output')
+    parser.add_argument('--result-file',
+                       help='Write the result record (counts, timings, changed IDs) to this JSON file')
     
     args = parser.parse_args()
     
@@ -242,17 +285,17 @@ def main():
         proceed = response in ['y', 'yes']
     
     if proceed:
-        stats = update_videos(shared_hosting=args.shared_hosting)
+        stats = update_videos(shared_hosting=args.shared_hosting, full_refresh=args.full_refresh)
         if stats['success']:
             if not args.quiet:
                 print(f"\nUpdate completed successfully")
                 print(f"   Processed: {stats['processed']} videos")
                 print(f"   New: {stats['new']} videos") 
                 print(f"   Updated: {stats['updated']} videos")
-            return 0
         else:
             print("\nUpdate failed. Please try again or check the issues above.")
-            return 1
+        write_result_record(stats, args.result_file, args.json)
+        return 0 if stats['success'] else 1
     else:
         if not args.quiet:
             print("Operation cancelled.")
@@ -0,0 +1,402 @@
+"""
+Mini Golf Every Day - Video catalog
+Keyed, non-destructive merging of fetched videos into the catalog, with a
+report of what changed
+
+The catalog is stored as a monthly-sharded archive (video_archive/ beside
+tiktok_videos.json): one immutable shard per month, named by its content
+hash, plus a small manifest. Writes only touch months that changed and
+readers only load the shards they need. tiktok_videos.json (and its .gz)
+is a whole-catalog export for existing consumers, written once per run.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: archive writers are not serialised across processes
+
+# Fields that make a video "updated" when they change
+CONTENT_FIELDS = ('title', 'upload_date', 'url')
+# Engagement counts, refreshed on every fetch that sees the video
+COUNT_FIELDS = ('view_count', 'like_count', 'comment_count')
+
+# Sharded archive directory, next to the catalog file
+ARCHIVE_DIRNAME = 'video_archive'
+ARCHIVE_MANIFEST = 'manifest.json'
+ARCHIVE_VERSION = 1
+# Shard for videos without a usable upload date (sorts after every month)
+UNDATED_SHARD = 'undated'
+_SHARD_FILE_PATTERN = re.compile(r'^(\d{4}-\d{2}|undated)\.[0-9a-f]{12}\.json$')
+
+
+def _placeholder_title(video):
+    return video.get('title') == f"TikTok Video {video.get('video_id')}"
+
+
+class CatalogMerge:
+    """Apply fetched videos to a catalog as inserts and updates, never deletes
+
+    The existing catalog is indexed by video_id once, so each fetched video
+    is an O(1) lookup and a whole merge is linear in catalog + fetch size.
+    Videos missing from a fetch (older than its window, or hidden by an
+    incremental stop) are kept as they are. A fetched value only replaces
+    a stored one if it carries information: empty values, zero counts
+    (yt-dlp prints NA when TikTok omits them) and placeholder titles do
+    not overwrite real data.
+    """
+
+    def __init__(self, existing_videos):
+        self._videos = {}
+        # month -> {video_id: None}, an ordered set in catalog order
+        self._months = {}
+        for video in existing_videos:
+            if video.get('video_id'):
+                self._videos[video['video_id']] = dict(video)
+                self._months.setdefault(shard_month(video), {})[video['video_id']] = None
+        # Months changed since the last dirty_shards() call
+        self._dirty = set()
+        self.total_before = len(self._videos)
+        self.inserted = []
+        self.updated = {}
+        self.refreshed = set()
+        self.unchanged = 0
+        self._seen = set()
+
+    def __contains__(self, video_id):
+        return video_id in self._videos
+
+    def __len__(self):
+        return len(self._videos)
+
+    def get(self, video_id):
+        """The merged record for a video, or None"""
+        return self._videos.get(video_id)
+
+    def apply(self, videos):
+        """Merge a batch of fetched videos; returns the IDs it inserted"""
+        inserted = []
+        for video in videos:
+            video_id = video.get('video_id')
+            if not video_id or video_id in self._seen:
+                continue
+            self._seen.add(video_id)
+
+            existing = self._videos.get(video_id)
+            if existing is None:
+                video = dict(video)
+                if not video.get('upload_date'):
+                    # Undated by the fetcher: date it by when it was first seen
+                    video['upload_date'] = datetime.now().strftime('%Y%m%d')
+                self._videos[video_id] = video
+                month = shard_month(video)
+                self._months.setdefault(month, {})[video_id] = None
+                self._dirty.add(month)
+                self.inserted.append(video_id)
+                inserted.append(video_id)
+                continue
+
+            old_month = shard_month(existing)
+            changed = []
+            for field in CONTENT_FIELDS:
+                value = video.get(field)
+                if not value or value == existing.get(field):
+                    continue
+                if field == 'title' and _placeholder_title(video):
+                    continue
+                existing[field] = value
+                changed.append(field)
+            if changed:
+                self.updated[video_id] = changed
+
+            counts_changed = False
+            for field in COUNT_FIELDS:
+                value = video.get(field)
+                if value and value != existing.get(field):
+                    existing[field] = value
+                    counts_changed = True
+            if counts_changed:
+                self.refreshed.add(video_id)
+            if not changed and not counts_changed:
+                self.unchanged += 1
+                continue
+            new_month = shard_month(existing)
+            if new_month != old_month:
+                # Upload date moved the video to another month's shard
+                del self._months[old_month][video_id]
+                self._months.setdefault(new_month, {})[video_id] = None
+                self._dirty.add(old_month)
+            self._dirty.add(new_month)
+        return inserted
+
+    def videos(self):
+        """The merged catalog, newest upload first
+
+        Ties (and videos without a date) keep their catalog order. The input
+        is already nearly sorted, so this sort is close to linear.
+        """
+        return sorted(self._videos.values(), key=lambda v: v.get('upload_date') or '', reverse=True)
+
+    def dirty_shards(self):
+        """{month: videos} for every month changed since the last call (empty list = month is gone)
+
+        Pass the result to CatalogArchive.update() to save just those shards.
+        """
+        shards = {month: [self._videos[video_id] for video_id in self._months.get(month, ())]
+                  for month in self._dirty}
+        self._dirty = set()
+        return shards
+
+    def diff(self):
+        """What the merge changed so far"""
+        return {
+            'total_before': self.total_before,
+            'total_after': len(self._videos),
+            'fetched': len(self._seen),
+            'inserted': list(self.inserted),
+            'updated': {video_id: list(fields) for video_id, fields in self.updated.items()},
+            'refreshed': len(self.refreshed),
+            'unchanged': self.unchanged,
+            'removed': 0
+        }
+
+
+def _replace_atomically(path, data):
+    """Write bytes to a temp file beside path, fsync it, then rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    try:
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def shard_month(video):
+    """Archive shard ("YYYY-MM" or "undated") a video belongs to"""
+    date = str(video.get('upload_date') or '')
+    if len(date) == 8 and date.isdigit():
+        return f'{date[:4]}-{date[4:6]}'
+    return UNDATED_SHARD
+
+
+class CatalogArchive:
+    """Monthly shards of the video catalog plus a manifest
+
+    manifest.json lists the shards newest month first, each with its file,
+    video count, SHA-256 and newest/oldest upload date, plus the total
+    count and the latest month. Shard files are never modified: a changed
+    month is written to a new file (named by its hash) and the manifest
+    is switched over atomically, so a reader always sees one consistent
+    version. Loaded shards are cached by file name for the same reason.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_stamp = None
+        self._shards = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def exists(self):
+        return os.path.exists(self._path(ARCHIVE_MANIFEST))
+
+    def manifest(self):
+        """The current manifest (re-read only when the file changes); {} if there is none"""
+        try:
+            stat = os.stat(self._path(ARCHIVE_MANIFEST))
+        except OSError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            if stamp != self._manifest_stamp:
+                with open(self._path(ARCHIVE_MANIFEST), 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+                self._manifest_stamp = stamp
+                # Drop cached shards the new manifest no longer lists
+                files = {shard['file'] for shard in self._manifest.get('shards', [])}
+                self._shards = {name: videos for name, videos in self._shards.items() if name in files}
+            return self._manifest
+
+    def _load_shard(self, shard):
+        name = shard['file']
+        with self._lock:
+            videos = self._shards.get(name)
+        if videos is None:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                videos = json.load(f)['videos']
+            with self._lock:
+                self._shards[name] = videos
+        return videos
+
+    def load(self, limit=None, months=None):
+        """Videos newest first, reading only as many shards as needed
+
+        limit stops after that many videos; months restricts the load to
+        those shards. Returns copies, so callers may modify them.
+        """
+        for attempt in range(2):
+            videos = []
+            try:
+                for shard in self.manifest().get('shards', []):
+                    if months is not None and shard['month'] not in months:
+                        continue
+                    videos.extend(self._load_shard(shard))
+                    if limit is not None and len(videos) >= limit:
+                        break
+                break
+            except FileNotFoundError:
+                # A writer replaced the manifest and removed the old shard; re-read it
+                if attempt:
+                    raise
+                self._manifest_stamp = None
+        if limit is not None:
+            videos = videos[:limit]
+        return [dict(video) for video in videos]
+
+    def write(self, videos):
+        """Store the complete catalog; only months whose content changed are written
+
+        Every month is encoded and hashed to find the changes, so this is
+        for whole-catalog sources (the database sync); incremental writers
+        use update(). Returns {'written': [months], 'removed': [months],
+        'unchanged': count}.
+        """
+        by_month = {}
+        for video in videos:
+            by_month.setdefault(shard_month(video), []).append(video)
+        return self.update(by_month, replace=True)
+
+    def update(self, shards, replace=False):
+        """Rewrite only the given months ({month: videos}; an empty list removes the month)
+
+        Other months keep their manifest entries and files untouched, unless
+        replace is set, in which case months not given are removed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        lock_fd = None
+        if fcntl is not None:
+            lock_fd = os.open(self._path('.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(self._path(ARCHIVE_MANIFEST), 'r', encoding='utf-8') as f:
+                    previous = {shard['month']: shard for shard in json.load(f).get('shards', [])}
+            except (OSError, ValueError):
+                previous = {}
+
+            entries = {} if replace else dict(previous)
+            report = {'written': [], 'removed': [], 'unchanged': 0}
+            for month, month_videos in shards.items():
+                if not month_videos:
+                    entries.pop(month, None)
+                    continue
+                month_videos = sorted(month_videos, key=lambda v: v.get('upload_date') or '', reverse=True)
+                encoded = json.dumps({'month': month, 'videos': month_videos},
+                                     separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+                digest = hashlib.sha256(encoded).hexdigest()
+                old = previous.get(month)
+                if old and old.get('sha256') == digest and os.path.exists(self._path(old['file'])):
+                    entries[month] = old
+                    report['unchanged'] += 1
+                    continue
+                name = f'{month}.{digest[:12]}.json'
+                _replace_atomically(self._path(name), encoded)
+                report['written'].append(month)
+                dates = [v['upload_date'] for v in month_videos if v.get('upload_date')]
+                entries[month] = {
+                    'month': month,
+                    'file': name,
+                    'count': len(month_videos),
+                    'sha256': digest,
+                    'newest': max(dates) if dates else None,
+                    'oldest': min(dates) if dates else None
+                }
+            report['removed'] = sorted(set(previous) - set(entries))
+
+            if report['written'] or report['removed'] or not previous:
+                # Newest month first; "undated" sorts after every YYYY-MM
+                ordered = [entries[month] for month in
+                           sorted(entries, key=lambda m: (m != UNDATED_SHARD, m), reverse=True)]
+                manifest = {
+                    'version': ARCHIVE_VERSION,
+                    'last_updated': datetime.now().isoformat(),
+                    'total_count': sum(shard['count'] for shard in ordered),
+                    'latest': ordered[0]['month'] if ordered else None,
+                    'shards': ordered
+                }
+                _replace_atomically(self._path(ARCHIVE_MANIFEST), json.dumps(manifest, indent=1).encode('utf-8'))
+
+                # Superseded and orphaned shard files; readers retry if they lose this race
+                current = {shard['file'] for shard in ordered}
+                for name in os.listdir(self.directory):
+                    if _SHARD_FILE_PATTERN.match(name) and name not in current:
+                        os.remove(self._path(name))
+            return report
+        finally:
+            if lock_fd is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                os.close(lock_fd)
+
+
+def archive_for(catalog_path):
+    """The CatalogArchive kept beside a catalog file"""
+    return CatalogArchive(os.path.join(os.path.dirname(os.path.abspath(catalog_path)), ARCHIVE_DIRNAME))
+
+
+def export_catalog(path, videos, **fields):
+    """Write the whole-catalog export atomically, plus a gzipped <path>.gz sibling
+
+    The JSON is compact (no indentation) and UTF-8. Readers see either the
+    old or the new file, never a partial one. Extra top-level fields go
+    after videos/last_updated/total_count. The .gz has a fixed mtime, so it
+    only changes when the JSON does. Returns the JSON size in bytes.
+    """
+    data = {
+        'videos': videos,
+        'last_updated': datetime.now().isoformat(),
+        'total_count': len(videos)
+    }
+    data.update(fields)
+    encoded = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    _replace_atomically(path, encoded)
+    _replace_atomically(path + '.gz', gzip.compress(encoded, compresslevel=9, mtime=0))
+    return len(encoded)
+
+
+def write_catalog(path, videos, **fields):
+    """Store a complete catalog: the archive beside path, then the export at path
+
+    For writers that only have the whole catalog (database sync, setup);
+    fetchers save batches with CatalogArchive.update() and export once.
+    """
+    archive_for(path).write(videos)
+    return export_catalog(path, videos, **fields)
@@ -0,0 +1,312 @@
+"""
+Mini Golf Every Day - TikTok video fetcher
+Streams yt-dlp's flat-playlist output line by line and yields validated
+video records as they arrive, so callers can persist in small batches and
+memory does not grow with the playlist length
+
+Fetchers are pluggable: YtDlpFetcher talks to TikTok, ReplayFetcher
+replays recorded (or synthetic) yt-dlp output offline. get_fetcher()
+picks one from VIDEO_FETCHER (unset or "yt-dlp", or "replay:<fixture>").
+"""
+
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_USERNAME = 'minigolfeveryday'
+
+# One video per line: id|title|upload_date|view_count|like_count|comment_count
+YTDLP_PRINT_FORMAT = '%(id)s|%(title)s|%(upload_date)s|%(view_count)s|%(like_count)s|%(comment_count)s'
+
+# Incremental fetches stop after this many consecutive already-known videos
+# (TikTok shows up to 3 pinned videos first, so this must be larger than 3)
+KNOWN_RUN_TO_STOP = 5
+
+
+def profile_url(username=DEFAULT_USERNAME):
+    return f'https://www.tiktok.com/@{username}'
+
+
+def video_url(video_id, username=DEFAULT_USERNAME):
+    return f'https://www.tiktok.com/@{username}/video/{video_id}'
+
+
+def ytdlp_command(username=DEFAULT_USERNAME, limit=None, quiet=True):
+    """yt-dlp arguments listing a profile's videos in YTDLP_PRINT_FORMAT"""
+    cmd = ['yt-dlp', '--flat-playlist', '--print', YTDLP_PRINT_FORMAT]
+    if limit:
+        cmd += ['--playlist-end', str(limit)]
+    if quiet:
+        cmd.append('--quiet')
+    cmd.append(profile_url(username))
+    return cmd
+
+
+def _count(value):
+    value = value.strip()
+    return int(value) if value.isdigit() else 0
+
+
+def _text(value):
+    """A text field with yt-dlp's NA placeholder read as missing"""
+    value = value.strip()
+    return '' if value == 'NA' else value
+
+
+def parse_line(line, username=DEFAULT_USERNAME):
+    """Video dict from one output line; None for blank lines
+
+    Raises ValueError for malformed lines (too few fields or an ID that is
+    not a TikTok video ID). Missing or 'NA' counts become 0, a missing
+    title gets a placeholder and a missing upload date stays empty, so a
+    merge never overwrites a stored date with it.
+    """
+    line = line.rstrip('\r\n')
+    if not line.strip():
+        return None
+    parts = line.split('|', 5)
+    if len(parts) < 3:
+        raise ValueError('too few fields')
+    video_id = parts[0].strip()
+    if not (video_id.isdigit() and len(video_id) >= 15):
+        raise ValueError(f'invalid video id {video_id[:30]!r}')
+    parts += [''] * (6 - len(parts))
+    return {
+        'video_id': video_id,
+        'title': _text(parts[1]) or f'TikTok Video {video_id}',
+        'upload_date': _text(parts[2]),
+        'view_count': _count(parts[3]),
+        'like_count': _count(parts[4]),
+        'comment_count': _count(parts[5]),
+        'url': video_url(video_id, username)
+    }
+
+
+def parse_lines(lines, username=DEFAULT_USERNAME, known_ids=None,
+                stop_after_known=KNOWN_RUN_TO_STOP, stats=None, log=print):
+    """Yield video dicts from an iterable of output lines
+
+    Malformed lines are counted and skipped. With known_ids the generator
+    stops after stop_after_known consecutive known videos (incremental
+    mode). stats, if given, receives lines/parsed/malformed/stopped_early
+    and the seconds spent parsing.
+    """
+    if stats is None:
+        stats = {}
+    for key in ('lines', 'parsed', 'malformed'):
+        stats.setdefault(key, 0)
+    stats.setdefault('parse_seconds', 0.0)
+    stats['stopped_early'] = False
+    known_run = 0
+
+    for line in lines:
+        stats['lines'] += 1
+        started = time.perf_counter()
+        try:
+            video = parse_line(line, username)
+        except ValueError as e:
+            stats['malformed'] += 1
+            log(f"Skipping malformed line ({e}): {line.strip()[:80]}")
+            continue
+        finally:
+            stats['parse_seconds'] += time.perf_counter() - started
+        if video is None:
+            continue
+        stats['parsed'] += 1
+        yield video
+
+        if known_ids is not None:
+            known_run = known_run + 1 if video['video_id'] in known_ids else 0
+            if known_run >= stop_after_known:
+                stats['stopped_early'] = True
+                return
+
+
+def stream_videos(username=DEFAULT_USERNAME, limit=200, known_ids=None,
+                  stop_after_known=KNOWN_RUN_TO_STOP, timeout=120, stats=None, log=print):
+    """Run yt-dlp and yield video dicts as its output arrives
+
+    yt-dlp is killed after timeout seconds, or as soon as the consumer
+    stops iterating (incremental stop, error, or close()); everything
+    yielded before that is valid. stats gets the parse_lines counters plus
+    returncode, timed_out, error and fetch_seconds.
+    """
+    if stats is None:
+        stats = {}
+    stats.update({'returncode': None, 'timed_out': False, 'error': None})
+    started = time.perf_counter()
+    # stderr goes to a file: a full stderr pipe would stall yt-dlp while we read stdout
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            ytdlp_command(username, limit), stdout=subprocess.PIPE, stderr=stderr_file,
+            text=True, encoding='utf-8', errors='replace', bufsize=1
+        )
+    except OSError as e:
+        stderr_file.close()
+        stats['error'] = f'Could not run yt-dlp: {e}'
+        log(stats['error'])
+        return
+
+    def kill_on_timeout():
+        stats['timed_out'] = True
+        process.kill()
+
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.daemon = True
+    timer.start()
+    exhausted = False
+    try:
+        yield from parse_lines(process.stdout, username, known_ids, stop_after_known, stats, log)
+        exhausted = not stats['stopped_early']
+    finally:
+        timer.cancel()
+        if not exhausted and process.poll() is None:
+            process.kill()
+        process.communicate()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()[-2000:].decode('utf-8', 'replace')
+        stderr_file.close()
+        stats['returncode'] = process.returncode
+        stats['fetch_seconds'] = round(time.perf_counter() - started, 3)
+        if stats['timed_out']:
+            stats['error'] = f'yt-dlp timed out after {timeout}s'
+            log(stats['error'])
+        elif exhausted and process.returncode != 0:
+            stats['error'] = f'yt-dlp failed: {stderr.strip()[-500:]}'
+            log(stats['error'])
+
+
+def in_batches(videos, batch_size=25):
+    """Group an iterable of videos into lists of at most batch_size"""
+    batch = []
+    for video in videos:
+        batch.append(video)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class YtDlpFetcher:
+    """Fetch a profile's videos with yt-dlp (the production backend)"""
+
+    name = 'yt-dlp'
+
+    def __init__(self, username=DEFAULT_USERNAME):
+        self.username = username
+
+    def stream(self, limit=200, known_ids=None, stop_after_known=KNOWN_RUN_TO_STOP,
+               timeout=120, stats=None, log=print):
+        """Yield video dicts; same contract as stream_videos()"""
+        return stream_videos(self.username, limit, known_ids, stop_after_known, timeout, stats, log)
+
+    def record(self, path, limit=200, timeout=300):
+        """Save yt-dlp's raw output to a fixture file for ReplayFetcher"""
+        with open(path, 'w', encoding='utf-8') as f:
+            result = subprocess.run(ytdlp_command(self.username, limit), stdout=f, stderr=subprocess.PIPE,
+                                    text=True, encoding='utf-8', errors='replace', timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f'yt-dlp failed: {result.stderr.strip()[-500:]}')
+        return path
+
+
+class ReplayFetcher:
+    """Replay recorded yt-dlp output through the same parser, without network
+
+    lines_per_second throttles the replay to mimic yt-dlp's pace (None
+    replays as fast as possible). limit, incremental stops, malformed-line
+    handling and stats behave as with YtDlpFetcher; timeout is enforced
+    against the simulated pace.
+    """
+
+    name = 'replay'
+
+    def __init__(self, fixture, username=DEFAULT_USERNAME, lines_per_second=None):
+        self.fixture = fixture
+        self.username = username
+        self.lines_per_second = lines_per_second
+
+    def _lines(self, limit, timeout, stats):
+        started = time.perf_counter()
+        delay = 1.0 / self.lines_per_second if self.lines_per_second else 0
+        videos = 0
+        with open(self.fixture, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if limit and videos >= limit:
+                    break
+                if delay:
+                    time.sleep(delay)
+                if timeout and time.perf_counter() - started > timeout:
+                    stats['timed_out'] = True
+                    stats['error'] = f'replay timed out after {timeout}s'
+                    break
+                if '|' in line:
+                    videos += 1
+                yield line
+
+    def stream(self, limit=200, known_ids=None, stop_after_known=KNOWN_RUN_TO_STOP,
+               timeout=120, stats=None, log=print):
+        """Yield video dicts; same contract as stream_videos()"""
+        if stats is None:
+            stats = {}
+        stats.update({'returncode': 0, 'timed_out': False, 'error': None})
+        started = time.perf_counter()
+        try:
+            yield from parse_lines(self._lines(limit, timeout, stats), self.username,
+                                   known_ids, stop_after_known, stats, log)
+        finally:
+            stats['fetch_seconds'] = round(time.perf_counter() - started, 3)
+            if stats['error']:
+                log(stats['error'])
+
+
+def get_fetcher(spec=None, username=DEFAULT_USERNAME):
+    """Fetcher for a spec string, defaulting to the VIDEO_FETCHER env var
+
+    "yt-dlp" (or empty) -> YtDlpFetcher; "replay:<fixture>" ->
+    ReplayFetcher, paced by VIDEO_FETCHER_SPEED lines/second if set.
+    """
+    spec = spec if spec is not None else os.environ.get('VIDEO_FETCHER', '')
+    if not spec or spec == 'yt-dlp':
+        return YtDlpFetcher(username)
+    if spec.startswith('replay:'):
+        speed = os.environ.get('VIDEO_FETCHER_SPEED')
+        return ReplayFetcher(spec[len('replay:'):], username, float(speed) if speed else None)
+    raise ValueError(f'Unknown VIDEO_FETCHER {spec!r} (use "yt-dlp" or "replay:<fixture>")')
+
+
+def synthetic_lines(count=10000, malformed_rate=0.0, seed=0, start_date='20260101'):
+    """yt-dlp-style output for a synthetic profile of count videos, newest first
+
+    About malformed_rate of the lines are broken in the ways real output
+    breaks (missing fields, NA counts, non-numeric IDs, stray log lines).
+    """
+    rng = random.Random(seed)
+    day = datetime.strptime(start_date, '%Y%m%d')
+    broken = [
+        lambda vid, title, date: f'{vid}|{title}',
+        lambda vid, title, date: f'NA|{title}|{date}|NA|NA|NA',
+        lambda vid, title, date: 'WARNING: [TikTok] Unable to extract webpage video data',
+        lambda vid, title, date: '',
+    ]
+    for n in range(count):
+        video_id = str(7590000000000000000 - n * 7919)
+        title = f'Day {count - n}. Hole {rng.randint(1, 18)}, {rng.choice(["windmill", "loop", "castle", "volcano"])} #minigolfeveryday'
+        date = (day - timedelta(days=n)).strftime('%Y%m%d')
+        if malformed_rate and rng.random() < malformed_rate:
+            yield rng.choice(broken)(video_id, title, date) + '\n'
+        views = rng.randint(50, 500000)
+        yield f'{video_id}|{title}|{date}|{views}|{views // rng.randint(10, 40)}|{rng.randint(0, 300)}\n'
+
+
+def write_fixture(path, lines):
+    """Write fixture lines (e.g. from synthetic_lines) to path"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    return path